@@ -0,0 +1,149 @@
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from django.apps import apps
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from missas.core.facades import cdn
+
+
+@pytest.fixture(autouse=True)
+def cache_location(settings, tmp_path):
+    """Give each test an empty cache file instead of sharing the dev one."""
+    settings.CACHES = {
+        "default": {
+            **settings.CACHES["default"],
+            "LOCATION": str(tmp_path / "cache.sqlite3"),
+        }
+    }
+
+
+class CDNServer(ThreadingHTTPServer):
+    """Stand-in for the CDN purge API, recording the tags of each call.
+
+    Answers with the statuses in `statuses` first, then with 200s.
+    """
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), CDNHandler)
+        self.calls = []
+        self.statuses = []
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_port}/purge_cache"
+
+    @property
+    def purged(self):
+        return {tag for call in self.calls for tag in call["tags"]}
+
+
+class CDNHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        self.server.calls.append(
+            {
+                "tags": json.loads(body)["tags"],
+                "authorization": self.headers["Authorization"],
+                "status": status,
+            }
+        )
+        self.send_response(status)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def cdn_server(settings, monkeypatch):
+    """Point the purges to a local CDNServer, sending them without delay."""
+    server = CDNServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    settings.CDN_PURGE_URL = server.url
+    settings.CDN_PURGE_TOKEN = "token"  # noqa: S105
+    settings.CDN_PURGE_DELAY = 0
+    monkeypatch.setattr(cdn, "RETRY_BACKOFF", 0)
+    yield server
+    cdn.queue.flush(timeout=5)
+    server.shutdown()
+    server.server_close()
+
+
+class QueryPlans(CaptureQueriesContext):
+    """Capture the queries run inside the block and check their plans.
+
+    After the block, `problems` lists (sql, plan line) for every full scan of
+    one of LARGE_TABLES and every temporary B-tree, SQLite's sort of rows no
+    index returns in order. `allowed` holds (sql fragment, plan line) pairs,
+    accepting the line only in the statements containing the fragment. Scans
+    of partial indexes are accepted too, they only read the rows the index
+    covers.
+    """
+
+    LARGE_TABLES = {"core_city", "core_location", "core_parish", "core_schedule"}
+
+    def __init__(self, allowed=()):
+        super().__init__(connection)
+        self.allowed = list(allowed)
+
+    def is_allowed(self, sql, line):
+        return any(
+            fragment in sql and line == allowed_line
+            for fragment, allowed_line in self.allowed
+        )
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        super().__exit__(exc_type, exc_value, traceback)
+        if exc_type is None:
+            self.problems = self.check()
+
+    def check(self):
+        partial_indexes = {
+            index.name
+            for model in apps.get_models()
+            for index in model._meta.indexes
+            if index.condition is not None
+        }
+        problems = []
+        statements = dict.fromkeys(query["sql"] for query in self.captured_queries)
+        for sql in statements:
+            if not sql.startswith("SELECT"):
+                continue
+            # Subqueries name their tables U0, U1...
+            aliases = {
+                alias: table for table, alias in re.findall(r'"(\w+)" (U\d+)', sql)
+            }
+            for line in self.plan(sql):
+                if self.is_allowed(sql, line):
+                    continue
+                scan = re.match(
+                    r"SCAN (\w+)(?: USING (?:COVERING )?INDEX (\w+))?", line
+                )
+                if scan:
+                    table, index = scan.groups()
+                    if (
+                        aliases.get(table, table) in self.LARGE_TABLES
+                        and index not in partial_indexes
+                    ):
+                        problems.append((sql, line))
+                elif "TEMP B-TREE" in line:
+                    problems.append((sql, line))
+        return problems
+
+    def plan(self, sql):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            return [row[-1] for row in cursor.fetchall()]
+
+
+@pytest.fixture
+def query_plans(db):
+    """QueryPlans, e.g. `with query_plans() as plans: ...; assert not plans.problems`."""
+    return QueryPlans
@@ -5,8 +5,11 @@ from urllib.parse import quote_plus
 
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.utils import timezone
 from django.utils.html import format_html
 
+from missas.core import signals
+from missas.core.cache_tags import invalidate_parishes
 from missas.core.facades.google_maps import get_schedule_address
 from missas.core.models import (
     City,
@@ -23,6 +26,15 @@ from missas.core.models import (
 admin.site.register(User, UserAdmin)
 
 
+def _schedule_locations_changed(parish_ids, location_ids):
+    # bulk_update doesn't send post_save, what the signals would have done
+    if not parish_ids:
+        return
+    invalidate_parishes(parish_ids)
+    signals.parish_locations_changed(parish_ids)
+    signals.clusters_changed(location_ids=location_ids)
+
+
 @admin.register(Source)
 class SourceAdmin(admin.ModelAdmin):
     list_display = ("description", "type", "link")
@@ -216,6 +228,8 @@ class ScheduleAdmin(admin.ModelAdmin):
 
         total_updated = 0
         total_failed = 0
+        updated_parish_ids = set()
+        location_ids = set()
 
         for (
             parish_id,
@@ -235,7 +249,11 @@ class ScheduleAdmin(admin.ModelAdmin):
             if existing_location:
                 for schedule in schedules:
                     schedule.location = existing_location
-                Schedule.objects.bulk_update(schedules, ["location"])
+                    # Not set by auto_now in bulk_update, the pages' ETags use it
+                    schedule.updated_at = timezone.now()
+                Schedule.objects.bulk_update(schedules, ["location", "updated_at"])
+                updated_parish_ids.add(parish_id)
+                location_ids.add(existing_location.pk)
                 total_updated += len(schedules)
             else:
                 try:
@@ -273,9 +291,15 @@ class ScheduleAdmin(admin.ModelAdmin):
 
                 for schedule in schedules:
                     schedule.location = location
-                Schedule.objects.bulk_update(schedules, ["location"])
+                    # Not set by auto_now in bulk_update, the pages' ETags use it
+                    schedule.updated_at = timezone.now()
+                Schedule.objects.bulk_update(schedules, ["location", "updated_at"])
+                updated_parish_ids.add(parish_id)
+                location_ids.add(location.pk)
                 total_updated += len(schedules)
 
+        _schedule_locations_changed(updated_parish_ids, location_ids)
+
         if total_updated > 0:
             self.message_user(
                 request,
@@ -313,6 +337,8 @@ class ScheduleAdmin(admin.ModelAdmin):
 
         total_updated = 0
         total_skipped = 0
+        updated_parish_ids = set()
+        location_ids = set()
 
         for (
             parish_id,
@@ -330,11 +356,17 @@ class ScheduleAdmin(admin.ModelAdmin):
             if existing_location:
                 for schedule in schedules:
                     schedule.location = existing_location
-                Schedule.objects.bulk_update(schedules, ["location"])
+                    # Not set by auto_now in bulk_update, the pages' ETags use it
+                    schedule.updated_at = timezone.now()
+                Schedule.objects.bulk_update(schedules, ["location", "updated_at"])
+                updated_parish_ids.add(parish_id)
+                location_ids.add(existing_location.pk)
                 total_updated += len(schedules)
             else:
                 total_skipped += len(schedules)
 
+        _schedule_locations_changed(updated_parish_ids, location_ids)
+
         if total_updated > 0:
             self.message_user(
                 request,
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     name = "missas.core"
     default_auto_field = "django.db.models.BigAutoField"
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from missas.core import signals  # noqa: F401
+        from missas.core.sqlite import configure_connection
+
+        connection_created.connect(configure_connection)
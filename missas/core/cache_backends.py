@@ -0,0 +1,289 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+# SQLite's default limit of variables in a single statement is 999
+MAX_VARIABLES = 900
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires REAL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed);
+CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO stats (name, value) VALUES ('size', 0);
+CREATE TRIGGER IF NOT EXISTS cache_insert AFTER INSERT ON cache BEGIN
+    UPDATE stats SET value = value + NEW.size WHERE name = 'size';
+END;
+CREATE TRIGGER IF NOT EXISTS cache_update AFTER UPDATE OF size ON cache BEGIN
+    UPDATE stats SET value = value + NEW.size - OLD.size WHERE name = 'size';
+END;
+CREATE TRIGGER IF NOT EXISTS cache_delete AFTER DELETE ON cache BEGIN
+    UPDATE stats SET value = value - OLD.size WHERE name = 'size';
+END;
+"""
+
+UPSERT = """
+INSERT INTO cache (key, value, expires, size, accessed) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (key) DO UPDATE SET
+    value = excluded.value,
+    expires = excluded.expires,
+    size = excluded.size,
+    accessed = excluded.accessed
+"""
+
+
+def _chunks(items, size=MAX_VARIABLES):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+class SQLiteCache(BaseCache):
+    """Cache stored in its own SQLite file, shared by the workers of a machine.
+
+    Unlike DatabaseCache it doesn't write into the file serving the site's
+    reads, and it evicts by size: once the pickled values add up to MAX_SIZE
+    bytes, the least recently used entries are dropped until they fit in
+    EVICT_TO of it. The total size is kept by triggers, so checking it is one
+    indexed read. Hits, misses and evictions are counted in memory and added
+    to the file every STATS_INTERVAL seconds; `stats()` returns them.
+
+    OPTIONS: MAX_SIZE (bytes), EVICT_TO (fraction of MAX_SIZE),
+    TOUCH_INTERVAL (seconds before a read refreshes an entry's last access,
+    so most reads don't write) and STATS_INTERVAL (seconds).
+    """
+
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self.path = location
+        self.max_size = int(options.get("MAX_SIZE", 128 * 1024 * 1024))
+        self.evict_to = float(options.get("EVICT_TO", 0.9))
+        self.touch_interval = float(options.get("TOUCH_INTERVAL", 60))
+        self.stats_interval = float(options.get("STATS_INTERVAL", 10))
+        self._local = threading.local()
+        self._counters = Counter()
+        self._counters_lock = threading.Lock()
+        self._counters_flushed_at = time.monotonic()
+
+    def _connection(self):
+        # Connections can't cross threads nor survive gunicorn forking workers
+        if getattr(self._local, "pid", None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    @contextmanager
+    def _transaction(self):
+        connection = self._connection()
+        # IMMEDIATE takes the write lock upfront instead of failing to upgrade
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def _count(self, name, value=1):
+        with self._counters_lock:
+            self._counters[name] += value
+
+    def _flush_counters_if_due(self):
+        if time.monotonic() - self._counters_flushed_at >= self.stats_interval:
+            self._flush_counters()
+
+    def _flush_counters(self):
+        with self._counters_lock:
+            counters, self._counters = self._counters, Counter()
+            self._counters_flushed_at = time.monotonic()
+        if not counters:
+            return
+        with self._transaction() as connection:
+            connection.executemany(
+                "INSERT INTO stats (name, value) VALUES (?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+                counters.items(),
+            )
+
+    def _read(self, keys):
+        """Return {key: value} of the live entries, refreshing stale accesses."""
+        now = time.time()
+        connection = self._connection()
+        found, touch = {}, []
+        for chunk in _chunks(keys):
+            placeholders = ", ".join("?" * len(chunk))
+            for key, value, expires, accessed in connection.execute(
+                f"SELECT key, value, expires, accessed FROM cache WHERE key IN ({placeholders})",  # noqa: S608
+                chunk,
+            ):
+                if expires is not None and expires <= now:
+                    continue
+                found[key] = pickle.loads(value)  # noqa: S301
+                if now - accessed >= self.touch_interval:
+                    touch.append(key)
+
+        if touch:
+            with self._transaction() as connection:
+                connection.executemany(
+                    "UPDATE cache SET accessed = ? WHERE key = ?",
+                    [(now, key) for key in touch],
+                )
+        self._count("hits", len(found))
+        self._count("misses", len(keys) - len(found))
+        self._flush_counters_if_due()
+        return found
+
+    def _write(self, items, timeout, only_if_missing=False):
+        """Store {key: value}, returning the keys actually written."""
+        now = time.time()
+        expires = self.get_backend_timeout(timeout)
+        rows = []
+        for key, value in items.items():
+            data = pickle.dumps(value, self.pickle_protocol)
+            rows.append((key, data, expires, len(data), now))
+
+        written = []
+        with self._transaction() as connection:
+            for row in rows:
+                statement = UPSERT
+                if only_if_missing:
+                    statement += (
+                        " WHERE cache.expires IS NOT NULL AND cache.expires <= ?"
+                    )
+                    row = (*row, now)
+                if connection.execute(statement, row).rowcount:
+                    written.append(row[0])
+            self._evict(connection, now)
+        self._flush_counters_if_due()
+        return written
+
+    def _evict(self, connection, now):
+        (size,) = connection.execute(
+            "SELECT value FROM stats WHERE name = 'size'"
+        ).fetchone()
+        if size <= self.max_size:
+            return
+
+        connection.execute("DELETE FROM cache WHERE expires <= ?", (now,))
+        (size,) = connection.execute(
+            "SELECT value FROM stats WHERE name = 'size'"
+        ).fetchone()
+        excess = size - self.max_size * self.evict_to
+        if excess <= 0:
+            return
+
+        evicted = []
+        for key, entry_size in connection.execute(
+            "SELECT key, size FROM cache ORDER BY accessed"
+        ):
+            evicted.append(key)
+            excess -= entry_size
+            if excess <= 0:
+                break
+        for chunk in _chunks(evicted):
+            placeholders = ", ".join("?" * len(chunk))
+            connection.execute(
+                f"DELETE FROM cache WHERE key IN ({placeholders})", chunk  # noqa: S608
+            )
+        self._count("evictions", len(evicted))
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._read([key]).get(key, default)
+
+    def get_many(self, keys, version=None):
+        keys = {self.make_and_validate_key(key, version=version): key for key in keys}
+        return {keys[key]: value for key, value in self._read(list(keys)).items()}
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._write({key: value}, timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        self._write(
+            {
+                self.make_and_validate_key(key, version=version): value
+                for key, value in data.items()
+            },
+            timeout,
+        )
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return bool(self._write({key: value}, timeout, only_if_missing=True))
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        with self._transaction() as connection:
+            return bool(
+                connection.execute(
+                    "UPDATE cache SET expires = ? "
+                    "WHERE key = ? AND (expires IS NULL OR expires > ?)",
+                    (self.get_backend_timeout(timeout), key, now),
+                ).rowcount
+            )
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return (
+            self._connection()
+            .execute(
+                "SELECT 1 FROM cache WHERE key = ? AND (expires IS NULL OR expires > ?)",
+                (key, time.time()),
+            )
+            .fetchone()
+            is not None
+        )
+
+    def delete(self, key, version=None):
+        return bool(self._delete([self.make_and_validate_key(key, version=version)]))
+
+    def delete_many(self, keys, version=None):
+        self._delete([self.make_and_validate_key(key, version=version) for key in keys])
+
+    def _delete(self, keys):
+        deleted = 0
+        with self._transaction() as connection:
+            for chunk in _chunks(keys):
+                placeholders = ", ".join("?" * len(chunk))
+                deleted += connection.execute(
+                    f"DELETE FROM cache WHERE key IN ({placeholders})",  # noqa: S608
+                    chunk,
+                ).rowcount
+        return deleted
+
+    def clear(self):
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM cache")
+
+    def stats(self):
+        """Return the counters of every worker plus the current entries and size."""
+        self._flush_counters()
+        connection = self._connection()
+        stats = {"hits": 0, "misses": 0, "evictions": 0}
+        stats.update(connection.execute("SELECT name, value FROM stats"))
+        (stats["entries"],) = connection.execute(
+            "SELECT COUNT(*) FROM cache"
+        ).fetchone()
+        stats["max_size"] = self.max_size
+        return stats
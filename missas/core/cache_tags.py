@@ -0,0 +1,96 @@
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+
+from missas.core.facades import cdn
+from missas.core.models import City, Parish
+
+INDEX_TAG = "index"
+
+
+def state_tag(state_id):
+    return f"state:{state_id}"
+
+
+def city_tag(city_id):
+    return f"city:{city_id}"
+
+
+def parish_tag(parish_id):
+    return f"parish:{parish_id}"
+
+
+def _version_key(tag):
+    return f"cache_tag:{tag}"
+
+
+def tag_versions(tags):
+    """Return {tag: version} creating a version for the tags that have none."""
+    keys = {_version_key(tag): tag for tag in tags}
+    versions = cache.get_many(keys)
+    for key in keys.keys() - versions.keys():
+        version = uuid4().hex
+        # Another request may have created it first, then theirs is the one
+        versions[key] = (
+            version if cache.add(key, version, timeout=None) else cache.get(key)
+        )
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def tag_request(request, *tags):
+    """Mark the response to `request` as depending on `tags`.
+
+    The versions are read before the view queries the data they cover, so a
+    change committed while the page renders leaves it stale and not cached.
+    """
+    if not hasattr(request, "cache_tag_versions"):
+        request.cache_tag_versions = {}
+    request.cache_tag_versions.update(tag_versions(tags))
+
+
+def is_fresh(versions):
+    """Whether none of the tags changed since `versions` were read."""
+    return tag_versions(versions) == versions
+
+
+def invalidate_tags(tags):
+    """Expire every cached response depending on any of `tags`.
+
+    Deleting the version is enough: cached responses keep the versions they
+    were rendered with and are treated as misses once those are gone. The
+    CDN, which finds them by their Cache-Tag header, is asked to purge them.
+    """
+    tags = set(tags)
+    if tags:
+        cache.delete_many([_version_key(tag) for tag in tags])
+        cdn.purge_tags(tags)
+
+
+def parish_tags(parish_ids):
+    """Tags of the pages showing the given parishes or counting their schedules."""
+    tags = {INDEX_TAG}
+    for parish_id, city_id, state_id in Parish.objects.filter(
+        pk__in=set(parish_ids) - {None}
+    ).values_list("id", "city_id", "city__state_id"):
+        tags.update((parish_tag(parish_id), city_tag(city_id), state_tag(state_id)))
+    return tags
+
+
+def city_tags(city_ids):
+    """Tags of the pages listing the parishes of the given cities."""
+    tags = {INDEX_TAG}
+    for city_id, state_id in City.objects.filter(
+        pk__in=set(city_ids) - {None}
+    ).values_list("id", "state_id"):
+        tags.update((city_tag(city_id), state_tag(state_id)))
+    return tags
+
+
+def invalidate_parishes(parish_ids, city_ids=()):
+    # Tags are resolved now, the parishes may be gone once it commits. The
+    # versions are dropped on commit so a concurrent request can't cache a
+    # page rendered from the old rows under the new versions. `city_ids` are
+    # cities the parishes were listed in before, as when a parish moves
+    tags = parish_tags(parish_ids) | city_tags(city_ids)
+    transaction.on_commit(lambda: invalidate_tags(tags))
@@ -0,0 +1,209 @@
+import hashlib
+
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+from missas.core.models import Location, Schedule
+
+CARD_TEMPLATE = "card.html"
+# Keys change whenever a card's data does, so entries never go stale
+CARD_CACHE_SECONDS = 60 * 60 * 24 * 30
+
+
+class Row:
+    """The fields a card reads from a model, without the model instance.
+
+    `columns` are read from the database, in the order of __slots__, and the
+    remaining slots hold the related rows.
+    """
+
+    __slots__ = ()
+    columns = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+
+class StateRow(Row):
+    __slots__ = ("id", "updated_at", "slug")
+    columns = __slots__
+
+
+class CityRow(Row):
+    __slots__ = ("id", "updated_at", "slug", "state")
+    columns = __slots__[:-1]
+
+
+class ContactRow(Row):
+    __slots__ = (
+        "id",
+        "updated_at",
+        "phone",
+        "whatsapp",
+        "email",
+        "facebook",
+        "instagram",
+    )
+    columns = __slots__
+
+
+class ParishRow(Row):
+    __slots__ = ("id", "updated_at", "name", "slug", "city", "contact")
+    columns = __slots__[:-2]
+
+
+class LocationRow(Row):
+    __slots__ = ("id", "updated_at", "name", "address", "google_maps_place_id")
+    columns = __slots__
+
+    url = Location.url
+
+
+class SourceRow(Row):
+    __slots__ = ("id", "updated_at", "link", "description")
+    columns = __slots__
+
+
+class ScheduleRow(Row):
+    __slots__ = (
+        "id",
+        "updated_at",
+        "day",
+        "start_time",
+        "end_time",
+        "observation",
+        "verified_at",
+        "location_name",
+        "parish",
+        "location",
+        "source",
+    )
+    columns = __slots__[:-3]
+
+    @property
+    def pk(self):
+        return self.id
+
+    def get_day_display(self):
+        return Schedule.Day(self.day).label
+
+
+# (row class, lookup from the schedule), related rows before the rows holding them
+_CARD_ROWS = (
+    (StateRow, "parish__city__state__"),
+    (CityRow, "parish__city__"),
+    (ContactRow, "parish__contact__"),
+    (ParishRow, "parish__"),
+    (LocationRow, "location__"),
+    (SourceRow, "source__"),
+    (ScheduleRow, ""),
+)
+_CARD_COLUMNS = []
+_CARD_SLICES = []
+for _row_class, _prefix in _CARD_ROWS:
+    _CARD_SLICES.append(
+        slice(len(_CARD_COLUMNS), len(_CARD_COLUMNS) + len(_row_class.columns))
+    )
+    _CARD_COLUMNS += [f"{_prefix}{column}" for column in _row_class.columns]
+
+
+def card_rows(schedules):
+    """Return the schedules of the queryset as ScheduleRows, for render_cards.
+
+    A single query reads just the columns the cards show, into tuples instead
+    of model instances. The parish, city, location... of many schedules are
+    built once and shared between them.
+    """
+    state, city, contact, parish, location, source, schedule = _CARD_SLICES
+    shared = {}
+
+    def get(row_class, values, *related):
+        if values[0] is None:
+            return None
+        key = (row_class, values[0])
+        row = shared.get(key)
+        if row is None:
+            row = shared[key] = row_class(*values, *related)
+        return row
+
+    rows = []
+    for values in schedules.values_list(*_CARD_COLUMNS):
+        city_row = get(CityRow, values[city], get(StateRow, values[state]))
+        parish_row = get(
+            ParishRow, values[parish], city_row, get(ContactRow, values[contact])
+        )
+        rows.append(
+            ScheduleRow(
+                *values[schedule],
+                parish_row,
+                get(LocationRow, values[location]),
+                get(SourceRow, values[source]),
+            )
+        )
+    return rows
+
+
+def _contact(parish):
+    try:
+        return parish.contact
+    except ObjectDoesNotExist:
+        return None
+
+
+def card_cache_key(schedule, template_version):
+    """Key of a schedule's card, changing with anything the card shows.
+
+    Takes a ScheduleRow, or a Schedule with its parish (with its city, state
+    and contact), location and source already loaded. Both get the same key.
+    """
+    parish = schedule.parish
+    related = (
+        schedule,
+        parish,
+        parish.city,
+        parish.city.state,
+        schedule.location,
+        schedule.source,
+        _contact(parish),
+    )
+    versions = "|".join(
+        obj.updated_at.isoformat() if obj is not None else "-" for obj in related
+    )
+    digest = hashlib.md5(  # noqa: S324
+        f"{template_version}|{versions}".encode(), usedforsecurity=False
+    ).hexdigest()
+    return f"card:{schedule.pk}:{digest}"
+
+
+def template_version(template):
+    """Digest of the template's source, so a new deploy's cards get new keys."""
+    return hashlib.md5(  # noqa: S324
+        template.template.source.encode(), usedforsecurity=False
+    ).hexdigest()
+
+
+def render_cards(schedules):
+    """Return the HTML of each schedule's card, rendering only the uncached ones.
+
+    All keys are read with a single get_many and the missing cards written
+    with a single set_many, so a warm page costs one cache round trip.
+    """
+    template = get_template(CARD_TEMPLATE)
+    version = template_version(template)
+
+    schedules = list(schedules)
+    keys = [card_cache_key(schedule, version) for schedule in schedules]
+    cards = cache.get_many(keys)
+
+    missing = {}
+    for key, schedule in zip(keys, schedules):
+        if key not in cards:
+            missing[key] = template.render({"schedule": schedule})
+    if missing:
+        cache.set_many(missing, CARD_CACHE_SECONDS)
+        cards.update(missing)
+
+    return [mark_safe(cards[key]) for key in keys]  # noqa: S308
@@ -0,0 +1,86 @@
+from collections import defaultdict
+
+from missas.core.geo import GridIndex, VersionedIndex
+from missas.core.models import City, Schedule
+
+NEAREST_CITY_MAX_KM = 100
+
+
+def compute_city_centroids(city_ids=None):
+    """Store the centroid and bounding box of the given cities' locations.
+
+    The points are the distinct Locations of the schedules of the city's
+    parishes; cities left without any get their coordinates cleared.
+    """
+    schedules = Schedule.objects.filter(location__isnull=False)
+    if city_ids is not None:
+        schedules = schedules.filter(parish__city_id__in=city_ids)
+
+    points = defaultdict(set)
+    for city_id, lat, lng in schedules.values_list(
+        "parish__city_id", "location__latitude_e6", "location__longitude_e6"
+    ).distinct():
+        points[city_id].add((lat / 1_000_000, lng / 1_000_000))
+
+    if city_ids is None:
+        # Also clear the cities that no longer have any location
+        city_ids = set(points) | set(
+            City.objects.filter(latitude__isnull=False).values_list("pk", flat=True)
+        )
+    cities = list(City.objects.filter(pk__in=city_ids).only("pk"))
+
+    for city in cities:
+        city_points = points.get(city.pk)
+        if not city_points:
+            city.latitude = city.longitude = None
+            city.min_latitude = city.min_longitude = None
+            city.max_latitude = city.max_longitude = None
+            continue
+        latitudes = [lat for lat, _ in city_points]
+        longitudes = [lng for _, lng in city_points]
+        city.latitude = sum(latitudes) / len(latitudes)
+        city.longitude = sum(longitudes) / len(longitudes)
+        city.min_latitude, city.max_latitude = min(latitudes), max(latitudes)
+        city.min_longitude, city.max_longitude = min(longitudes), max(longitudes)
+
+    City.objects.bulk_update(
+        cities,
+        [
+            "latitude",
+            "longitude",
+            "min_latitude",
+            "min_longitude",
+            "max_latitude",
+            "max_longitude",
+        ],
+        batch_size=500,
+    )
+    city_index.invalidate()
+    return len(points)
+
+
+def refresh_city_centroids(city_ids):
+    city_ids = set(city_ids)
+    if city_ids:
+        compute_city_centroids(city_ids)
+
+
+def build_city_index():
+    return GridIndex(
+        City.objects.filter(latitude__isnull=False).values_list(
+            "id", "latitude", "longitude"
+        ),
+        cell_size=0.5,
+    )
+
+
+city_index = VersionedIndex("geo:cities_version", build_city_index)
+
+
+def nearest_city(lat, lng, max_radius_km=NEAREST_CITY_MAX_KM):
+    """Return the nearest City with located schedules, or None if too far."""
+    result = city_index.get().nearest(lat, lng, max_radius_km)
+    if result is None:
+        return None
+    _, city_id = result
+    return City.objects.select_related("state").filter(pk=city_id).first()
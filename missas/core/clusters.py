@@ -0,0 +1,143 @@
+import math
+from collections import defaultdict
+
+from django.core.cache import cache
+
+from missas.core.models import Location, Schedule
+
+MAX_ZOOM = 18
+# Each map tile is split into GRID_SIZE x GRID_SIZE cells, one cluster per cell
+GRID_SIZE = 8
+MAX_TILES = 64
+MAX_MERCATOR_LATITUDE = 85.05112878
+
+
+class TooManyTiles(ValueError):
+    pass
+
+
+def _world_position(lat, lng, zoom):
+    """Position in tiles (with fraction) of the Web Mercator tile grid."""
+    lat = min(max(float(lat), -MAX_MERCATOR_LATITUDE), MAX_MERCATOR_LATITUDE)
+    n = 2**zoom
+    x = (float(lng) + 180) / 360 * n
+    y = (1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n
+    return min(max(x, 0), n - 1e-9), min(max(y, 0), n - 1e-9)
+
+
+def tile_for(lat, lng, zoom):
+    x, y = _world_position(lat, lng, zoom)
+    return int(x), int(y)
+
+
+def tile_bbox(zoom, x, y):
+    """Return (min_lat, min_lng, max_lat, max_lng) of a tile."""
+    n = 2**zoom
+
+    def latitude(tile_y):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * tile_y / n))))
+
+    return latitude(y + 1), x / n * 360 - 180, latitude(y), (x + 1) / n * 360 - 180
+
+
+def tile_cache_key(zoom, x, y):
+    return f"clusters:v1:{zoom}:{x}:{y}"
+
+
+def compute_tile(zoom, x, y):
+    locations = [
+        (pk, lat / 1_000_000, lng / 1_000_000)
+        for pk, lat, lng in Location.objects.within_bbox(
+            *tile_bbox(zoom, x, y)
+        ).values_list("id", "latitude_e6", "longitude_e6")
+    ]
+    # The bounding box is inclusive, so drop points that belong to a neighbour
+    locations = [point for point in locations if tile_for(*point[1:], zoom) == (x, y)]
+    if not locations:
+        return []
+
+    parishes = {}
+    for row in (
+        Schedule.objects.filter(location_id__in=[pk for pk, _, _ in locations])
+        .values(
+            "location_id",
+            "parish__name",
+            "parish__slug",
+            "parish__city__slug",
+            "parish__city__state__slug",
+        )
+        .order_by("location_id", "parish_id")
+    ):
+        parishes.setdefault(
+            row["location_id"],
+            {
+                "name": row["parish__name"],
+                "url": f"/{row['parish__city__state__slug']}/{row['parish__city__slug']}/{row['parish__slug']}/",
+            },
+        )
+
+    cells = defaultdict(list)
+    for pk, lat, lng in locations:
+        world_x, world_y = _world_position(lat, lng, zoom)
+        cell = (
+            int((world_x - x) * GRID_SIZE),
+            int((world_y - y) * GRID_SIZE),
+        )
+        cells[cell].append((pk, lat, lng))
+
+    clusters = []
+    for cell in sorted(cells):
+        points = cells[cell]
+        lat = sum(point[1] for point in points) / len(points)
+        lng = sum(point[2] for point in points) / len(points)
+        representative = min(
+            (point for point in points if point[0] in parishes),
+            key=lambda point: (point[1] - lat) ** 2 + (point[2] - lng) ** 2,
+            default=None,
+        )
+        clusters.append(
+            {
+                "count": len(points),
+                "latitude": round(lat, 6),
+                "longitude": round(lng, 6),
+                "parish": parishes[representative[0]] if representative else None,
+            }
+        )
+    return clusters
+
+
+def get_clusters(min_lat, min_lng, max_lat, max_lng, zoom):
+    """Return the clusters of the tiles overlapping the bounding box.
+
+    Tiles are read from the cache in one call and only the missing ones are
+    computed from the database.
+    """
+    min_x, min_y = tile_for(max_lat, min_lng, zoom)
+    max_x, max_y = tile_for(min_lat, max_lng, zoom)
+    count = (max_x - min_x + 1) * (max_y - min_y + 1)
+    if count > MAX_TILES:
+        raise TooManyTiles(f"{count} tiles, the maximum is {MAX_TILES}")
+    tiles = [
+        (zoom, x, y) for x in range(min_x, max_x + 1) for y in range(min_y, max_y + 1)
+    ]
+
+    keys = {tile_cache_key(*tile): tile for tile in tiles}
+    cached = cache.get_many(keys)
+    missing = {
+        key: compute_tile(*tile) for key, tile in keys.items() if key not in cached
+    }
+    if missing:
+        cache.set_many(missing, timeout=None)
+
+    return [cluster for key in keys for cluster in {**cached, **missing}[key]]
+
+
+def invalidate_tiles(points):
+    """Drop the cached tiles containing any of the (lat, lng) points, in every zoom."""
+    keys = {
+        tile_cache_key(zoom, *tile_for(lat, lng, zoom))
+        for lat, lng in points
+        for zoom in range(MAX_ZOOM + 1)
+    }
+    if keys:
+        cache.delete_many(keys)
@@ -0,0 +1,78 @@
+import hashlib
+from functools import cache
+from pathlib import Path
+
+from django.db.models import Count, Max, Value
+from django.views.decorators.http import condition
+
+TEMPLATES_DIR = Path(__file__).resolve().parent / "templates"
+
+
+@cache
+def template_version():
+    """Hash of the templates, so a deploy changing the markup changes the ETags."""
+    digest = hashlib.sha256()
+    for path in sorted(TEMPLATES_DIR.rglob("*.html")):
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _summary(queryset, field="updated_at"):
+    # Grouping by a constant aggregates the whole queryset into one row that,
+    # unlike aggregate(), can still be combined with others in a UNION
+    return (
+        queryset.order_by()
+        .annotate(one=Value(1))
+        .values("one")
+        .annotate(count=Count("pk"), last_id=Max("pk"), modified=Max(field))
+        .values_list("count", "last_id", "modified")
+    )
+
+
+def page_validators(*sources):
+    """Return the (etag, last_modified) of a page showing the rows of `sources`.
+
+    Each source is a queryset, or a (queryset, field) pair to take the
+    modification time from a related row. The count, last id and last
+    modification of every source are read in a single query; the counts and
+    ids catch deletions and replaced rows, which leave no newer timestamp
+    behind. Only the ETag sees those and template changes, but clients send
+    If-None-Match whenever they got one.
+    """
+    summaries = [
+        _summary(*source) if isinstance(source, tuple) else _summary(source)
+        for source in sources
+    ]
+    rows = list(summaries[0].union(*summaries[1:], all=True))
+
+    fingerprint = "|".join(":".join(map(str, row)) for row in rows)
+    etag = hashlib.sha256(f"{template_version()}|{fingerprint}".encode()).hexdigest()[
+        :32
+    ]
+    last_modified = max((row[2] for row in rows if row[2]), default=None)
+    return etag, last_modified
+
+
+def conditional_page(sources):
+    """Answer conditional GETs with a 304 before the view queries and renders.
+
+    `sources(request, *args, **kwargs)` returns the sources of
+    `page_validators`, or None for a response that can't be validated, e.g.
+    one depending on the clock.
+    """
+
+    def validators(request, *args, **kwargs):
+        # condition() asks for the ETag and Last-Modified separately
+        if not hasattr(request, "page_validators"):
+            page_sources = sources(request, *args, **kwargs)
+            request.page_validators = (
+                page_validators(*page_sources)
+                if page_sources is not None
+                else (None, None)
+            )
+        return request.page_validators
+
+    return condition(
+        etag_func=lambda *args, **kwargs: validators(*args, **kwargs)[0],
+        last_modified_func=lambda *args, **kwargs: validators(*args, **kwargs)[1],
+    )
@@ -0,0 +1,78 @@
+import math
+
+import numpy as np
+
+from missas.core.geo import EARTH_RADIUS_KM, VersionedIndex
+
+
+class LocationSnapshot:
+    """Location coordinates kept in float64 arrays to compute in one pass."""
+
+    def __init__(self, ids, latitudes, longitudes):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.latitudes = np.radians(np.asarray(latitudes, dtype=np.float64))
+        self.longitudes = np.radians(np.asarray(longitudes, dtype=np.float64))
+        self.cos_latitudes = np.cos(self.latitudes)
+        # A radius only reaches a band of latitudes, found by binary search
+        self.by_latitude = np.argsort(self.latitudes, kind="stable")
+        self.sorted_latitudes = self.latitudes[self.by_latitude]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def distances(self, lat, lng, positions=slice(None)):
+        """Distances in km to the locations at `positions`, all by default."""
+        lat, lng = math.radians(lat), math.radians(lng)
+        a = (
+            np.sin((self.latitudes[positions] - lat) / 2) ** 2
+            + math.cos(lat)
+            * self.cos_latitudes[positions]
+            * np.sin((self.longitudes[positions] - lng) / 2) ** 2
+        )
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+    def _pairs(self, distances, positions):
+        return list(zip(distances[positions].tolist(), self.ids[positions].tolist()))
+
+    def within(self, lat, lng, radius_km):
+        """Return [(distance_km, id), ...] within radius_km, nearest first."""
+        # Points farther in latitude alone are out of the radius
+        delta = radius_km / EARTH_RADIUS_KM
+        start = np.searchsorted(self.sorted_latitudes, math.radians(lat) - delta)
+        stop = np.searchsorted(
+            self.sorted_latitudes, math.radians(lat) + delta, side="right"
+        )
+        positions = self.by_latitude[start:stop]
+        distances = self.distances(lat, lng, positions)
+        inside = np.flatnonzero(distances <= radius_km)
+        ids = self.ids[positions[inside]]
+        order = np.lexsort((ids, distances[inside]))
+        return list(zip(distances[inside][order].tolist(), ids[order].tolist()))
+
+    def nearest(self, lat, lng, k, radius_km=None):
+        """Return the k nearest [(distance_km, id), ...], optionally capped."""
+        if k <= 0:
+            return []
+        distances = self.distances(lat, lng)
+        positions = np.arange(len(distances))
+        if radius_km is not None:
+            positions = np.flatnonzero(distances <= radius_km)
+        if k < len(positions):
+            # Partial selection is O(n); only the k winners get sorted
+            positions = positions[np.argpartition(distances[positions], k - 1)[:k]]
+        positions = positions[np.argsort(distances[positions], kind="stable")]
+        return self._pairs(distances, positions)
+
+
+def build_location_snapshot():
+    from missas.core.models import Location
+
+    rows = list(Location.objects.values_list("id", "latitude_e6", "longitude_e6"))
+    return LocationSnapshot(
+        [pk for pk, _, _ in rows],
+        [lat / 1_000_000 for _, lat, _ in rows],
+        [lng / 1_000_000 for _, _, lng in rows],
+    )
+
+
+location_snapshot = VersionedIndex("geo:locations_version", build_location_snapshot)
@@ -0,0 +1,134 @@
+import hashlib
+import json
+
+from django.db.models import Count, Max
+
+from missas.core.models import Location, Parish, Schedule
+
+# Rows fetched per database round trip while streaming
+EXPORT_CHUNK_SIZE = 2000
+
+
+def export_version():
+    """Fingerprint of the exported data, changing whenever any row does.
+
+    The max `updated_at` catches edits and the counts catch deletions, which
+    leave no timestamp behind.
+    """
+    parts = [
+        model.objects.aggregate(count=Count("id"), updated_at=Max("updated_at"))
+        for model in (Location, Schedule, Parish)
+    ]
+    fingerprint = "|".join(f"{part['count']}:{part['updated_at']}" for part in parts)
+    return hashlib.sha256(fingerprint.encode()).hexdigest()[:32]
+
+
+def _schedules_by_location():
+    """Yield (location_id, [schedule, ...]) ordered by location_id."""
+    rows = (
+        Schedule.objects.filter(location__isnull=False)
+        .values(
+            "location_id",
+            "type",
+            "day",
+            "start_time",
+            "end_time",
+            "verified_at",
+            "parish_id",
+            "parish__name",
+            "parish__slug",
+            "parish__city__name",
+            "parish__city__slug",
+            "parish__city__state__short_name",
+            "parish__city__state__slug",
+        )
+        .order_by("location_id", "day", "start_time", "id")
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+    location_id, group = None, []
+    for row in rows:
+        if row["location_id"] != location_id and group:
+            yield location_id, group
+            group = []
+        location_id = row["location_id"]
+        group.append(row)
+    if group:
+        yield location_id, group
+
+
+def _feature(location, schedules):
+    parishes = {}
+    for row in schedules:
+        parishes.setdefault(
+            row["parish_id"],
+            {
+                "name": row["parish__name"],
+                "city": row["parish__city__name"],
+                "state": row["parish__city__state__short_name"],
+                "url": f"/{row['parish__city__state__slug']}/{row['parish__city__slug']}/{row['parish__slug']}/",
+            },
+        )
+
+    return {
+        "type": "Feature",
+        "id": location["id"],
+        "geometry": {
+            "type": "Point",
+            "coordinates": [
+                location["longitude_e6"] / 1_000_000,
+                location["latitude_e6"] / 1_000_000,
+            ],
+        },
+        "properties": {
+            "name": location["name"],
+            "address": location["address"],
+            "parishes": list(parishes.values()),
+            "schedules": [
+                {
+                    "parish": row["parish__name"],
+                    "type": row["type"],
+                    "day": Schedule.Day(row["day"]).label,
+                    "start_time": row["start_time"].strftime("%H:%M"),
+                    "end_time": (
+                        row["end_time"].strftime("%H:%M") if row["end_time"] else None
+                    ),
+                    "verified": row["verified_at"] is not None,
+                }
+                for row in schedules
+            ],
+        },
+    }
+
+
+def geojson_chunks():
+    """Yield a GeoJSON FeatureCollection of every Location, one feature at a time.
+
+    Locations and schedules are read with two server-side iterators, both
+    ordered by location, and merged as they stream, so memory doesn't grow
+    with the number of rows.
+    """
+    locations = (
+        Location.objects.values("id", "name", "address", "latitude_e6", "longitude_e6")
+        .order_by("id")
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    schedules = _schedules_by_location()
+    pending = next(schedules, None)
+
+    yield '{"type": "FeatureCollection", "features": ['
+    separator = "\n"
+    for location in locations:
+        # Only happens if a location is deleted while the export streams
+        while pending and pending[0] < location["id"]:
+            pending = next(schedules, None)
+        location_schedules = []
+        if pending and pending[0] == location["id"]:
+            location_schedules = pending[1]
+            pending = next(schedules, None)
+
+        yield separator + json.dumps(
+            _feature(location, location_schedules), ensure_ascii=False
+        )
+        separator = ",\n"
+    yield "\n]}\n"
@@ -0,0 +1,116 @@
+import json
+import logging
+import os
+import threading
+import time
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Cloudflare accepts up to 30 tags per purge call
+MAX_TAGS_PER_REQUEST = 30
+MAX_ATTEMPTS = 4
+# Seconds before the first retry, doubling on each of the next ones
+RETRY_BACKOFF = 1
+TIMEOUT = 10
+
+
+def _send(tags):
+    request = Request(  # noqa: S310
+        settings.CDN_PURGE_URL,
+        data=json.dumps({"tags": tags}).encode(),
+        method="POST",
+        headers={
+            "Authorization": f"Bearer {settings.CDN_PURGE_TOKEN}",
+            "Content-Type": "application/json",
+        },
+    )
+    for attempt in range(MAX_ATTEMPTS):
+        if attempt:
+            time.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+        try:
+            with urlopen(request, timeout=TIMEOUT):  # noqa: S310
+                return True
+        except HTTPError as e:
+            error = e
+            # Other client errors, e.g. a wrong token, won't succeed on a retry
+            if e.code < 500 and e.code != 429:
+                break
+        except (URLError, OSError) as e:
+            error = e
+
+    logger.error(f"Error purging {len(tags)} tags from the CDN: {error}")
+    return False
+
+
+class PurgeQueue:
+    """Sends the purges from a background thread, coalescing bursts.
+
+    Tags queued while a purge waits CDN_PURGE_DELAY seconds are sent along
+    with it, so an admin action saving hundreds of schedules makes a few
+    calls instead of hundreds, and the request saving them doesn't wait.
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._condition = threading.Condition()
+        self._pending = set()
+        self._sending = False
+        self._thread = None
+
+    def add(self, tags):
+        # Threads don't survive gunicorn forking the workers
+        if self._pid != os.getpid():
+            self._reset()
+
+        with self._condition:
+            self._pending.update(tags)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="cdn-purge", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending)
+                self._sending = True
+
+            time.sleep(settings.CDN_PURGE_DELAY)
+            with self._condition:
+                tags, self._pending = sorted(self._pending), set()
+            try:
+                for start in range(0, len(tags), MAX_TAGS_PER_REQUEST):
+                    _send(tags[start : start + MAX_TAGS_PER_REQUEST])
+            except Exception:
+                # Keep the thread alive for the next purges
+                logger.exception("Error purging tags from the CDN")
+            finally:
+                with self._condition:
+                    self._sending = False
+                    self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """Wait for the queued tags to be sent, returning False on timeout."""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._pending and not self._sending, timeout
+            )
+
+
+queue = PurgeQueue()
+
+
+def purge_tags(tags):
+    """Purge from the CDN the responses carrying any of the cache `tags`."""
+    if not settings.CDN_PURGE_URL:
+        return
+    queue.add(tags)
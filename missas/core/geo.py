@@ -0,0 +1,163 @@
+import math
+from collections import defaultdict
+from decimal import Decimal
+from uuid import uuid4
+
+from django.core.cache import cache
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+MAX_RADIUS_KM = 50
+DEFAULT_RADIUS_KM = 5
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 8
+
+
+def haversine(lat1, lng1, lat2, lng2):
+    """Great-circle distance in kilometers between two points in degrees."""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat, lng, radius_km):
+    """Return (min_lat, min_lng, max_lat, max_lng) enclosing the given circle."""
+    lat_delta = radius_km / KM_PER_DEGREE
+    # Near the poles a degree of longitude is ~0 km, so the box spans everything
+    cos_lat = math.cos(math.radians(lat))
+    lng_delta = radius_km / (KM_PER_DEGREE * cos_lat) if cos_lat > 1e-9 else 180
+    return (
+        max(-90.0, lat - lat_delta),
+        max(-180.0, lng - lng_delta),
+        min(90.0, lat + lat_delta),
+        min(180.0, lng + lng_delta),
+    )
+
+
+def to_microdegrees(value):
+    return round(Decimal(str(value)) * 1_000_000)
+
+
+def encode_geohash(lat, lng, precision=GEOHASH_PRECISION):
+    lat = min(max(float(lat), -90.0), 90.0)
+    lng = min(max(float(lng), -180.0), 180.0)
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(geohash) < precision:
+        value, value_range = (lng, lng_range) if even else (lat, lat_range)
+        middle = (value_range[0] + value_range[1]) / 2
+        if value >= middle:
+            bits = bits * 2 + 1
+            value_range[0] = middle
+        else:
+            bits = bits * 2
+            value_range[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(geohash)
+
+
+class GridIndex:
+    """Uniform latitude/longitude grid over points for radius searches.
+
+    Each point lands in a square cell of `cell_size` degrees, so a radius
+    search only computes distances for points in the cells overlapping the
+    circle's bounding box instead of for every point.
+    """
+
+    def __init__(self, points, cell_size=0.1):
+        self.cell_size = cell_size
+        self.cells = defaultdict(list)
+        self.size = 0
+        for key, lat, lng in points:
+            self.cells[self._cell(lat, lng)].append((float(lat), float(lng), key))
+            self.size += 1
+
+    def __len__(self):
+        return self.size
+
+    def _cell(self, lat, lng):
+        return (
+            math.floor(float(lat) / self.cell_size),
+            math.floor(float(lng) / self.cell_size),
+        )
+
+    def nearby(self, lat, lng, radius_km, limit=None):
+        """Return [(distance_km, key), ...] within radius_km, nearest first."""
+        min_lat, min_lng, max_lat, max_lng = bounding_box(lat, lng, radius_km)
+        min_x, min_y = self._cell(min_lat, min_lng)
+        max_x, max_y = self._cell(max_lat, max_lng)
+
+        results = []
+        for x in range(min_x, max_x + 1):
+            for y in range(min_y, max_y + 1):
+                for point_lat, point_lng, key in self.cells.get((x, y), ()):
+                    if not (
+                        min_lat <= point_lat <= max_lat
+                        and min_lng <= point_lng <= max_lng
+                    ):
+                        continue
+                    distance = haversine(lat, lng, point_lat, point_lng)
+                    if distance <= radius_km:
+                        results.append((distance, key))
+
+        results.sort()
+        return results[:limit] if limit else results
+
+    def nearest(self, lat, lng, max_radius_km):
+        """Return (distance_km, key) of the nearest point, or None if too far."""
+        radius = self.cell_size * KM_PER_DEGREE
+        while True:
+            radius = min(radius, max_radius_km)
+            results = self.nearby(lat, lng, radius, limit=1)
+            if results:
+                return results[0]
+            if radius >= max_radius_km:
+                return None
+            radius *= 2
+
+
+class VersionedIndex:
+    """Per-worker in-memory index rebuilt lazily when its data changes.
+
+    Gunicorn workers don't share memory, so the version lives in the shared
+    cache: `invalidate()` stores a new token and every worker notices it on
+    its next `get()`.
+    """
+
+    def __init__(self, cache_key, build):
+        self.cache_key = cache_key
+        self.build = build
+        self.index = None
+        self.version = None
+
+    def current_version(self):
+        version = cache.get(self.cache_key)
+        if version is None:
+            cache.add(self.cache_key, uuid4().hex, timeout=None)
+            version = cache.get(self.cache_key)
+        return version
+
+    def get(self):
+        version = self.current_version()
+        if self.index is None or version != self.version:
+            self.index = self.build()
+            self.version = version
+        return self.index
+
+    def invalidate(self):
+        cache.set(self.cache_key, uuid4().hex, timeout=None)
@@ -0,0 +1,80 @@
+import statistics
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import get_template
+
+from missas.core.cards import CARD_TEMPLATE, card_rows
+from missas.core.models import City, Schedule
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark reading a city's schedules for its cards as model instances "
+        "against card rows"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--city", help="Slug of the city, defaults to the one with most schedules"
+        )
+        parser.add_argument("--rounds", type=int, default=20)
+
+    def handle(self, *args, **options):
+        cities = City.objects.order_by("-schedule_count")
+        if options["city"]:
+            cities = cities.filter(slug=options["city"])
+        city = cities.first()
+        if city is None:
+            raise CommandError("No such city, load the fixtures first")
+        if city.schedule_count < 500:
+            self.stderr.write(
+                f"{city} has only {city.schedule_count} schedules, the difference "
+                "shows with 500 or more"
+            )
+
+        schedules = Schedule.objects.filter(parish__city=city).order_by(
+            "day", "start_time", "-verified_at", "id"
+        )
+        template = get_template(CARD_TEMPLATE)
+
+        def instances():
+            return list(
+                schedules.select_related(
+                    "parish",
+                    "parish__city",
+                    "parish__city__state",
+                    "source",
+                    "location",
+                ).prefetch_related("parish__contact")
+            )
+
+        def rows():
+            return card_rows(schedules)
+
+        self.stdout.write(
+            f"{city}: {city.schedule_count} schedules, {options['rounds']} rounds"
+        )
+        for label, fetch in (("Schedule instances", instances), ("Card rows", rows)):
+            # Measured apart, tracing allocations slows everything down
+            tracemalloc.start()
+            fetch()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            fetch_timings, render_timings = [], []
+            for _ in range(options["rounds"]):
+                start = time.perf_counter()
+                schedules_read = fetch()
+                fetched = time.perf_counter()
+                for schedule in schedules_read:
+                    template.render({"schedule": schedule})
+                fetch_timings.append((fetched - start) * 1000)
+                render_timings.append((time.perf_counter() - fetched) * 1000)
+
+            self.stdout.write(
+                f"{label}: fetch median {statistics.median(fetch_timings):.1f}ms, "
+                f"render median {statistics.median(render_timings):.1f}ms, "
+                f"peak memory {peak / 1024:.0f}KB"
+            )
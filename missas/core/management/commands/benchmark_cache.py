@@ -0,0 +1,105 @@
+import random
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.core.cache.backends.db import DatabaseCache
+from django.core.management.base import BaseCommand
+from django.core.management.commands.createcachetable import (
+    Command as CreateCacheTable,
+)
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+
+from missas.core.cache_backends import SQLiteCache
+
+TABLE = "benchmark_cache"
+
+
+class Command(BaseCommand):
+    help = "Benchmark the SQLite file cache against DatabaseCache under concurrency"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument(
+            "--operations", type=int, default=2_000, help="Requests per worker"
+        )
+        parser.add_argument(
+            "--keys", type=int, default=5_000, help="Distinct pages requested"
+        )
+        parser.add_argument(
+            "--value-size", type=int, default=30_000, help="Bytes per cached page"
+        )
+        parser.add_argument(
+            "--max-size",
+            type=int,
+            default=64 * 1024 * 1024,
+            help="Byte limit of the SQLite file cache",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        create_table = CreateCacheTable()
+        create_table.verbosity = 0
+        create_table.create_table(DEFAULT_DB_ALIAS, TABLE, dry_run=False)
+
+        with tempfile.TemporaryDirectory() as directory:
+            sqlite_cache = SQLiteCache(
+                str(Path(directory) / "cache.sqlite3"),
+                {"OPTIONS": {"MAX_SIZE": options["max_size"]}},
+            )
+            backends = [
+                ("DatabaseCache (MAX_ENTRIES=300)", DatabaseCache(TABLE, {})),
+                ("SQLiteCache", sqlite_cache),
+            ]
+            try:
+                for label, backend in backends:
+                    self.run(label, backend, options)
+            finally:
+                with connection.cursor() as cursor:
+                    cursor.execute(f"DROP TABLE {TABLE}")  # noqa: S608
+
+            stats = sqlite_cache.stats()
+            self.stdout.write(
+                f"\nSQLiteCache stats: {stats['hits']} hits, {stats['misses']} misses, "
+                f"{stats['evictions']} evictions, {stats['entries']} entries, "
+                f"{stats['size'] / 1024 / 1024:.1f}MB"
+            )
+
+    def run(self, label, backend, options):
+        value = b"x" * options["value_size"]
+
+        def worker(seed):
+            # Skewed like real traffic: a few cities get most of the requests
+            rng = random.Random(seed)  # noqa: S311
+            latencies, hits = [], 0
+            for _ in range(options["operations"]):
+                key = f"page:{int(options['keys'] * rng.random() ** 3)}"
+                start = time.perf_counter()
+                if backend.get(key) is None:
+                    backend.set(key, value, timeout=3600)
+                else:
+                    hits += 1
+                latencies.append(time.perf_counter() - start)
+            connections.close_all()
+            return latencies, hits
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(options["workers"]) as executor:
+            results = list(
+                executor.map(
+                    worker,
+                    [options["seed"] + i for i in range(options["workers"])],
+                )
+            )
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(latency for result, _ in results for latency in result)
+        hits = sum(hits for _, hits in results)
+        self.stdout.write(
+            f"{label}: {len(latencies) / elapsed:.0f} ops/s, "
+            f"p50 {statistics.median(latencies) * 1000:.2f}ms, "
+            f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:.2f}ms, "
+            f"hit ratio {hits / len(latencies):.0%}"
+        )
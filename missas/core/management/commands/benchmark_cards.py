@@ -0,0 +1,78 @@
+import statistics
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import get_template
+
+from missas.core.cards import (
+    CARD_TEMPLATE,
+    card_cache_key,
+    render_cards,
+    template_version,
+)
+from missas.core.models import City, Schedule
+
+
+class Command(BaseCommand):
+    help = "Benchmark rendering the schedule cards against reading them from the cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--city", help="Slug of the city, defaults to the one with most schedules"
+        )
+        parser.add_argument("--rounds", type=int, default=20)
+
+    def handle(self, *args, **options):
+        cities = City.objects.order_by("-schedule_count")
+        if options["city"]:
+            cities = cities.filter(slug=options["city"])
+        city = cities.first()
+        if city is None:
+            raise CommandError("No such city, load the fixtures first")
+
+        # The cards of a single page, as by_city renders them
+        schedules = list(
+            Schedule.objects.filter(parish__city=city)
+            .select_related(
+                "parish",
+                "parish__city",
+                "parish__city__state",
+                "source",
+                "location",
+            )
+            .prefetch_related("parish__contact")
+            .order_by("day", "start_time", "-verified_at", "id")
+        )
+
+        template = get_template(CARD_TEMPLATE)
+        version = template_version(template)
+        keys = [card_cache_key(schedule, version) for schedule in schedules]
+
+        def uncached():
+            for schedule in schedules:
+                template.render({"schedule": schedule})
+
+        def cold():
+            cache.delete_many(keys)
+            render_cards(schedules)
+
+        def warm():
+            render_cards(schedules)
+
+        self.stdout.write(f"{city}: {len(schedules)} cards, {options['rounds']} rounds")
+        for label, function in (
+            ("Template render", uncached),
+            ("render_cards, cold cache", cold),
+            ("render_cards, warm cache", warm),
+        ):
+            timings = []
+            for _ in range(options["rounds"]):
+                start = time.perf_counter()
+                function()
+                timings.append((time.perf_counter() - start) * 1000)
+            self.stdout.write(
+                f"{label}: median {statistics.median(timings):.1f}ms, "
+                f"max {max(timings):.1f}ms"
+            )
+        cache.delete_many(keys)
@@ -0,0 +1,75 @@
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from missas.core.distances import LocationSnapshot
+from missas.core.geo import GridIndex, haversine
+
+# Rough bounding box of Brazil
+MIN_LAT, MAX_LAT = -33.7, 5.3
+MIN_LNG, MAX_LNG = -74.0, -34.8
+
+
+class Command(BaseCommand):
+    help = "Benchmark the nearby search over synthetic Location snapshots"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=[1_000, 10_000, 100_000],
+            help="Numbers of synthetic locations",
+        )
+        parser.add_argument(
+            "--queries", type=int, default=20, help="Number of timed queries"
+        )
+        parser.add_argument("--radius", type=float, default=5)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])  # noqa: S311
+        radius = options["radius"]
+
+        for size in options["sizes"]:
+            ids = list(range(size))
+            latitudes = [Decimal(f"{rng.uniform(MIN_LAT, MAX_LAT):.8f}") for _ in ids]
+            longitudes = [Decimal(f"{rng.uniform(MIN_LNG, MAX_LNG):.8f}") for _ in ids]
+            queries = [
+                (rng.uniform(MIN_LAT, MAX_LAT), rng.uniform(MIN_LNG, MAX_LNG))
+                for _ in range(options["queries"])
+            ]
+            self.stdout.write(f"\n{size} locations, within {radius} km:")
+
+            def row_by_row(lat, lng):
+                return sorted(
+                    (distance, pk)
+                    for pk, other_lat, other_lng in zip(ids, latitudes, longitudes)
+                    if (distance := haversine(lat, lng, other_lat, other_lng)) <= radius
+                )
+
+            self.time("Row by row (Decimal)", queries, row_by_row)
+
+            grid = GridIndex(
+                (pk, float(lat), float(lng))
+                for pk, lat, lng in zip(ids, latitudes, longitudes)
+            )
+            self.time(
+                "Grid index", queries, lambda lat, lng: grid.nearby(lat, lng, radius)
+            )
+
+            snapshot = LocationSnapshot(ids, latitudes, longitudes)
+            self.time(
+                "NumPy snapshot",
+                queries,
+                lambda lat, lng: snapshot.within(lat, lng, radius),
+            )
+
+    def time(self, label, queries, function):
+        start = time.perf_counter()
+        for lat, lng in queries:
+            function(lat, lng)
+        elapsed_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        self.stdout.write(f"  {label}: {elapsed_ms:.3f}ms per query")
@@ -0,0 +1,95 @@
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from missas.core.geo import GridIndex, haversine
+
+# Rough bounding box of Brazil
+MIN_LAT, MAX_LAT = -33.7, 5.3
+MIN_LNG, MAX_LNG = -74.0, -34.8
+
+
+class Command(BaseCommand):
+    help = "Benchmark the in-memory grid index used by the nearby search"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--locations",
+            type=int,
+            default=50_000,
+            help="Number of synthetic locations",
+        )
+        parser.add_argument(
+            "--queries",
+            type=int,
+            default=1_000,
+            help="Number of lookups to time",
+        )
+        parser.add_argument(
+            "--radius",
+            type=float,
+            default=5,
+            help="Search radius in km",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])  # noqa: S311
+        radius = options["radius"]
+
+        # Parishes concentrate in cities, so cluster the points around centers
+        centers = [
+            (rng.uniform(MIN_LAT, MAX_LAT), rng.uniform(MIN_LNG, MAX_LNG))
+            for _ in range(500)
+        ]
+        points = []
+        for i in range(options["locations"]):
+            lat, lng = rng.choice(centers)
+            points.append(
+                (
+                    i,
+                    Decimal(f"{lat + rng.gauss(0, 0.1):.8f}"),
+                    Decimal(f"{lng + rng.gauss(0, 0.1):.8f}"),
+                )
+            )
+        queries = [
+            (lat + rng.gauss(0, 0.05), lng + rng.gauss(0, 0.05))
+            for lat, lng in (rng.choice(centers) for _ in range(options["queries"]))
+        ]
+
+        start = time.perf_counter()
+        index = GridIndex(points)
+        build_ms = (time.perf_counter() - start) * 1000
+        self.stdout.write(f"Built index of {len(index)} locations in {build_ms:.1f}ms")
+
+        timings = []
+        found = 0
+        for lat, lng in queries:
+            start = time.perf_counter()
+            found += len(index.nearby(lat, lng, radius))
+            timings.append((time.perf_counter() - start) * 1000)
+        self.report("Grid index", timings, found)
+
+        timings = []
+        found = 0
+        for lat, lng in queries[:50]:
+            start = time.perf_counter()
+            found += sum(
+                1
+                for _, point_lat, point_lng in points
+                if haversine(lat, lng, point_lat, point_lng) <= radius
+            )
+            timings.append((time.perf_counter() - start) * 1000)
+        self.report("Linear scan (50 queries)", timings, found)
+
+    def report(self, label, timings, found):
+        timings.sort()
+        p99 = timings[int(len(timings) * 0.99) - 1] if len(timings) > 1 else timings[0]
+        self.stdout.write(
+            f"{label}: mean={statistics.mean(timings):.3f}ms "
+            f"p50={statistics.median(timings):.3f}ms p99={p99:.3f}ms "
+            f"results={found}"
+        )
@@ -0,0 +1,267 @@
+import logging
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.handlers.base import BaseHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import got_request_exception
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    OperationalError,
+    close_old_connections,
+    connection,
+    connections,
+    transaction,
+)
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+
+from missas.core.models import City, Parish, Schedule, State
+from missas.core.routers import READER_ALIAS
+from missas.core.sqlite import pragmas
+from missas.core.views import DAY_NAMES
+
+# The page cache would hide the database, every request has to reach it
+CACHE_MIDDLEWARE = (
+    "missas.core.middleware.UpdateCacheMiddleware",
+    "missas.core.middleware.FetchFromCacheMiddleware",
+)
+
+
+def _configurations(database):
+    """{label: (pragmas, database settings)} compared by the benchmark."""
+    defaults = {**database, "CONN_MAX_AGE": 0, "OPTIONS": {}}
+    tuned = {**database, "CONN_MAX_AGE": 0}
+    return {
+        "SQLite defaults": (
+            {"journal_mode": "DELETE", "synchronous": "FULL"},
+            defaults,
+        ),
+        "SQLITE_PRAGMAS": (settings.SQLITE_PRAGMAS, defaults),
+        "+ IMMEDIATE transactions": (settings.SQLITE_PRAGMAS, tuned),
+        "+ persistent connections": (
+            settings.SQLITE_PRAGMAS,
+            {**tuned, "CONN_MAX_AGE": None},
+        ),
+    }
+
+
+def _percentile(latencies, fraction):
+    if not latencies:
+        return 0
+    return latencies[min(int(len(latencies) * fraction), len(latencies) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark SQLite configurations with a mix of page views, admin edits "
+        "and contact requests run against a copy of the database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument(
+            "--operations", type=int, default=250, help="Operations per worker"
+        )
+        parser.add_argument(
+            "--edits",
+            type=float,
+            default=0.1,
+            help="Fraction of the operations that edit a schedule, as the admin",
+        )
+        parser.add_argument(
+            "--contacts",
+            type=float,
+            default=0.05,
+            help="Fraction of the operations that create a contact request",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("The default database isn't SQLite")
+
+        self.paths = self.page_paths()
+        self.schedule_ids = list(Schedule.objects.values_list("id", flat=True))
+        if not self.paths or not self.schedule_ids:
+            raise CommandError("No schedules to benchmark with, load the data first")
+
+        self.factory = RequestFactory()
+        with override_settings(
+            MIDDLEWARE=[m for m in settings.MIDDLEWARE if m not in CACHE_MIDDLEWARE]
+        ):
+            self.handler = BaseHandler()
+            self.handler.load_middleware()
+
+        # Views answer exceptions with a 500, this is how to tell lock errors
+        self.lock_errors = 0
+        self.lock_errors_lock = threading.Lock()
+        got_request_exception.connect(self.count_exception)
+        request_logger = logging.getLogger("django.request")
+        level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+
+        # Connections opened from now on, in any thread, use the copies. The
+        # settings are swapped for new dicts, the real ones are left untouched
+        original_settings = connections.settings
+        original = original_settings[DEFAULT_DB_ALIAS]
+        connections.close_all()
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                configurations = _configurations(original).items()
+                for i, (label, (config, database)) in enumerate(configurations):
+                    path = Path(directory) / f"{i}.sqlite3"
+                    self.copy_database(original["NAME"], path)
+                    databases = {
+                        **original_settings,
+                        DEFAULT_DB_ALIAS: {**database, "NAME": str(path)},
+                    }
+                    if READER_ALIAS in original_settings:
+                        databases[READER_ALIAS] = {
+                            **original_settings[READER_ALIAS],
+                            "NAME": f"file:{path}?mode=ro",
+                        }
+                    connections.settings = databases
+                    # The edits' signals invalidate the cache and purge the
+                    # CDN, which must be the copy's and none, not production's
+                    caches = {
+                        "default": {
+                            **settings.CACHES["default"],
+                            "LOCATION": str(Path(directory) / f"{i}.cache.sqlite3"),
+                        }
+                    }
+                    with override_settings(
+                        SQLITE_PRAGMAS=config,
+                        ALLOWED_HOSTS=["*"],
+                        CACHES=caches,
+                        CDN_PURGE_URL="",
+                    ):
+                        self.run(label, options)
+                    connections.close_all()
+        finally:
+            connections.close_all()
+            connections.settings = original_settings
+            got_request_exception.disconnect(self.count_exception)
+            request_logger.setLevel(level)
+
+    def page_paths(self):
+        paths = [reverse("index")]
+        paths += [
+            reverse("cities_by_state", kwargs={"state": slug})
+            for slug in State.objects.values_list("slug", flat=True)
+        ]
+        for state, city in City.objects.filter_with_schedule().values_list(
+            "state__slug", "slug"
+        ):
+            url = reverse("by_city", kwargs={"state": state, "city": city})
+            paths += [
+                f"{url}?tipo=missas&dia={day}&horario={hour}"
+                for day in DAY_NAMES
+                for hour in (0, 8, 18)
+            ]
+        paths += [
+            reverse(
+                "parish_detail",
+                kwargs={"state": state, "city": city, "parish": parish},
+            )
+            for state, city, parish in Parish.objects.values_list(
+                "city__state__slug", "city__slug", "slug"
+            )
+        ]
+        return paths
+
+    def copy_database(self, source, destination):
+        # The backup API copies a consistent snapshot even while it's written
+        source_db = sqlite3.connect(source)
+        destination_db = sqlite3.connect(destination)
+        try:
+            source_db.backup(destination_db)
+        finally:
+            source_db.close()
+            destination_db.close()
+
+    def count_exception(self, sender, **kwargs):
+        error = sys.exc_info()[1]
+        if isinstance(error, OperationalError) and "locked" in str(error):
+            with self.lock_errors_lock:
+                self.lock_errors += 1
+
+    def run(self, label, options):
+        self.lock_errors = 0
+
+        def worker(seed):
+            rng = random.Random(seed)  # noqa: S311
+            latencies = {"read": [], "write": []}
+            try:
+                for _ in range(options["operations"]):
+                    roll = rng.random()
+                    start = time.perf_counter()
+                    if roll < options["edits"]:
+                        kind = "write"
+                        self.edit_schedule(rng)
+                    elif roll < options["edits"] + options["contacts"]:
+                        kind = "write"
+                        self.create_contact(rng)
+                    else:
+                        kind = "read"
+                        # Skewed like real traffic: a few pages get most views
+                        path = self.paths[int(len(self.paths) * rng.random() ** 3)]
+                        self.handler.get_response(self.factory.get(path))
+                    latencies[kind].append(time.perf_counter() - start)
+                    # What request_finished does after each request
+                    close_old_connections()
+            finally:
+                connections.close_all()
+            return latencies
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(options["workers"]) as executor:
+            results = list(
+                executor.map(
+                    worker, [options["seed"] + i for i in range(options["workers"])]
+                )
+            )
+        elapsed = time.perf_counter() - start
+
+        reads = sorted(latency for result in results for latency in result["read"])
+        writes = sorted(latency for result in results for latency in result["write"])
+        applied = ", ".join(
+            f"{name}={value}" for name, value in pragmas(connection).items()
+        )
+        self.stdout.write(
+            f"{label} ({applied}): "
+            f"{(len(reads) + len(writes)) / elapsed:.0f} ops/s, "
+            f"reads p50 {_percentile(reads, 0.5) * 1000:.1f}ms "
+            f"p99 {_percentile(reads, 0.99) * 1000:.1f}ms, "
+            f"writes p50 {_percentile(writes, 0.5) * 1000:.1f}ms "
+            f"p99 {_percentile(writes, 0.99) * 1000:.1f}ms, "
+            f"{self.lock_errors} lock errors"
+        )
+
+    def edit_schedule(self, rng):
+        # What saving the admin's change form does
+        try:
+            with transaction.atomic():
+                schedule = Schedule.objects.get(pk=rng.choice(self.schedule_ids))
+                schedule.verified_at = date.today() - timedelta(days=rng.randrange(30))
+                schedule.save()
+        except OperationalError as error:
+            if "locked" not in str(error):
+                raise
+            with self.lock_errors_lock:
+                self.lock_errors += 1
+
+    def create_contact(self, rng):
+        request = self.factory.post(
+            reverse("create_contact"),
+            {"ddd": "84", "number": f"9{rng.randrange(10**8):08d}"},
+        )
+        self.handler.get_response(request)
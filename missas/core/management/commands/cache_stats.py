@@ -0,0 +1,23 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Show the hits, misses, evictions and size of the cache"
+
+    def handle(self, *args, **options):
+        if not hasattr(cache, "stats"):
+            self.stdout.write(self.style.WARNING("The cache backend has no stats"))
+            return
+
+        stats = cache.stats()
+        requests = stats["hits"] + stats["misses"]
+        ratio = stats["hits"] / requests if requests else 0
+        self.stdout.write(f"Hits: {stats['hits']} ({ratio:.1%})")
+        self.stdout.write(f"Misses: {stats['misses']}")
+        self.stdout.write(f"Evictions: {stats['evictions']}")
+        self.stdout.write(f"Entries: {stats['entries']}")
+        self.stdout.write(
+            f"Size: {stats['size'] / 1024 / 1024:.1f}MB "
+            f"of {stats['max_size'] / 1024 / 1024:.1f}MB"
+        )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from missas.core.city_centroids import compute_city_centroids
+
+
+class Command(BaseCommand):
+    help = "Recompute the centroid and bounding box of every city with locations"
+
+    def handle(self, *args, **options):
+        count = compute_city_centroids()
+        self.stdout.write(
+            self.style.SUCCESS(f"✓ Centroids computed for {count} cities")
+        )
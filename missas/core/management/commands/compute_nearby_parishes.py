@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from missas.core.nearby_parishes import (
+    NEARBY_PARISHES_K,
+    NEARBY_PARISHES_RADIUS_KM,
+    compute_nearby_parishes,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        f"Recompute the {NEARBY_PARISHES_K} nearest parishes "
+        f"(up to {NEARBY_PARISHES_RADIUS_KM} km) of every parish with a location"
+    )
+
+    def handle(self, *args, **options):
+        count = compute_nearby_parishes()
+        self.stdout.write(
+            self.style.SUCCESS(f"✓ Nearby parishes computed for {count} parishes")
+        )
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from missas.core.export import geojson_chunks
+
+
+class Command(BaseCommand):
+    help = "Export every location with its parishes and schedules as GeoJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            "-o",
+            help="File to write to (defaults to stdout)",
+        )
+
+    def handle(self, *args, **options):
+        if not options["output"]:
+            for chunk in geojson_chunks():
+                self.stdout.write(chunk, ending="")
+            return
+
+        with open(options["output"], "w", encoding="utf-8") as output:
+            for chunk in geojson_chunks():
+                output.write(chunk)
+        self.stdout.write(
+            self.style.SUCCESS(f"✓ GeoJSON exported to {options['output']}")
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from missas.core.stats import reconcile_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the home page counters from scratch"
+
+    def handle(self, *args, **options):
+        stats = reconcile_stats()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✓ Counters reconciled: {stats.cities_with_parishes} cities, "
+                f"{stats.parishes} parishes, {stats.locations} locations, "
+                f"{stats.schedules} schedules, {stats.verified_schedules} verified"
+            )
+        )
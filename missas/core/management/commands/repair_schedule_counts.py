@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from missas.core.schedule_counts import repair_schedule_counts
+
+
+class Command(BaseCommand):
+    help = "Recount the schedules of every parish and city, fixing the wrong ones"
+
+    def handle(self, *args, **options):
+        repaired = repair_schedule_counts()
+        self.stdout.write(
+            self.style.SUCCESS(f"✓ Schedule counts repaired for {repaired} rows")
+        )
@@ -0,0 +1,123 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.handlers.base import BaseHandler
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import RequestFactory
+from django.urls import reverse
+
+from missas.core.models import City, Parish, State
+from missas.core.views import DAY_NAMES
+from missas.core.week import brazil_now
+
+SCHEDULE_TYPES = ("missas", "confissoes")
+
+
+def _default_host():
+    # The cache key includes the host, so warm the one visitors use
+    for host in settings.ALLOWED_HOSTS:
+        if not host.startswith((".", "*")):
+            return host
+    return "localhost"
+
+
+class Command(BaseCommand):
+    help = "Render the pages visitors hit first into the cache, e.g. after a deploy"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument(
+            "--hours",
+            type=int,
+            default=2,
+            help="Hours of the city pages to warm, starting at the current one",
+        )
+        parser.add_argument("--host", default=None, help="Defaults to ALLOWED_HOSTS")
+        parser.add_argument(
+            "--https",
+            action="store_true",
+            help="Warm the https URLs, if the server sees requests as secure",
+        )
+
+    def handle(self, *args, **options):
+        self.factory = RequestFactory(HTTP_HOST=options["host"] or _default_host())
+        self.secure = options["https"]
+        self.handler = BaseHandler()
+        self.handler.load_middleware()
+
+        paths = list(self.paths(options["hours"]))
+        counts = {"warmed": 0, "fresh": 0, "failed": 0}
+        start = time.perf_counter()
+        with ThreadPoolExecutor(options["workers"]) as executor:
+            for path, status, elapsed in executor.map(self.warm, paths):
+                if status is None:
+                    counts["fresh"] += 1
+                    continue
+                counts["warmed" if status == 200 else "failed"] += 1
+                self.stdout.write(f"{status} {elapsed * 1000:.0f}ms {path}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✓ {counts['warmed']} pages warmed, {counts['fresh']} already "
+                f"fresh, {counts['failed']} failed in "
+                f"{time.perf_counter() - start:.1f}s"
+            )
+        )
+
+    def paths(self, hours):
+        yield reverse("index")
+        for state in State.objects.order_by("name"):
+            yield reverse("cities_by_state", kwargs={"state": state.slug})
+
+        # by_city redirects to the filters of the current hour, so warm
+        # those and the next ones instead of the redirect itself
+        now = brazil_now().replace(minute=0, second=0, microsecond=0)
+        moments = [now + timedelta(hours=i) for i in range(hours)]
+        for city in (
+            City.objects.filter_with_schedule().select_related("state").order_by("id")
+        ):
+            url = reverse(
+                "by_city", kwargs={"state": city.state.slug, "city": city.slug}
+            )
+            for moment in moments:
+                for type_name in SCHEDULE_TYPES:
+                    yield (
+                        f"{url}?tipo={type_name}&dia={DAY_NAMES[moment.weekday()]}"
+                        f"&horario={moment.hour}"
+                    )
+
+        for parish in Parish.objects.select_related("city", "city__state").order_by(
+            "id"
+        ):
+            yield reverse(
+                "parish_detail",
+                kwargs={
+                    "state": parish.city.state.slug,
+                    "city": parish.city.slug,
+                    "parish": parish.slug,
+                },
+            )
+
+    def warm(self, path):
+        """Render `path` through the middleware, returning (path, status, seconds).
+
+        Status is None if the page was served from the cache, i.e. it was
+        fresh or another request is rebuilding it, so an interrupted run can
+        simply be started again.
+        """
+        try:
+            request = self.request(path)
+            start = time.perf_counter()
+            response = self.handler.get_response(request)
+            if not request._cache_update_cache:
+                return path, None, 0
+            return path, response.status_code, time.perf_counter() - start
+        finally:
+            # What request_finished does for the requests of the server
+            connections.close_all()
+
+    def request(self, path):
+        return self.factory.get(path, secure=self.secure)
@@ -1,24 +1,92 @@
+import math
+
 from django.db import models
-from django.db.models import Case, Count, When
+from django.db.models import F, Q
+
+from missas.core.geo import bounding_box, haversine
+from missas.core.week import MINUTES_PER_DAY, MINUTES_PER_WEEK, minutes_of_week_window
 
 
 class CityQuerySet(models.QuerySet):
+    # Both come from the columns maintained by missas.core.schedule_counts,
+    # the annotations only keep the names the callers already use
     def annotate_number_of_schedules(self):
-        return self.annotate(number_of_schedules=Count("parishes__schedules"))
+        return self.annotate(number_of_schedules=F("schedule_count"))
 
     def annotate_has_schedules(self):
-        return self.annotate_number_of_schedules().annotate(
-            has_schedules=Case(
-                When(number_of_schedules__gt=0, then=True),
-                default=False,
-                output_field=models.BooleanField(),
-            )
-        )
+        return self.annotate_number_of_schedules()
 
     def filter_with_schedule(self):
         return self.annotate_has_schedules().filter(has_schedules=True)
 
 
+def window_filter(start, duration):
+    """Q of the schedules taking place during [start, start + duration).
+
+    `start` is a minute of the week and the window may wrap into the next
+    week. Schedules that started before it are included while they last,
+    i.e. until their end, which is never more than a day after their start.
+    Every branch is a range on start_minute_of_week, so an index on it
+    serves them all.
+    """
+    window = Q()
+    for low, high in minutes_of_week_window(start, duration):
+        window |= Q(start_minute_of_week__gte=low, start_minute_of_week__lt=high)
+
+    # Started up to a day before. Those that started the week before have
+    # their minutes counted from that week's start, as does their end
+    start %= MINUTES_PER_WEEK
+    for low, high in minutes_of_week_window(start - MINUTES_PER_DAY, MINUTES_PER_DAY):
+        offset = MINUTES_PER_WEEK if low > start else 0
+        window |= Q(
+            start_minute_of_week__gte=low,
+            start_minute_of_week__lt=high,
+            end_minute_of_week__gte=start + offset,
+        )
+    return window
+
+
 class ScheduleQuerySet(models.QuerySet):
     def filter_verified(self):
         return self.filter(verified_at__isnull=False)
+
+    def in_window(self, start, duration):
+        return self.filter(window_filter(start, duration))
+
+
+class LocationQuerySet(models.QuerySet):
+    def within_bbox(self, min_lat, min_lng, max_lat, max_lng):
+        return self.filter(
+            latitude_e6__range=(
+                math.floor(min_lat * 1_000_000),
+                math.ceil(max_lat * 1_000_000),
+            ),
+            longitude_e6__range=(
+                math.floor(min_lng * 1_000_000),
+                math.ceil(max_lng * 1_000_000),
+            ),
+        )
+
+    def in_geohash(self, prefix):
+        # A range instead of LIKE because SQLite's LIKE is case-insensitive and
+        # can't use the index
+        return self.filter(geohash__gte=prefix, geohash__lt=prefix + "~")
+
+    def near(self, lat, lng, radius_km):
+        """Return the locations within radius_km ordered by distance.
+
+        The bounding box is filtered in SQL using the indexed integer columns,
+        so only the candidates get the exact distance, set as `distance` (km).
+        """
+        locations = []
+        for location in self.within_bbox(*bounding_box(lat, lng, radius_km)):
+            location.distance = haversine(
+                lat,
+                lng,
+                location.latitude_e6 / 1_000_000,
+                location.longitude_e6 / 1_000_000,
+            )
+            if location.distance <= radius_km:
+                locations.append(location)
+        locations.sort(key=lambda location: location.distance)
+        return locations
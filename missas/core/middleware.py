@@ -0,0 +1,104 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponseBase
+from django.middleware import cache
+from django.utils.cache import (
+    get_cache_key,
+    patch_cache_control,
+    patch_response_headers,
+)
+
+from missas.core.cache_tags import is_fresh
+
+# Seconds a worker has to rebuild a stale page before another one may try
+REBUILD_LEASE_SECONDS = 30
+
+
+def rebuild_lease_key(cache_key):
+    return f"rebuild:{cache_key}"
+
+
+class StaleCache:
+    """Proxy of the page cache keeping entries past their timeout, so there's
+    something to serve while they're rebuilt.
+
+    They're kept for as long again as their timeout, up to
+    CACHE_MIDDLEWARE_STALE_SECONDS. Responses record when they stop being
+    fresh and get the matching stale-while-revalidate hint for the CDN.
+    """
+
+    def __init__(self, cache):
+        self._cache = cache
+
+    def set(self, key, value, timeout):
+        stale = min(timeout, settings.CACHE_MIDDLEWARE_STALE_SECONDS)
+        if isinstance(value, HttpResponseBase):
+            value.cache_fresh_until = time.time() + timeout
+            patch_cache_control(value, stale_while_revalidate=stale)
+        self._cache.set(key, value, timeout + stale)
+
+    def __getattr__(self, name):
+        return getattr(self._cache, name)
+
+
+class UpdateCacheMiddleware(cache.UpdateCacheMiddleware):
+    """Store the cache tag versions the view read along with the response.
+
+    The tags are also sent as headers, for the CDN to purge the page along
+    with the cache. Cloudflare reads Cache-Tag, Fastly Surrogate-Key.
+    """
+
+    @property
+    def cache(self):
+        return StaleCache(caches[self.cache_alias])
+
+    def process_response(self, request, response):
+        versions = getattr(request, "cache_tag_versions", None)
+        if versions:
+            response.cache_tag_versions = versions
+            tags = sorted(versions)
+            response["Cache-Tag"] = ",".join(tags)
+            response["Surrogate-Key"] = " ".join(tags)
+        response = super().process_response(request, response)
+
+        # Whether the page was rebuilt or failed, let the next request try
+        lease_key = getattr(request, "_cache_rebuild_lease", None)
+        if lease_key:
+            self.cache.delete(lease_key)
+        return response
+
+
+class FetchFromCacheMiddleware(cache.FetchFromCacheMiddleware):
+    """Serve a stale cached response while a single request rebuilds it.
+
+    A response is stale once its timeout passes or any of its tags is
+    invalidated. The first request to find it so takes a lease in the cache
+    and rebuilds the page; the ones arriving meanwhile get the stale copy,
+    marked as already expired so no other cache keeps it, instead of all
+    rebuilding the same page at once.
+    """
+
+    def process_request(self, request):
+        response = super().process_request(request)
+        if response is None:
+            return None
+
+        versions = getattr(response, "cache_tag_versions", None)
+        fresh_until = getattr(response, "cache_fresh_until", None)
+        if (not versions or is_fresh(versions)) and (
+            fresh_until is None or time.time() < fresh_until
+        ):
+            return response
+
+        lease_key = rebuild_lease_key(
+            get_cache_key(request, self.key_prefix, "GET", cache=self.cache)
+        )
+        if self.cache.add(lease_key, True, REBUILD_LEASE_SECONDS):
+            request._cache_rebuild_lease = lease_key
+            request._cache_update_cache = True
+            return None
+
+        patch_response_headers(response, cache_timeout=0)
+        return response
@@ -0,0 +1,68 @@
+from django.db import migrations, models
+
+from missas.core.geo import encode_geohash, to_microdegrees
+
+
+def populate_indexed_coordinates(apps, schema_editor):
+    Location = apps.get_model("core", "Location")
+    db_alias = schema_editor.connection.alias
+
+    locations = list(Location.objects.using(db_alias).all())
+    for location in locations:
+        location.latitude_e6 = to_microdegrees(location.latitude)
+        location.longitude_e6 = to_microdegrees(location.longitude)
+        location.geohash = encode_geohash(location.latitude, location.longitude)
+    Location.objects.using(db_alias).bulk_update(
+        locations, ["latitude_e6", "longitude_e6", "geohash"], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0040_contactrequest_is_archived"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="location",
+            name="latitude_e6",
+            field=models.IntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="location",
+            name="longitude_e6",
+            field=models.IntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="location",
+            name="geohash",
+            field=models.CharField(editable=False, max_length=12, null=True),
+        ),
+        migrations.RunPython(
+            code=populate_indexed_coordinates,
+            reverse_code=migrations.RunPython.noop,
+        ),
+        migrations.AlterField(
+            model_name="location",
+            name="latitude_e6",
+            field=models.IntegerField(editable=False),
+        ),
+        migrations.AlterField(
+            model_name="location",
+            name="longitude_e6",
+            field=models.IntegerField(editable=False),
+        ),
+        migrations.AlterField(
+            model_name="location",
+            name="geohash",
+            field=models.CharField(db_index=True, editable=False, max_length=12),
+        ),
+        migrations.AddIndex(
+            model_name="location",
+            index=models.Index(
+                fields=["latitude_e6", "longitude_e6"],
+                name="core_locati_latitud_4ce862_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,60 @@
+from django.db import migrations, models
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def minute_of_week(day, time):
+    return day * MINUTES_PER_DAY + time.hour * 60 + time.minute
+
+
+def populate_minutes_of_week(apps, schema_editor):
+    Schedule = apps.get_model("core", "Schedule")
+    db_alias = schema_editor.connection.alias
+
+    schedules = list(Schedule.objects.using(db_alias).all())
+    for schedule in schedules:
+        start = minute_of_week(schedule.day, schedule.start_time)
+        end = start
+        if schedule.end_time:
+            end = minute_of_week(schedule.day, schedule.end_time)
+            if end < start:
+                end += MINUTES_PER_DAY
+        schedule.start_minute_of_week = start
+        schedule.end_minute_of_week = end
+    Schedule.objects.using(db_alias).bulk_update(
+        schedules, ["start_minute_of_week", "end_minute_of_week"], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0041_location_latitude_e6_longitude_e6_geohash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="schedule",
+            name="start_minute_of_week",
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="schedule",
+            name="end_minute_of_week",
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            code=populate_minutes_of_week,
+            reverse_code=migrations.RunPython.noop,
+        ),
+        migrations.AlterField(
+            model_name="schedule",
+            name="start_minute_of_week",
+            field=models.PositiveIntegerField(editable=False),
+        ),
+        migrations.AlterField(
+            model_name="schedule",
+            name="end_minute_of_week",
+            field=models.PositiveIntegerField(editable=False),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0042_schedule_minutes_of_week"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NearbyParish",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("distance", models.FloatField(help_text="km")),
+                ("rank", models.PositiveSmallIntegerField()),
+                (
+                    "nearby",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="core.parish",
+                    ),
+                ),
+                (
+                    "parish",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="nearby_parishes",
+                        to="core.parish",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("parish", "rank")},
+            },
+        ),
+    ]
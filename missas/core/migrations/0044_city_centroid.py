@@ -0,0 +1,87 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:06
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def populate_city_centroids(apps, schema_editor):
+    City = apps.get_model("core", "City")
+    Schedule = apps.get_model("core", "Schedule")
+    db_alias = schema_editor.connection.alias
+
+    points = defaultdict(set)
+    for city_id, lat, lng in (
+        Schedule.objects.using(db_alias)
+        .filter(location__isnull=False)
+        .values_list(
+            "parish__city_id", "location__latitude_e6", "location__longitude_e6"
+        )
+        .distinct()
+    ):
+        points[city_id].add((lat / 1_000_000, lng / 1_000_000))
+
+    cities = list(City.objects.using(db_alias).filter(pk__in=points))
+    for city in cities:
+        latitudes = [lat for lat, _ in points[city.pk]]
+        longitudes = [lng for _, lng in points[city.pk]]
+        city.latitude = sum(latitudes) / len(latitudes)
+        city.longitude = sum(longitudes) / len(longitudes)
+        city.min_latitude, city.max_latitude = min(latitudes), max(latitudes)
+        city.min_longitude, city.max_longitude = min(longitudes), max(longitudes)
+    City.objects.using(db_alias).bulk_update(
+        cities,
+        [
+            "latitude",
+            "longitude",
+            "min_latitude",
+            "min_longitude",
+            "max_latitude",
+            "max_longitude",
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0043_nearbyparish"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="city",
+            name="latitude",
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="city",
+            name="longitude",
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="city",
+            name="max_latitude",
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="city",
+            name="max_longitude",
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="city",
+            name="min_latitude",
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="city",
+            name="min_longitude",
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(
+            code=populate_city_centroids,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
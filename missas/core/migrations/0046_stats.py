@@ -0,0 +1,59 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:36
+
+from django.db import migrations, models
+
+
+def create_stats(apps, schema_editor):
+    Location = apps.get_model("core", "Location")
+    Parish = apps.get_model("core", "Parish")
+    Schedule = apps.get_model("core", "Schedule")
+    Stats = apps.get_model("core", "Stats")
+    db_alias = schema_editor.connection.alias
+
+    schedules = Schedule.objects.using(db_alias)
+    Stats.objects.using(db_alias).create(
+        pk=1,
+        cities_with_parishes=schedules.aggregate(
+            count=models.Count("parish__city", distinct=True)
+        )["count"],
+        parishes=Parish.objects.using(db_alias).count(),
+        locations=Location.objects.using(db_alias).count(),
+        schedules=schedules.count(),
+        verified_schedules=schedules.filter(verified_at__isnull=False).count(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0045_contact_created_at_updated_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Stats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("cities_with_parishes", models.PositiveIntegerField(default=0)),
+                ("parishes", models.PositiveIntegerField(default=0)),
+                ("locations", models.PositiveIntegerField(default=0)),
+                ("schedules", models.PositiveIntegerField(default=0)),
+                ("verified_schedules", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name_plural": "stats",
+            },
+        ),
+        migrations.RunPython(
+            code=create_stats,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
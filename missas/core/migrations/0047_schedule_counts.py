@@ -0,0 +1,69 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:38
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_schedules(apps, schema_editor):
+    City = apps.get_model("core", "City")
+    Parish = apps.get_model("core", "Parish")
+    Schedule = apps.get_model("core", "Schedule")
+    db_alias = schema_editor.connection.alias
+
+    for model, lookup in ((Parish, "parish"), (City, "parish__city")):
+        counts = (
+            Schedule.objects.using(db_alias)
+            .filter(**{lookup: OuterRef("pk")})
+            .order_by()
+            .values(lookup)
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        model.objects.using(db_alias).update(
+            schedule_count=Coalesce(Subquery(counts), 0)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0046_stats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="city",
+            name="schedule_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="parish",
+            name="schedule_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="city",
+            name="has_schedules",
+            field=models.GeneratedField(
+                db_index=True,
+                db_persist=True,
+                expression=models.Q(("schedule_count__gt", 0)),
+                output_field=models.BooleanField(),
+            ),
+        ),
+        migrations.AddField(
+            model_name="parish",
+            name="has_schedules",
+            field=models.GeneratedField(
+                db_index=True,
+                db_persist=True,
+                expression=models.Q(("schedule_count__gt", 0)),
+                output_field=models.BooleanField(),
+            ),
+        ),
+        migrations.RunPython(
+            code=count_schedules,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
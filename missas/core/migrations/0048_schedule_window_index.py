@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0047_schedule_counts"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="schedule",
+            index=models.Index(
+                fields=["parish", "type", "start_minute_of_week"],
+                name="core_schedu_parish__3223fa_idx",
+            ),
+        ),
+    ]
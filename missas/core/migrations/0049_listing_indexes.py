@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0048_schedule_window_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="city",
+            index=models.Index(
+                fields=["state", "-has_schedules", "name"],
+                name="core_city_by_state_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="city",
+            index=models.Index(
+                condition=models.Q(("has_schedules", True)),
+                fields=["state", "name"],
+                name="core_city_with_schedules_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="schedule",
+            index=models.Index(
+                fields=["location", "parish"], name="core_schedu_locatio_95961f_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="state",
+            index=models.Index(fields=["name"], name="core_state_name_bf6f8a_idx"),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:10
+
+from collections import defaultdict
+
+from django.db import migrations
+
+from missas.core.geo import GridIndex
+
+# As in missas.core.nearby_parishes when this migration was written
+NEARBY_PARISHES_K = 5
+NEARBY_PARISHES_RADIUS_KM = 30
+
+
+def populate_nearby_parishes(apps, schema_editor):
+    NearbyParish = apps.get_model("core", "NearbyParish")
+    Schedule = apps.get_model("core", "Schedule")
+    db_alias = schema_editor.connection.alias
+
+    locations = defaultdict(set)
+    for parish_id, lat, lng in (
+        Schedule.objects.using(db_alias)
+        .filter(location__isnull=False)
+        .values_list("parish_id", "location__latitude_e6", "location__longitude_e6")
+        .distinct()
+    ):
+        locations[parish_id].add((lat / 1_000_000, lng / 1_000_000))
+    coordinates = {
+        parish_id: (
+            sum(lat for lat, _ in points) / len(points),
+            sum(lng for _, lng in points) / len(points),
+        )
+        for parish_id, points in locations.items()
+    }
+
+    index = GridIndex((pk, lat, lng) for pk, (lat, lng) in coordinates.items())
+    rows = []
+    for parish_id, (lat, lng) in coordinates.items():
+        neighbours = [
+            (distance, pk)
+            for distance, pk in index.nearby(lat, lng, NEARBY_PARISHES_RADIUS_KM)
+            if pk != parish_id
+        ]
+        rows.extend(
+            NearbyParish(
+                parish_id=parish_id, nearby_id=pk, distance=distance, rank=rank
+            )
+            for rank, (distance, pk) in enumerate(neighbours[:NEARBY_PARISHES_K])
+        )
+
+    # Parishes whose locations changed since 0043 already have some rows
+    NearbyParish.objects.using(db_alias).all().delete()
+    NearbyParish.objects.using(db_alias).bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0049_listing_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            code=populate_nearby_parishes,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
@@ -6,7 +6,9 @@ from django.db import models
 from model_utils import FieldTracker
 from model_utils.tracker import FieldInstanceTracker
 
-from missas.core.managers import CityQuerySet, ScheduleQuerySet
+from missas.core.geo import encode_geohash, to_microdegrees
+from missas.core.managers import CityQuerySet, LocationQuerySet, ScheduleQuerySet
+from missas.core.week import MINUTES_PER_DAY, minute_of_week
 
 
 class MyFieldInstanceTracker(FieldInstanceTracker):
@@ -26,6 +28,35 @@ class User(AbstractUser):
     pass
 
 
+class ScheduleCounted(models.Model):
+    """Number of schedules, kept up to date by missas.core.schedule_counts."""
+
+    schedule_count = models.PositiveIntegerField(default=0, editable=False)
+    has_schedules = models.GeneratedField(
+        expression=models.Q(schedule_count__gt=0),
+        output_field=models.BooleanField(),
+        db_persist=True,
+        db_index=True,
+    )
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        # The count is changed with UPDATEs, saving a stale copy would undo them
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and not field.generated
+                and field.attname not in deferred
+                and field.name != "schedule_count"
+            ]
+        super().save(*args, **kwargs)
+
+
 class State(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -33,33 +64,59 @@ class State(models.Model):
     short_name = models.CharField(max_length=2)
     slug = models.SlugField(unique=True)
 
+    class Meta:
+        indexes = [models.Index(fields=["name"])]
+
     def __str__(self):
         return self.name
 
 
-class City(models.Model):
+class City(ScheduleCounted):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     name = models.CharField(max_length=254)
     slug = models.SlugField()
     state = models.ForeignKey(State, on_delete=models.CASCADE, related_name="cities")
+    # Derived from the parishes' locations by missas.core.city_centroids
+    latitude = models.FloatField(blank=True, null=True, editable=False)
+    longitude = models.FloatField(blank=True, null=True, editable=False)
+    min_latitude = models.FloatField(blank=True, null=True, editable=False)
+    min_longitude = models.FloatField(blank=True, null=True, editable=False)
+    max_latitude = models.FloatField(blank=True, null=True, editable=False)
+    max_longitude = models.FloatField(blank=True, null=True, editable=False)
 
     objects = CityQuerySet.as_manager()
 
     class Meta:
         unique_together = ("slug", "state")
+        indexes = [
+            # cities_by_state's order, cities with schedules first
+            models.Index(
+                fields=["state", "-has_schedules", "name"],
+                name="core_city_by_state_idx",
+            ),
+            # filter_with_schedule, SQLite doesn't use has_schedules' own index
+            # for a bare `WHERE has_schedules`
+            models.Index(
+                fields=["state", "name"],
+                condition=models.Q(has_schedules=True),
+                name="core_city_with_schedules_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name}/{self.state.short_name}"
 
 
-class Parish(models.Model):
+class Parish(ScheduleCounted):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     city = models.ForeignKey(City, on_delete=models.CASCADE, related_name="parishes")
     name = models.CharField(max_length=254)
     slug = models.SlugField(max_length=254)
 
+    tracker = MyFieldTracker(fields=["city_id"])
+
     class Meta:
         unique_together = ("slug", "city")
 
@@ -67,7 +124,26 @@ class Parish(models.Model):
         return f"{self.name} ({self.city.name}/{self.city.state.short_name})"
 
 
+class NearbyParish(models.Model):
+    """Precomputed k nearest parishes, maintained by missas.core.nearby_parishes."""
+
+    parish = models.ForeignKey(
+        Parish, on_delete=models.CASCADE, related_name="nearby_parishes"
+    )
+    nearby = models.ForeignKey(Parish, on_delete=models.CASCADE, related_name="+")
+    distance = models.FloatField(help_text="km")
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        unique_together = ("parish", "rank")
+
+    def __str__(self):
+        return f"{self.nearby_id} ({self.distance:.1f} km from {self.parish_id})"
+
+
 class Contact(models.Model):
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     email = models.EmailField(blank=True)
     facebook = models.CharField(max_length=256, blank=True)
     instagram = models.CharField(max_length=64, blank=True)
@@ -77,6 +153,7 @@ class Contact(models.Model):
     parish = models.OneToOneField(
         Parish, on_delete=models.CASCADE, blank=True, null=True
     )
+    tracker = MyFieldTracker(fields=["parish_id"])
 
     def __str__(self):
         return self.whatsapp or self.phone
@@ -122,17 +199,44 @@ class Location(models.Model):
     google_maps_place_id = models.CharField(max_length=255, blank=False, null=False)
     latitude = models.DecimalField(max_digits=10, decimal_places=8)
     longitude = models.DecimalField(max_digits=11, decimal_places=8)
+    # Denormalized from latitude/longitude for indexed bounding-box queries
+    latitude_e6 = models.IntegerField(editable=False)
+    longitude_e6 = models.IntegerField(editable=False)
+    geohash = models.CharField(max_length=12, editable=False, db_index=True)
+
+    objects = LocationQuerySet.as_manager()
+    tracker = MyFieldTracker(fields=["latitude_e6", "longitude_e6"])
 
     class Meta:
         unique_together = [("name", "address")]
+        indexes = [models.Index(fields=["latitude_e6", "longitude_e6"])]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.latitude_e6 = to_microdegrees(self.latitude)
+        self.longitude_e6 = to_microdegrees(self.longitude)
+        self.geohash = encode_geohash(self.latitude, self.longitude)
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"latitude", "longitude"} & set(update_fields):
+            kwargs["update_fields"] = {
+                *update_fields,
+                "latitude_e6",
+                "longitude_e6",
+                "geohash",
+            }
+        super().save(*args, **kwargs)
+
     @property
     def url(self):
         return f"https://www.google.com/maps/search/?api=1&query={quote_plus(self.name)}&query_place_id={self.google_maps_place_id}"
 
+    @property
+    def coordinates(self):
+        return self.latitude_e6 / 1_000_000, self.longitude_e6 / 1_000_000
+
 
 class Schedule(models.Model):
     class Day(models.IntegerChoices):
@@ -165,15 +269,68 @@ class Schedule(models.Model):
     end_time = models.TimeField(null=True, blank=True)
     type = models.CharField(choices=Type.choices, default=Type.MASS)
     verified_at = models.DateField(blank=True, null=True)
+    # Denormalized from day/start_time/end_time to query across days. The end
+    # can go past MINUTES_PER_WEEK when a Saturday schedule ends after midnight
+    start_minute_of_week = models.PositiveIntegerField(editable=False)
+    end_minute_of_week = models.PositiveIntegerField(editable=False)
 
     objects = ScheduleQuerySet.as_manager()
     tracker = MyFieldTracker()
 
     class Meta:
         unique_together = ("parish", "day", "start_time")
+        # Schedules have no city of their own, their parishes are looked up
+        # first and each one's window is then a range scan on this index
+        indexes = [
+            models.Index(fields=["parish", "type", "start_minute_of_week"]),
+            # The schedules of each location by parish, as the map lists them
+            models.Index(fields=["location", "parish"]),
+        ]
 
     def __str__(self):
         if self.end_time:
             return f"{self.get_day_display()} {self.start_time} - {self.end_time} at {self.parish}"
         else:
             return f"{self.get_day_display()} {self.start_time} at {self.parish}"
+
+    def save(self, *args, **kwargs):
+        self.start_minute_of_week, self.end_minute_of_week = (
+            self.compute_minutes_of_week()
+        )
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"day", "start_time", "end_time"} & set(
+            update_fields
+        ):
+            kwargs["update_fields"] = {
+                *update_fields,
+                "start_minute_of_week",
+                "end_minute_of_week",
+            }
+        super().save(*args, **kwargs)
+
+    def compute_minutes_of_week(self):
+        start = minute_of_week(self.day, self.start_time)
+        if not self.end_time:
+            return start, start
+
+        end = minute_of_week(self.day, self.end_time)
+        if end < start:
+            end += MINUTES_PER_DAY
+        return start, end
+
+
+class Stats(models.Model):
+    """Counters of the home page, a single row maintained by missas.core.stats."""
+
+    cities_with_parishes = models.PositiveIntegerField(default=0)
+    parishes = models.PositiveIntegerField(default=0)
+    locations = models.PositiveIntegerField(default=0)
+    schedules = models.PositiveIntegerField(default=0)
+    verified_schedules = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "stats"
+
+    def __str__(self):
+        return f"{self.schedules} schedules in {self.parishes} parishes"
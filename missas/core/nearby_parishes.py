@@ -0,0 +1,117 @@
+from collections import defaultdict
+
+from django.db import transaction
+
+from missas.core.cache_tags import invalidate_tags, parish_tag
+from missas.core.geo import GridIndex, bounding_box
+from missas.core.models import Location, NearbyParish, Schedule
+
+NEARBY_PARISHES_K = 5
+NEARBY_PARISHES_RADIUS_KM = 30
+
+
+def parish_coordinates(parish_ids=None, bbox=None):
+    """Return {parish_id: (lat, lng)} with the centroid of each parish's locations.
+
+    A parish has no coordinates of its own, only the Locations its schedules
+    happen at. With `bbox`, only parishes with a Location inside it are
+    returned, but their centroid still considers all of their Locations.
+    """
+    schedules = Schedule.objects.filter(location__isnull=False)
+    if parish_ids is not None:
+        schedules = schedules.filter(parish_id__in=parish_ids)
+    if bbox is not None:
+        schedules = schedules.filter(
+            parish_id__in=Schedule.objects.filter(
+                location__in=Location.objects.within_bbox(*bbox)
+            ).values("parish_id")
+        )
+
+    locations = defaultdict(set)
+    for parish_id, lat, lng in schedules.values_list(
+        "parish_id", "location__latitude_e6", "location__longitude_e6"
+    ).distinct():
+        locations[parish_id].add((lat, lng))
+
+    return {
+        parish_id: (
+            sum(lat for lat, _ in points) / len(points) / 1_000_000,
+            sum(lng for _, lng in points) / len(points) / 1_000_000,
+        )
+        for parish_id, points in locations.items()
+    }
+
+
+def enclosing_bbox(coordinates, radius_km):
+    boxes = [bounding_box(lat, lng, radius_km) for lat, lng in coordinates]
+    return (
+        min(box[0] for box in boxes),
+        min(box[1] for box in boxes),
+        max(box[2] for box in boxes),
+        max(box[3] for box in boxes),
+    )
+
+
+def compute_nearby_parishes(parish_ids=None):
+    """Recompute the NearbyParish rows of the given parishes (all if None)."""
+    targets = parish_coordinates(parish_ids)
+    if parish_ids is None:
+        candidates = targets
+    elif targets:
+        candidates = parish_coordinates(
+            bbox=enclosing_bbox(targets.values(), NEARBY_PARISHES_RADIUS_KM)
+        )
+    else:
+        candidates = {}
+
+    index = GridIndex((pk, lat, lng) for pk, (lat, lng) in candidates.items())
+    rows = []
+    for parish_id, (lat, lng) in targets.items():
+        neighbours = [
+            (distance, pk)
+            for distance, pk in index.nearby(lat, lng, NEARBY_PARISHES_RADIUS_KM)
+            if pk != parish_id
+        ]
+        rows.extend(
+            NearbyParish(
+                parish_id=parish_id, nearby_id=pk, distance=distance, rank=rank
+            )
+            for rank, (distance, pk) in enumerate(neighbours[:NEARBY_PARISHES_K])
+        )
+
+    with transaction.atomic():
+        stale = NearbyParish.objects.all()
+        if parish_ids is not None:
+            stale = stale.filter(parish_id__in=parish_ids)
+        stale.delete()
+        NearbyParish.objects.bulk_create(rows)
+    invalidate_tags(
+        parish_tag(pk) for pk in (targets if parish_ids is None else parish_ids)
+    )
+    return len(targets)
+
+
+def refresh_nearby_parishes(changed_parish_ids):
+    """Recompute only the parishes whose neighbours a change could affect.
+
+    Those are the changed parishes themselves, the parishes within range of
+    their new position and the ones that listed them at the old position.
+    """
+    changed_parish_ids = set(changed_parish_ids)
+    if not changed_parish_ids:
+        return 0
+
+    affected = set(changed_parish_ids)
+    affected.update(
+        NearbyParish.objects.filter(nearby_id__in=changed_parish_ids).values_list(
+            "parish_id", flat=True
+        )
+    )
+    coordinates = parish_coordinates(changed_parish_ids)
+    if coordinates:
+        affected.update(
+            parish_coordinates(
+                bbox=enclosing_bbox(coordinates.values(), NEARBY_PARISHES_RADIUS_KM)
+            )
+        )
+    return compute_nearby_parishes(affected)
@@ -0,0 +1,60 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Opens the same SQLite file read-only, see settings.DATABASES
+READER_ALIAS = "reader"
+
+_public_reads = ContextVar("public_reads", default=False)
+
+
+@contextmanager
+def public_reads():
+    """Route the reads made inside the block to the reader connection."""
+    token = _public_reads.set(True)
+    try:
+        yield
+    finally:
+        _public_reads.reset(token)
+
+
+def reads_from_reader(view):
+    """Decorate a public view so its queries go through the reader connection."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        with public_reads():
+            return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+class PublicReadsRouter:
+    """Send the reads of the public views to the read-only connection.
+
+    It never takes the write lock, so the pages keep being served while the
+    admin holds it, e.g. during bulk actions. Writes, and reads anywhere else,
+    go to the default connection. So do reads while it's in a transaction:
+    the reader can't see rows that aren't committed yet.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (
+            _public_reads.get()
+            and READER_ALIAS in connections
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return READER_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases are the same database
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != READER_ALIAS
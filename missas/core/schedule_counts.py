@@ -0,0 +1,55 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from missas.core.models import City, Parish, Schedule
+
+
+def add_schedules(parish_id, delta):
+    """Add `delta` to the schedule count of a parish and of its city.
+
+    Two UPDATEs run in the transaction of the change being counted, so both
+    commit or roll back together and concurrent writes don't lose counts.
+    """
+    Parish.objects.filter(pk=parish_id).update(
+        schedule_count=F("schedule_count") + delta
+    )
+    City.objects.filter(parishes=parish_id).update(
+        schedule_count=F("schedule_count") + delta
+    )
+
+
+def move_parish(parish_id, from_city_id, to_city_id):
+    """Move the schedule count of a parish that changed cities."""
+    count = Subquery(Parish.objects.filter(pk=parish_id).values("schedule_count"))
+    City.objects.filter(pk=from_city_id).update(
+        schedule_count=F("schedule_count") - count
+    )
+    City.objects.filter(pk=to_city_id).update(
+        schedule_count=F("schedule_count") + count
+    )
+
+
+def _counts(lookup):
+    return Coalesce(
+        Subquery(
+            Schedule.objects.filter(**{lookup: OuterRef("pk")})
+            .order_by()
+            .values(lookup)
+            .annotate(count=Count("pk"))
+            .values("count")
+        ),
+        0,
+    )
+
+
+def repair_schedule_counts():
+    """Recount every parish and city, returning how many were wrong."""
+    repaired = 0
+    for model, lookup in ((Parish, "parish"), (City, "parish__city")):
+        counts = _counts(lookup)
+        repaired += (
+            model.objects.annotate(actual=counts)
+            .exclude(schedule_count=F("actual"))
+            .update(schedule_count=counts)
+        )
+    return repaired
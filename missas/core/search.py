@@ -0,0 +1,83 @@
+from collections import namedtuple
+from datetime import timedelta
+
+from django.db.models import Q
+
+from missas.core.models import Location, Schedule
+from missas.core.week import (
+    MINUTES_PER_DAY,
+    MINUTES_PER_WEEK,
+    brazil_now,
+    minute_of_week,
+    minutes_of_week_window,
+    to_brazil,
+)
+
+# Rough urban travel speed (20 km/h); turns a distance into minutes to arrive
+MINUTES_PER_KM = 3
+
+Occurrence = namedtuple(
+    "Occurrence", ("schedule", "starts_at", "distance_km", "minutes_until", "score")
+)
+
+
+def next_schedules(
+    lat,
+    lng,
+    at=None,
+    limit=10,
+    radius_km=10,
+    type=Schedule.Type.MASS,
+    horizon_minutes=MINUTES_PER_DAY,
+):
+    """Return the next `limit` reachable schedule occurrences around a point.
+
+    Occurrences are ranked by minutes until the start plus the estimated travel
+    time, and those starting before the user could arrive are left out. Runs one
+    query for the locations in the bounding box and one for their schedules.
+    `at` is a naive local (Brazil) datetime, or an aware one to be converted.
+    """
+    if at is None:
+        at = brazil_now()
+    elif at.tzinfo is not None:
+        at = to_brazil(at)
+    at = at.replace(second=0, microsecond=0)
+    horizon_minutes = min(horizon_minutes, MINUTES_PER_WEEK)
+
+    locations = {
+        location.pk: location for location in Location.objects.near(lat, lng, radius_km)
+    }
+    if not locations:
+        return []
+
+    now = minute_of_week((at.weekday() + 1) % 7, at.time())
+    window = Q()
+    for start, end in minutes_of_week_window(now, horizon_minutes):
+        window |= Q(start_minute_of_week__gte=start, start_minute_of_week__lt=end)
+
+    schedules = (
+        Schedule.objects.filter(window, location_id__in=locations, type=type)
+        .select_related("parish", "parish__city", "parish__city__state")
+        .order_by("start_minute_of_week", "id")
+    )
+
+    occurrences = []
+    for schedule in schedules:
+        schedule.location = locations[schedule.location_id]
+        distance = schedule.location.distance
+        minutes_until = (schedule.start_minute_of_week - now) % MINUTES_PER_WEEK
+        travel_minutes = distance * MINUTES_PER_KM
+        if minutes_until < travel_minutes:
+            continue
+        occurrences.append(
+            Occurrence(
+                schedule=schedule,
+                starts_at=at + timedelta(minutes=minutes_until),
+                distance_km=distance,
+                minutes_until=minutes_until,
+                score=minutes_until + travel_minutes,
+            )
+        )
+
+    occurrences.sort(key=lambda occurrence: (occurrence.score, occurrence.schedule.pk))
+    return occurrences[:limit]
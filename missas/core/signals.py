@@ -0,0 +1,296 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from missas.core import schedule_counts, stats
+from missas.core.cache_tags import invalidate_parishes
+from missas.core.city_centroids import refresh_city_centroids
+from missas.core.clusters import invalidate_tiles
+from missas.core.distances import location_snapshot
+from missas.core.models import (
+    City,
+    Contact,
+    Location,
+    NearbyParish,
+    Parish,
+    Schedule,
+    Source,
+    State,
+)
+from missas.core.nearby_parishes import refresh_nearby_parishes
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location_snapshot(sender, **kwargs):
+    location_snapshot.invalidate()
+
+
+def parish_locations_changed(parish_ids):
+    parish_ids = set(parish_ids) - {None}
+    if not parish_ids:
+        return
+    # Resolved now because the parishes may be gone by the time it commits
+    city_ids = set(
+        Parish.objects.filter(pk__in=parish_ids).values_list("city_id", flat=True)
+    )
+
+    def refresh():
+        refresh_nearby_parishes(parish_ids)
+        refresh_city_centroids(city_ids)
+
+    # On commit so deletes cascading through Parish don't reinsert rows for it
+    transaction.on_commit(refresh)
+
+
+@receiver(post_save, sender=Location)
+def refresh_on_location_save(sender, instance, raw, **kwargs):
+    if raw:
+        return
+    parish_locations_changed(
+        Schedule.objects.filter(location=instance).values_list("parish_id", flat=True)
+    )
+
+
+@receiver(pre_delete, sender=Location)
+def refresh_on_location_delete(sender, instance, **kwargs):
+    # Collected before the delete sets Schedule.location to NULL
+    parish_locations_changed(
+        Schedule.objects.filter(location=instance).values_list("parish_id", flat=True)
+    )
+
+
+@receiver(post_save, sender=Schedule)
+def refresh_on_schedule_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    tracker = instance.tracker
+    if created:
+        moved = instance.location_id is not None
+    else:
+        moved = tracker.has_changed("location_id") or tracker.has_changed("parish_id")
+    if moved:
+        parish_locations_changed({instance.parish_id, tracker.previous("parish_id")})
+
+
+@receiver(post_delete, sender=Schedule)
+def refresh_on_schedule_delete(sender, instance, **kwargs):
+    if instance.location_id:
+        parish_locations_changed([instance.parish_id])
+
+
+def clusters_changed(location_ids=(), points=()):
+    points = set(points)
+    location_ids = set(location_ids) - {None}
+    if location_ids:
+        points.update(
+            (lat / 1_000_000, lng / 1_000_000)
+            for lat, lng in Location.objects.filter(pk__in=location_ids).values_list(
+                "latitude_e6", "longitude_e6"
+            )
+        )
+    if points:
+        transaction.on_commit(lambda: invalidate_tiles(points))
+
+
+@receiver(post_save, sender=Location)
+def invalidate_clusters_on_location_save(sender, instance, created, **kwargs):
+    points = {instance.coordinates}
+    tracker = instance.tracker
+    if not created and tracker.changed():
+        points.add(
+            (
+                tracker.previous("latitude_e6") / 1_000_000,
+                tracker.previous("longitude_e6") / 1_000_000,
+            )
+        )
+    clusters_changed(points=points)
+
+
+@receiver(post_delete, sender=Location)
+def invalidate_clusters_on_location_delete(sender, instance, **kwargs):
+    clusters_changed(points=[instance.coordinates])
+
+
+@receiver(post_save, sender=Schedule)
+def invalidate_clusters_on_schedule_save(sender, instance, created, **kwargs):
+    # The cluster's representative parish comes from the location's schedules
+    tracker = instance.tracker
+    if created or tracker.has_changed("location_id"):
+        clusters_changed(
+            location_ids={instance.location_id, tracker.previous("location_id")}
+        )
+
+
+@receiver(post_delete, sender=Schedule)
+def invalidate_clusters_on_schedule_delete(sender, instance, **kwargs):
+    clusters_changed(location_ids=[instance.location_id])
+
+
+@receiver(post_save, sender=Parish)
+def invalidate_clusters_on_parish_save(sender, instance, created, **kwargs):
+    if not created:
+        clusters_changed(
+            location_ids=Schedule.objects.filter(parish=instance).values_list(
+                "location_id", flat=True
+            )
+        )
+
+
+# The clusters' URLs carry the city's and the state's slugs
+@receiver(post_save, sender=City)
+def invalidate_clusters_on_city_save(sender, instance, created, **kwargs):
+    if not created:
+        clusters_changed(
+            location_ids=Schedule.objects.filter(parish__city=instance).values_list(
+                "location_id", flat=True
+            )
+        )
+
+
+@receiver(post_save, sender=State)
+def invalidate_clusters_on_state_save(sender, instance, created, **kwargs):
+    if not created:
+        clusters_changed(
+            location_ids=Schedule.objects.filter(
+                parish__city__state=instance
+            ).values_list("location_id", flat=True)
+        )
+
+
+@receiver(post_save, sender=Schedule)
+def invalidate_cache_on_schedule_save(sender, instance, raw, **kwargs):
+    if not raw:
+        invalidate_parishes(
+            {instance.parish_id, instance.tracker.previous("parish_id")}
+        )
+
+
+@receiver(post_delete, sender=Schedule)
+def invalidate_cache_on_schedule_delete(sender, instance, **kwargs):
+    invalidate_parishes([instance.parish_id])
+
+
+@receiver(post_save, sender=Parish)
+@receiver(pre_delete, sender=Parish)
+def invalidate_cache_on_parish_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # Its name also shows up in the pages of the parishes listing it as nearby
+    invalidate_parishes(
+        {
+            instance.pk,
+            *NearbyParish.objects.filter(nearby=instance).values_list(
+                "parish_id", flat=True
+            ),
+        },
+        # The city it moved from still lists it
+        city_ids=[instance.tracker.previous("city_id")],
+    )
+
+
+@receiver(post_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+def invalidate_cache_on_location_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_parishes(
+            Schedule.objects.filter(location=instance).values_list(
+                "parish_id", flat=True
+            )
+        )
+
+
+@receiver(post_save, sender=Source)
+@receiver(pre_delete, sender=Source)
+def invalidate_cache_on_source_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_parishes(
+            Schedule.objects.filter(source=instance).values_list("parish_id", flat=True)
+        )
+
+
+@receiver(post_save, sender=Contact)
+@receiver(post_delete, sender=Contact)
+def invalidate_cache_on_contact_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        # The parish it moved from still shows it
+        invalidate_parishes(
+            {instance.parish_id, instance.tracker.previous("parish_id")}
+        )
+
+
+# Before the stats' receivers: outside a transaction their recount runs at
+# once, and counts the cities with schedules from these
+@receiver(post_save, sender=Schedule)
+def count_schedules_on_schedule_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    if created:
+        schedule_counts.add_schedules(instance.parish_id, 1)
+    elif instance.tracker.has_changed("parish_id"):
+        schedule_counts.add_schedules(instance.tracker.previous("parish_id"), -1)
+        schedule_counts.add_schedules(instance.parish_id, 1)
+
+
+@receiver(post_delete, sender=Schedule)
+def count_schedules_on_schedule_delete(sender, instance, **kwargs):
+    schedule_counts.add_schedules(instance.parish_id, -1)
+
+
+@receiver(post_save, sender=Parish)
+def count_schedules_on_parish_save(sender, instance, created, raw, **kwargs):
+    tracker = instance.tracker
+    if not created and not raw and tracker.has_changed("city_id"):
+        schedule_counts.move_parish(
+            instance.pk, tracker.previous("city_id"), instance.city_id
+        )
+
+
+@receiver(post_save, sender=Schedule)
+def count_schedule_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    verified = instance.verified_at is not None
+    if created:
+        stats.add(schedules=1, verified_schedules=int(verified))
+        stats.recount_cities_on_commit()
+        return
+
+    tracker = instance.tracker
+    if verified != (tracker.previous("verified_at") is not None):
+        stats.add(verified_schedules=1 if verified else -1)
+    if tracker.has_changed("parish_id"):
+        stats.recount_cities_on_commit()
+
+
+@receiver(post_delete, sender=Schedule)
+def count_schedule_delete(sender, instance, **kwargs):
+    stats.add(schedules=-1, verified_schedules=-int(instance.verified_at is not None))
+    stats.recount_cities_on_commit()
+
+
+@receiver(post_save, sender=Parish)
+def count_parish_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    if created:
+        stats.add(parishes=1)
+    elif instance.tracker.has_changed("city_id"):
+        # It moved its schedules to another city
+        stats.recount_cities_on_commit()
+
+
+@receiver(post_delete, sender=Parish)
+def count_parish_delete(sender, instance, **kwargs):
+    stats.add(parishes=-1)
+
+
+@receiver(post_save, sender=Location)
+def count_location_save(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        stats.add(locations=1)
+
+
+@receiver(post_delete, sender=Location)
+def count_location_delete(sender, instance, **kwargs):
+    stats.add(locations=-1)
@@ -0,0 +1,35 @@
+from django.conf import settings
+
+
+def configure_connection(sender, connection, **kwargs):
+    """Apply SQLITE_PRAGMAS to every new SQLite connection.
+
+    Most pragmas only last as long as the connection, so they're set each time
+    one is opened. journal_mode is stored in the file, setting it again is a
+    no-op.
+    """
+    if connection.vendor != "sqlite":
+        return
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        # Read-only connections can't change the file, the writer sets it
+        if name == "journal_mode" and is_read_only(connection):
+            continue
+        connection.connection.execute(f"PRAGMA {name} = {value}")
+
+
+def is_read_only(connection):
+    return "mode=ro" in str(connection.settings_dict["NAME"])
+
+
+def pragmas(connection):
+    """Return the current value of each of SQLITE_PRAGMAS on `connection`.
+
+    None for those that don't apply, e.g. mmap_size of an in-memory database.
+    """
+    with connection.cursor() as cursor:
+        values = {}
+        for name in settings.SQLITE_PRAGMAS:
+            cursor.execute(f"PRAGMA {name}")
+            row = cursor.fetchone()
+            values[name] = row[0] if row else None
+        return values
@@ -0,0 +1,86 @@
+from functools import partial
+from weakref import WeakKeyDictionary
+
+from django.db import transaction
+from django.db.models import Count, F, Subquery, Value
+
+from missas.core.models import City, Location, Parish, Schedule, Stats
+
+STATS_ID = 1
+
+# Connections with a recount of the cities waiting for a commit
+_pending_recounts = WeakKeyDictionary()
+
+
+def _cities_with_parishes():
+    # Grouping by a constant counts them in a subquery, through the partial
+    # index of the cities with schedules
+    return Subquery(
+        City.objects.filter(has_schedules=True)
+        .order_by()
+        .annotate(one=Value(1))
+        .values("one")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+
+
+def add(**deltas):
+    """Add `deltas` to the counters in a single UPDATE.
+
+    Run in the transaction of the change being counted, so both commit or
+    roll back together.
+    """
+    Stats.objects.filter(pk=STATS_ID).update(
+        **{name: F(name) + delta for name, delta in deltas.items()}
+    )
+
+
+def recount_cities():
+    """Recount the cities with schedules, which depends on the other rows."""
+    Stats.objects.filter(pk=STATS_ID).update(
+        cities_with_parishes=_cities_with_parishes()
+    )
+
+
+def _recount_pending_cities(connection):
+    if _pending_recounts.pop(connection, False):
+        recount_cities()
+
+
+def recount_cities_on_commit():
+    """Recount the cities once the current transaction commits.
+
+    However many changes ask for it, e.g. every schedule deleted in a
+    cascade, the first callback to run recounts and the rest find the flag
+    cleared. A rollback drops the callbacks but leaves the flag set, so the
+    next transaction's first callback still recounts.
+    """
+    connection = transaction.get_connection()
+    _pending_recounts[connection] = True
+    transaction.on_commit(partial(_recount_pending_cities, connection))
+
+
+def reconcile_stats():
+    """Recompute every counter from scratch, returning the Stats."""
+    stats, _ = Stats.objects.update_or_create(
+        pk=STATS_ID,
+        defaults={
+            "cities_with_parishes": Schedule.objects.aggregate(
+                count=Count("parish__city", distinct=True)
+            )["count"],
+            "parishes": Parish.objects.count(),
+            "locations": Location.objects.count(),
+            "schedules": Schedule.objects.count(),
+            "verified_schedules": Schedule.objects.filter_verified().count(),
+        },
+    )
+    return stats
+
+
+def get_stats():
+    try:
+        return Stats.objects.get(pk=STATS_ID)
+    except Stats.DoesNotExist:
+        # E.g. a database created without the migration's row
+        return reconcile_stats()
@@ -1,3 +1,5 @@
+from decimal import Decimal
+
 import pytest
 from django.contrib.admin.sites import AdminSite
 from django.contrib.auth import get_user_model
@@ -5,7 +7,7 @@ from django.test import RequestFactory
 from model_bakery import baker
 
 from missas.core.admin import ScheduleAdmin
-from missas.core.models import Location, Parish, Schedule
+from missas.core.models import Location, NearbyParish, Parish, Schedule
 
 User = get_user_model()
 
@@ -53,8 +55,10 @@ class TestSetLocationsFromSameParish:
         mock_message_user = mocker.patch.object(schedule_admin, "message_user")
         schedule_admin.set_locations_from_same_parish(request, queryset)
 
+        updated_at = schedule_without_location.updated_at
         schedule_without_location.refresh_from_db()
         assert schedule_without_location.location == location
+        assert schedule_without_location.updated_at > updated_at
         assert mock_message_user.call_count == 1
 
     def test_reuse_location_for_multiple_schedules(
@@ -144,6 +148,36 @@ class TestSetLocationsFromSameParish:
         assert schedule_parish2.location is None
         assert mock_message_user.call_count == 1
 
+    def test_invalidates_cache_once(
+        self, schedule_admin, request_factory, admin_user, mocker
+    ):
+        schedules = []
+        for parish in baker.make(Parish, _quantity=2):
+            for name in ("Matriz", "Capela"):
+                baker.make(
+                    Schedule,
+                    parish=parish,
+                    location_name=name,
+                    location=baker.make(Location),
+                )
+                schedules.append(
+                    baker.make(
+                        Schedule, parish=parish, location=None, location_name=name
+                    )
+                )
+
+        request = request_factory.get("/admin/core/schedule/")
+        request.user = admin_user
+        queryset = Schedule.objects.filter(pk__in=[s.pk for s in schedules])
+
+        mocker.patch.object(schedule_admin, "message_user")
+        invalidate_parishes = mocker.patch("missas.core.admin.invalidate_parishes")
+        schedule_admin.set_locations_from_same_parish(request, queryset)
+
+        invalidate_parishes.assert_called_once_with(
+            {schedule.parish_id for schedule in schedules}
+        )
+
     def test_different_location_names_in_same_parish(
         self, schedule_admin, request_factory, admin_user, mocker
     ):
@@ -244,3 +278,53 @@ class TestSetLocationsFromSameParish:
         assert schedule_to_update.location == location
         assert schedule_to_skip.location is None
         assert mock_message_user.call_count == 2
+
+
+@pytest.mark.django_db
+class TestCreateLocationsFromAddresses:
+    def test_refreshes_derived_locations(
+        self,
+        schedule_admin,
+        request_factory,
+        admin_user,
+        mocker,
+        django_capture_on_commit_callbacks,
+    ):
+        neighbour = baker.make(Parish)
+        baker.make(
+            Schedule,
+            parish=neighbour,
+            location=baker.make(
+                Location, latitude=Decimal("-5.81"), longitude=Decimal("-35.21")
+            ),
+        )
+        parish = baker.make(Parish)
+        schedule = baker.make(
+            Schedule, parish=parish, location=None, location_name="Matriz"
+        )
+        mocker.patch(
+            "missas.core.admin.get_schedule_address",
+            return_value={
+                "name": "Matriz",
+                "address": "Rua da Matriz, 1",
+                "full_response": {},
+                "place_id": "matriz",
+                "latitude": Decimal("-5.80"),
+                "longitude": Decimal("-35.21"),
+            },
+        )
+        request = request_factory.get("/admin/core/schedule/")
+        request.user = admin_user
+        mocker.patch.object(schedule_admin, "message_user")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            schedule_admin.create_locations_from_addresses(
+                request, Schedule.objects.filter(pk=schedule.pk)
+            )
+
+        # bulk_update sends no post_save, the action refreshes them itself
+        assert list(
+            NearbyParish.objects.filter(parish=parish).values_list("nearby", flat=True)
+        ) == [neighbour.pk]
+        parish.city.refresh_from_db()
+        assert (parish.city.latitude, parish.city.longitude) == (-5.8, -35.21)
@@ -0,0 +1,186 @@
+import threading
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from freezegun import freeze_time
+
+from missas.core.cache_backends import SQLiteCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SQLiteCache(
+        str(tmp_path / "cache.sqlite3"),
+        {"OPTIONS": {"MAX_SIZE": 10_000, "TOUCH_INTERVAL": 0}},
+    )
+
+
+def test_set_and_get(cache):
+    cache.set("key", {"a": 1})
+
+    assert cache.get("key") == {"a": 1}
+    assert cache.get("missing", "default") == "default"
+
+
+def test_get_many_and_set_many(cache):
+    cache.set_many({"a": 1, "b": 2})
+
+    assert cache.get_many(["a", "b", "c"]) == {"a": 1, "b": 2}
+
+
+def test_get_many_above_the_variables_limit(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), {})
+    cache.set_many({f"key{i}": i for i in range(1_000)})
+
+    assert len(cache.get_many([f"key{i}" for i in range(1_000)])) == 1_000
+
+
+def test_expiration(cache):
+    with freeze_time("2025-01-01 12:00:00"):
+        cache.set("key", "value", timeout=60)
+
+    with freeze_time("2025-01-01 12:00:59"):
+        assert cache.get("key") == "value"
+        assert cache.has_key("key")
+
+    with freeze_time("2025-01-01 12:01:00"):
+        assert cache.get("key") is None
+        assert not cache.has_key("key")
+
+
+def test_without_timeout(cache):
+    with freeze_time("2025-01-01"):
+        cache.set("key", "value", timeout=None)
+
+    with freeze_time("2035-01-01"):
+        assert cache.get("key") == "value"
+
+
+def test_add(cache):
+    assert cache.add("key", "first")
+    assert not cache.add("key", "second")
+    assert cache.get("key") == "first"
+
+
+def test_add_over_expired(cache):
+    with freeze_time("2025-01-01 12:00:00"):
+        cache.set("key", "old", timeout=1)
+
+    with freeze_time("2025-01-01 12:00:01"):
+        assert cache.add("key", "new")
+        assert cache.get("key") == "new"
+
+
+def test_touch(cache):
+    with freeze_time("2025-01-01 12:00:00"):
+        cache.set("key", "value", timeout=10)
+        assert cache.touch("key", timeout=120)
+        assert not cache.touch("missing")
+
+    with freeze_time("2025-01-01 12:01:00"):
+        assert cache.get("key") == "value"
+
+
+def test_delete(cache):
+    cache.set_many({"a": 1, "b": 2, "c": 3})
+
+    assert cache.delete("a")
+    assert not cache.delete("a")
+    cache.delete_many(["b", "c"])
+
+    assert cache.get_many(["a", "b", "c"]) == {}
+
+
+def test_clear(cache):
+    cache.set("key", "value")
+
+    cache.clear()
+
+    assert cache.get("key") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_incr(cache):
+    cache.set("counter", 1)
+
+    assert cache.incr("counter") == 2
+
+
+def test_evicts_least_recently_used_by_size(cache):
+    with freeze_time("2025-01-01 12:00:00") as frozen:
+        for key in ("a", "b", "c"):
+            cache.set(key, b"x" * 2_500)
+            frozen.tick()
+        cache.get("a")
+        frozen.tick()
+
+        cache.set("d", b"x" * 2_500)
+
+        assert set(cache.get_many(["a", "b", "c", "d"])) == {"a", "c", "d"}
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["size"] <= 10_000
+
+
+def test_size_follows_overwrites_and_deletes(cache):
+    cache.set("key", b"x" * 1_000)
+    size = cache.stats()["size"]
+
+    cache.set("key", b"x" * 2_000)
+    assert cache.stats()["size"] == size + 1_000
+
+    cache.delete("key")
+    assert cache.stats()["size"] == 0
+
+
+def test_stats(cache):
+    cache.set("key", "value")
+    cache.get("key")
+    cache.get("key")
+    cache.get("missing")
+
+    stats = cache.stats()
+
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 1, 1)
+    assert stats["max_size"] == 10_000
+
+
+def test_shared_between_instances(cache, tmp_path):
+    # Like the gunicorn workers, each with its own backend on the same file
+    other = SQLiteCache(
+        str(tmp_path / "cache.sqlite3"), {"OPTIONS": {"STATS_INTERVAL": 0}}
+    )
+
+    cache.set("key", "value")
+    other.get("key")
+
+    assert other.get("key") == "value"
+    assert cache.stats()["hits"] == 2
+
+
+def test_concurrent_writes(cache):
+    def write(thread):
+        for i in range(50):
+            cache.set(f"{thread}:{i}", i)
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert cache.stats()["entries"] == 200
+
+
+def test_cache_stats_command(settings, tmp_path):
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "missas.core.cache_backends.SQLiteCache",
+            "LOCATION": str(tmp_path / "command.sqlite3"),
+        }
+    }
+    stdout = StringIO()
+
+    call_command("cache_stats", stdout=stdout)
+
+    assert "Hits: 0" in stdout.getvalue()
@@ -0,0 +1,178 @@
+from datetime import time
+
+import pytest
+from django.core.cache import cache
+from django.db import transaction
+from django.shortcuts import resolve_url
+from model_bakery import baker
+from pytest_django.asserts import assertContains, assertNotContains
+
+from missas.core.cache_tags import (
+    INDEX_TAG,
+    city_tag,
+    city_tags,
+    invalidate_tags,
+    parish_tag,
+    parish_tags,
+    state_tag,
+    tag_versions,
+)
+from missas.core.models import City, Contact, Parish, Schedule, Source
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+def parish_url(parish):
+    return resolve_url(
+        "parish_detail",
+        state=parish.city.state.slug,
+        city=parish.city.slug,
+        parish=parish.slug,
+    )
+
+
+def city_url(city):
+    url = resolve_url("by_city", state=city.state.slug, city=city.slug)
+    return f"{url}?tipo=missas&dia=domingo&horario=0"
+
+
+@pytest.mark.django_db
+class TestTagVersions:
+    def test_stable_until_invalidated(self):
+        versions = tag_versions(["a", "b"])
+
+        assert tag_versions(["a", "b"]) == versions
+
+        invalidate_tags(["a"])
+
+        assert tag_versions(["a"]) != {"a": versions["a"]}
+        assert tag_versions(["b"]) == {"b": versions["b"]}
+
+    def test_parish_tags(self):
+        parish = baker.make(Parish)
+
+        assert parish_tags([parish.pk, None]) == {
+            INDEX_TAG,
+            parish_tag(parish.pk),
+            city_tag(parish.city_id),
+            state_tag(parish.city.state_id),
+        }
+
+    def test_city_tags(self):
+        city = baker.make(City)
+
+        assert city_tags([city.pk, None]) == {
+            INDEX_TAG,
+            city_tag(city.pk),
+            state_tag(city.state_id),
+        }
+
+
+@pytest.mark.django_db(transaction=True, databases=["default", "reader"])
+class TestInvalidation:
+    def test_schedule_edit_refreshes_its_pages(self, client):
+        schedule = baker.make(Schedule, observation="Antes")
+        parish = schedule.parish
+        assertContains(client.get(parish_url(parish)), "Antes")
+
+        schedule.observation = "Depois"
+        schedule.save()
+
+        assertContains(client.get(parish_url(parish)), "Depois")
+
+    def test_other_pages_stay_cached(self, client):
+        schedule = baker.make(Schedule, observation="Antes")
+        other = baker.make(Schedule, observation="Outra")
+        client.get(parish_url(other.parish))
+
+        schedule.observation = "Depois"
+        schedule.save()
+        # Not sent through signals, so only a purge would show it
+        Schedule.objects.filter(pk=other.pk).update(observation="Alterada")
+
+        assertContains(client.get(parish_url(other.parish)), "Outra")
+
+    def test_schedule_delete(self, client):
+        schedule = baker.make(Schedule, observation="Removida")
+        parish = schedule.parish
+        assertContains(client.get(parish_url(parish)), "Removida")
+
+        schedule.delete()
+
+        assertNotContains(client.get(parish_url(parish)), "Removida")
+
+    def test_parish_rename_refreshes_city_page(self, client):
+        schedule = baker.make(
+            Schedule, parish__name="Antes", day=Schedule.Day.SUNDAY, start_time=time(9)
+        )
+        city = schedule.parish.city
+        assertContains(client.get(city_url(city)), "Antes")
+
+        schedule.parish.name = "Depois"
+        schedule.parish.save()
+
+        assertContains(client.get(city_url(city)), "Depois")
+
+    def test_parish_move_refreshes_old_city_page(self, client):
+        schedule = baker.make(
+            Schedule, parish__name="Mudou", day=Schedule.Day.SUNDAY, start_time=time(9)
+        )
+        parish = schedule.parish
+        city = parish.city
+        assertContains(client.get(city_url(city)), "Mudou")
+
+        parish.city = baker.make(City)
+        parish.save()
+
+        assertNotContains(client.get(city_url(city)), "Mudou")
+
+    def test_source_edit(self, client):
+        source = baker.make(Source, description="Antes")
+        schedule = baker.make(Schedule, source=source)
+        assertContains(client.get(parish_url(schedule.parish)), "Antes")
+
+        source.description = "Depois"
+        source.save()
+
+        assertContains(client.get(parish_url(schedule.parish)), "Depois")
+
+    def test_contact_edit(self, client):
+        parish = baker.make(Parish)
+        contact = baker.make(Contact, parish=parish, email="antes@example.com")
+        assertContains(client.get(parish_url(parish)), "antes@example.com")
+
+        contact.email = "depois@example.com"
+        contact.save()
+
+        assertContains(client.get(parish_url(parish)), "depois@example.com")
+
+    def test_contact_move_refreshes_old_parish_page(self, client):
+        parish = baker.make(Parish)
+        contact = baker.make(Contact, parish=parish, email="mudou@example.com")
+        assertContains(client.get(parish_url(parish)), "mudou@example.com")
+
+        contact.parish = baker.make(Parish)
+        contact.save()
+
+        assertNotContains(client.get(parish_url(parish)), "mudou@example.com")
+
+    def test_new_schedule_refreshes_index(self, client):
+        client.get(resolve_url("index"))
+        schedule = baker.make(Schedule)
+
+        assertContains(client.get(resolve_url("index")), schedule.parish.city.name)
+
+    def test_rolled_back_change_keeps_cache(self, client):
+        schedule = baker.make(Schedule)
+        client.get(parish_url(schedule.parish))
+        versions = tag_versions([parish_tag(schedule.parish_id)])
+
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                schedule.save()
+                raise RuntimeError
+
+        assert tag_versions([parish_tag(schedule.parish_id)]) == versions
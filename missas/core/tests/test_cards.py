@@ -0,0 +1,141 @@
+from datetime import date, time
+
+import pytest
+from django.template.backends.django import Template
+from django.template.loader import render_to_string
+from model_bakery import baker
+
+from missas.core.cards import card_rows, render_cards
+from missas.core.models import Contact, Location, Schedule, Source
+
+
+def load(schedule):
+    return (
+        Schedule.objects.select_related(
+            "parish", "parish__city", "parish__city__state", "source", "location"
+        )
+        .prefetch_related("parish__contact")
+        .get(pk=schedule.pk)
+    )
+
+
+@pytest.fixture
+def schedule(db):
+    schedule = baker.make(
+        Schedule,
+        start_time=time(9),
+        location=baker.make(Location, latitude=-5.79, longitude=-35.21),
+        source=baker.make(Source),
+    )
+    baker.make(Contact, parish=schedule.parish, phone="+5584999999999")
+    return schedule
+
+
+@pytest.fixture
+def render_spy(mocker):
+    return mocker.spy(Template, "render")
+
+
+def test_same_html_as_the_template(schedule):
+    schedule = load(schedule)
+
+    assert render_cards([schedule]) == [
+        render_to_string("card.html", {"schedule": schedule})
+    ]
+
+
+def test_empty():
+    assert render_cards([]) == []
+
+
+def test_cached_cards_are_not_rendered_again(schedule, render_spy):
+    render_cards([load(schedule)])
+    render_spy.reset_mock()
+
+    render_cards([load(schedule)])
+
+    assert render_spy.call_count == 0
+
+
+def test_only_missing_cards_are_rendered(schedule, render_spy):
+    render_cards([load(schedule)])
+    other = baker.make(Schedule, parish=schedule.parish, start_time=time(18))
+    render_spy.reset_mock()
+
+    cards = render_cards([load(schedule), load(other)])
+
+    assert render_spy.call_count == 1
+    assert "18:00" in cards[1]
+
+
+@pytest.mark.parametrize(
+    "change",
+    (
+        lambda schedule: setattr(schedule, "observation", "Nova observação")
+        or schedule.save(),
+        lambda schedule: setattr(schedule.parish, "name", "Novo nome")
+        or schedule.parish.save(),
+        lambda schedule: setattr(schedule.location, "address", "Novo endereço")
+        or schedule.location.save(),
+        lambda schedule: setattr(schedule.source, "description", "Nova fonte")
+        or schedule.source.save(),
+        lambda schedule: setattr(schedule.parish.contact, "phone", "+5584888888888")
+        or schedule.parish.contact.save(),
+        lambda schedule: schedule.parish.contact.delete(),
+        lambda schedule: setattr(schedule, "verified_at", date(2025, 1, 1))
+        or schedule.save(),
+    ),
+)
+def test_rendered_again_when_anything_shown_changes(schedule, render_spy, change):
+    render_cards([load(schedule)])
+    change(load(schedule))
+    render_spy.reset_mock()
+
+    render_cards([load(schedule)])
+
+    assert render_spy.call_count == 1
+
+
+class TestCardRows:
+    def test_same_html_as_instances(self, schedule):
+        (row,) = card_rows(Schedule.objects.filter(pk=schedule.pk))
+
+        assert render_to_string("card.html", {"schedule": row}) == render_to_string(
+            "card.html", {"schedule": load(schedule)}
+        )
+
+    def test_same_html_without_location_source_nor_contact(self, db):
+        schedule = baker.make(
+            Schedule, location=None, source=None, location_name="Capela"
+        )
+
+        (row,) = card_rows(Schedule.objects.filter(pk=schedule.pk))
+
+        assert render_to_string("card.html", {"schedule": row}) == render_to_string(
+            "card.html", {"schedule": load(schedule)}
+        )
+
+    def test_share_the_cached_cards_of_instances(self, schedule, render_spy):
+        render_cards([load(schedule)])
+        render_spy.reset_mock()
+
+        render_cards(card_rows(Schedule.objects.filter(pk=schedule.pk)))
+
+        assert render_spy.call_count == 0
+
+    def test_keep_the_order_in_a_single_query(
+        self, schedule, django_assert_num_queries
+    ):
+        other = baker.make(Schedule, parish=schedule.parish, start_time=time(7))
+
+        with django_assert_num_queries(1):
+            rows = card_rows(Schedule.objects.order_by("start_time"))
+
+        assert [row.pk for row in rows] == [other.pk, schedule.pk]
+
+    def test_schedules_share_their_parish(self, schedule):
+        baker.make(Schedule, parish=schedule.parish, start_time=time(7))
+
+        first, second = card_rows(Schedule.objects.all())
+
+        assert first.parish is second.parish
@@ -0,0 +1,139 @@
+import logging
+from datetime import time
+
+import pytest
+from django.shortcuts import resolve_url
+from model_bakery import baker
+
+from missas.core.cache_tags import INDEX_TAG, city_tag, parish_tag, state_tag
+from missas.core.facades import cdn
+from missas.core.models import Contact, Schedule
+
+
+def purge(tags):
+    cdn.purge_tags(tags)
+    assert cdn.queue.flush(timeout=5)
+
+
+class TestPurgeTags:
+    def test_sends_the_tags(self, cdn_server):
+        purge({"city:1", "parish:2"})
+
+        assert cdn_server.calls == [
+            {
+                "tags": ["city:1", "parish:2"],
+                "authorization": "Bearer token",
+                "status": 200,
+            }
+        ]
+
+    def test_coalesces_bursts(self, cdn_server, settings):
+        settings.CDN_PURGE_DELAY = 0.2
+
+        for i in range(20):
+            cdn.purge_tags({f"parish:{i}", INDEX_TAG})
+        assert cdn.queue.flush(timeout=5)
+
+        assert len(cdn_server.calls) == 1
+        assert cdn_server.purged == {INDEX_TAG} | {f"parish:{i}" for i in range(20)}
+
+    def test_batches(self, cdn_server):
+        tags = {f"parish:{i}" for i in range(70)}
+
+        purge(tags)
+
+        assert [len(call["tags"]) for call in cdn_server.calls] == [30, 30, 10]
+        assert cdn_server.purged == tags
+
+    def test_retries_server_errors(self, cdn_server):
+        cdn_server.statuses = [500, 429]
+
+        purge({"city:1"})
+
+        assert [call["status"] for call in cdn_server.calls] == [500, 429, 200]
+
+    def test_gives_up_after_max_attempts(self, cdn_server, caplog):
+        cdn_server.statuses = [503] * cdn.MAX_ATTEMPTS
+
+        with caplog.at_level(logging.ERROR):
+            purge({"city:1"})
+
+        assert len(cdn_server.calls) == cdn.MAX_ATTEMPTS
+        assert "Error purging 1 tags from the CDN" in caplog.text
+
+    def test_doesnt_retry_client_errors(self, cdn_server, caplog):
+        cdn_server.statuses = [403]
+
+        with caplog.at_level(logging.ERROR):
+            purge({"city:1"})
+
+        assert len(cdn_server.calls) == 1
+        assert "HTTP Error 403" in caplog.text
+
+    def test_unreachable(self, cdn_server, settings, caplog):
+        settings.CDN_PURGE_URL = "http://127.0.0.1:1/purge_cache"
+
+        with caplog.at_level(logging.ERROR):
+            purge({"city:1"})
+
+        assert "Error purging 1 tags from the CDN" in caplog.text
+
+    def test_disabled_without_url(self, settings, mocker):
+        settings.CDN_PURGE_URL = ""
+        add = mocker.patch.object(cdn.queue, "add")
+
+        cdn.purge_tags({"city:1"})
+
+        add.assert_not_called()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_purges_the_pages_of_a_changed_parish(cdn_server):
+    schedule = baker.make(Schedule, start_time=time(9))
+    baker.make(Contact, parish=schedule.parish)
+    cdn.queue.flush(timeout=5)
+    cdn_server.calls.clear()
+
+    schedule.parish.contact.phone = "+5584999999999"
+    schedule.parish.contact.save()
+    assert cdn.queue.flush(timeout=5)
+
+    parish = schedule.parish
+    assert cdn_server.purged == {
+        INDEX_TAG,
+        state_tag(parish.city.state_id),
+        city_tag(parish.city_id),
+        parish_tag(parish.pk),
+    }
+
+
+@pytest.mark.django_db
+def test_responses_carry_their_tags(client):
+    schedule = baker.make(Schedule)
+    parish = schedule.parish
+    url = resolve_url(
+        "parish_detail",
+        state=parish.city.state.slug,
+        city=parish.city.slug,
+        parish=parish.slug,
+    )
+
+    response = client.get(url)
+    cached = client.get(url)
+
+    for response in (response, cached):
+        assert response["Cache-Tag"] == parish_tag(parish.pk)
+        assert response["Surrogate-Key"] == parish_tag(parish.pk)
+
+
+@pytest.mark.django_db
+def test_city_responses_carry_their_tags(client):
+    schedule = baker.make(Schedule)
+    city = schedule.parish.city
+
+    response = client.get(
+        resolve_url("by_city", state=city.state.slug, city=city.slug),
+        data={"dia": "domingo", "horario": "0"},
+    )
+
+    assert response["Cache-Tag"] == city_tag(city.pk)
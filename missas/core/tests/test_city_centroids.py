@@ -0,0 +1,103 @@
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from model_bakery import baker
+
+from missas.core.city_centroids import compute_city_centroids, nearest_city
+from missas.core.models import City
+
+
+def make_schedule_at(city, lat, lng):
+    location = baker.make(
+        "core.Location", latitude=Decimal(str(lat)), longitude=Decimal(str(lng))
+    )
+    return baker.make("core.Schedule", parish__city=city, location=location)
+
+
+@pytest.mark.django_db
+class TestComputeCityCentroids:
+    def test_centroid_and_bbox(self):
+        city = baker.make(City)
+        make_schedule_at(city, -5.0, -35.0)
+        make_schedule_at(city, -5.2, -35.4)
+
+        compute_city_centroids()
+
+        city.refresh_from_db()
+        assert (city.latitude, city.longitude) == pytest.approx((-5.1, -35.2))
+        assert (city.min_latitude, city.max_latitude) == (-5.2, -5.0)
+        assert (city.min_longitude, city.max_longitude) == (-35.4, -35.0)
+
+    def test_only_given_cities(self):
+        city = baker.make(City)
+        other = baker.make(City)
+        make_schedule_at(city, -5.0, -35.0)
+        make_schedule_at(other, -6.0, -36.0)
+
+        compute_city_centroids([city.pk])
+
+        other.refresh_from_db()
+        assert other.latitude is None
+
+    def test_clears_cities_without_locations(self):
+        city = baker.make(City)
+        schedule = make_schedule_at(city, -5.0, -35.0)
+        compute_city_centroids()
+
+        schedule.delete()
+        compute_city_centroids()
+
+        city.refresh_from_db()
+        assert city.latitude is None
+        assert city.max_longitude is None
+
+    def test_command(self):
+        city = baker.make(City)
+        make_schedule_at(city, -5.0, -35.0)
+
+        call_command("compute_city_centroids")
+
+        city.refresh_from_db()
+        assert city.latitude == -5.0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_refreshed_when_schedule_location_changes():
+    city = baker.make(City)
+    schedule = make_schedule_at(city, -5.0, -35.0)
+    city.refresh_from_db()
+    assert city.latitude == -5.0
+
+    schedule.location = baker.make(
+        "core.Location", latitude=Decimal("-6"), longitude=Decimal("-36")
+    )
+    schedule.save()
+
+    city.refresh_from_db()
+    assert (city.latitude, city.longitude) == (-6.0, -36.0)
+
+
+@pytest.mark.django_db
+class TestNearestCity:
+    def test_nearest(self):
+        natal = baker.make(City)
+        make_schedule_at(natal, -5.79, -35.21)
+        sao_paulo = baker.make(City)
+        make_schedule_at(sao_paulo, -23.55, -46.63)
+        compute_city_centroids()
+
+        assert nearest_city(-5.9, -35.2) == natal
+        assert nearest_city(-23.0, -46.0) == sao_paulo
+
+    def test_ignores_cities_without_centroid(self):
+        baker.make(City)
+
+        assert nearest_city(-5.9, -35.2) is None
+
+    def test_too_far(self):
+        city = baker.make(City)
+        make_schedule_at(city, -23.55, -46.63)
+        compute_city_centroids()
+
+        assert nearest_city(-5.9, -35.2) is None
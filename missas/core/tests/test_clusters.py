@@ -0,0 +1,159 @@
+from decimal import Decimal
+
+import pytest
+from django.core.cache import cache
+from model_bakery import baker
+
+from missas.core.clusters import (
+    compute_tile,
+    get_clusters,
+    tile_bbox,
+    tile_cache_key,
+    tile_for,
+)
+
+NATAL = (-5.7945, -35.2110)
+PARNAMIRIM = (-5.9156, -35.2628)
+
+
+@pytest.fixture
+def locmem_cache(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    cache.clear()
+
+
+def make_location(lat, lng):
+    return baker.make(
+        "core.Location", latitude=Decimal(str(lat)), longitude=Decimal(str(lng))
+    )
+
+
+def test_tile_for():
+    assert tile_for(*NATAL, 0) == (0, 0)
+    assert tile_for(*NATAL, 10) == (411, 528)
+
+
+def test_tile_bbox_contains_point():
+    min_lat, min_lng, max_lat, max_lng = tile_bbox(10, *tile_for(*NATAL, 10))
+
+    assert min_lat < NATAL[0] < max_lat
+    assert min_lng < NATAL[1] < max_lng
+
+
+@pytest.mark.django_db
+class TestComputeTile:
+    def test_groups_nearby_locations(self):
+        make_location(*NATAL)
+        make_location(NATAL[0] + 0.001, NATAL[1])
+        make_location(-23.55, -46.63)
+
+        clusters = compute_tile(5, *tile_for(*NATAL, 5))
+
+        assert len(clusters) == 1
+        assert clusters[0]["count"] == 2
+        assert clusters[0]["latitude"] == pytest.approx(NATAL[0] + 0.0005)
+
+    def test_splits_in_higher_zoom(self):
+        make_location(*NATAL)
+        make_location(*PARNAMIRIM)
+
+        assert len(compute_tile(5, *tile_for(*NATAL, 5))) == 1
+        assert len(compute_tile(12, *tile_for(*NATAL, 12))) == 1
+        assert len(compute_tile(12, *tile_for(*PARNAMIRIM, 12))) == 1
+
+    def test_representative_parish(self):
+        location = make_location(*NATAL)
+        schedule = baker.make("core.Schedule", location=location)
+        make_location(NATAL[0] + 0.001, NATAL[1])
+        parish = schedule.parish
+
+        clusters = compute_tile(5, *tile_for(*NATAL, 5))
+
+        assert clusters[0]["parish"] == {
+            "name": parish.name,
+            "url": f"/{parish.city.state.slug}/{parish.city.slug}/{parish.slug}/",
+        }
+
+    def test_without_parish(self):
+        make_location(*NATAL)
+
+        assert compute_tile(5, *tile_for(*NATAL, 5))[0]["parish"] is None
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("locmem_cache")
+class TestGetClusters:
+    def test_served_from_cache_without_database(self, django_assert_num_queries):
+        make_location(*NATAL)
+        get_clusters(-6, -36, -5, -35, 8)
+
+        with django_assert_num_queries(0):
+            clusters = get_clusters(-6, -36, -5, -35, 8)
+
+        assert [c["count"] for c in clusters] == [1]
+
+    def test_only_missing_tiles_are_computed(self, django_assert_num_queries):
+        make_location(*NATAL)
+        get_clusters(-6, -36, -5, -35, 8)
+        cache.delete(tile_cache_key(8, *tile_for(*NATAL, 8)))
+
+        with django_assert_num_queries(2):
+            get_clusters(-6, -36, -5, -35, 8)
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures("locmem_cache")
+class TestInvalidation:
+    def test_location_added(self):
+        make_location(*NATAL)
+        get_clusters(-6, -36, -5, -35, 8)
+
+        make_location(*PARNAMIRIM)
+
+        assert sum(c["count"] for c in get_clusters(-6, -36, -5, -35, 8)) == 2
+
+    def test_location_moved_away(self):
+        location = make_location(*NATAL)
+        assert len(get_clusters(-6, -36, -5, -35, 8)) == 1
+
+        location.latitude = Decimal("-23.55")
+        location.longitude = Decimal("-46.63")
+        location.save()
+
+        assert get_clusters(-6, -36, -5, -35, 8) == []
+        assert len(get_clusters(-24, -47, -23, -46, 8)) == 1
+
+    def test_other_tiles_are_kept(self):
+        make_location(-23.55, -46.63)
+        get_clusters(-24, -47, -23, -46, 8)
+        key = tile_cache_key(8, *tile_for(-23.55, -46.63, 8))
+
+        make_location(*NATAL)
+
+        assert cache.get(key) is not None
+
+    def test_schedule_location_changed(self):
+        location = make_location(*NATAL)
+        assert get_clusters(-6, -36, -5, -35, 8)[0]["parish"] is None
+
+        schedule = baker.make("core.Schedule", location=location)
+
+        assert (
+            get_clusters(-6, -36, -5, -35, 8)[0]["parish"]["name"]
+            == schedule.parish.name
+        )
+
+    @pytest.mark.parametrize("model", ("city", "state"))
+    def test_slug_renamed(self, model):
+        schedule = baker.make("core.Schedule", location=make_location(*NATAL))
+        get_clusters(-6, -36, -5, -35, 8)
+        city = schedule.parish.city
+        renamed = city if model == "city" else city.state
+        renamed.slug = "renomeado"
+        renamed.save()
+
+        url = get_clusters(-6, -36, -5, -35, 8)[0]["parish"]["url"]
+
+        assert "/renomeado/" in url
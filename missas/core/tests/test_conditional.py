@@ -0,0 +1,165 @@
+from datetime import time
+from http import HTTPStatus
+
+import pytest
+from django.shortcuts import resolve_url
+from django.utils.http import http_date
+from model_bakery import baker
+
+from missas.core.models import City, Contact, Location, NearbyParish, Parish, Schedule
+
+
+@pytest.fixture
+def no_cache(settings):
+    """Let every request reach the view instead of the cache middleware."""
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+    }
+
+
+@pytest.fixture
+def schedule(db):
+    schedule = baker.make(
+        Schedule,
+        day=Schedule.Day.SUNDAY,
+        start_time=time(9),
+        location=baker.make(Location),
+    )
+    baker.make(Contact, parish=schedule.parish)
+    return schedule
+
+
+def urls(parish):
+    city, state = parish.city, parish.city.state
+    city_url = resolve_url("by_city", state=state.slug, city=city.slug)
+    cards_url = resolve_url("by_city_cards", state=state.slug, city=city.slug)
+    query = "?tipo=missas&dia=domingo&horario=0"
+    return [
+        resolve_url("index"),
+        resolve_url("cities_by_state", state=state.slug),
+        city_url + query,
+        cards_url + query,
+        resolve_url(
+            "parish_detail", state=state.slug, city=city.slug, parish=parish.slug
+        ),
+    ]
+
+
+def etags(client, parish):
+    return [client.get(url)["ETag"] for url in urls(parish)]
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("no_cache")
+class TestView:
+    def test_not_modified(self, client, schedule, django_assert_max_num_queries):
+        for url in urls(schedule.parish):
+            response = client.get(url)
+
+            # Only the query computing the ETag
+            with django_assert_max_num_queries(1):
+                not_modified = client.get(
+                    url, headers={"If-None-Match": response["ETag"]}
+                )
+
+            assert response.status_code == HTTPStatus.OK, url
+            assert not_modified.status_code == HTTPStatus.NOT_MODIFIED, url
+
+    def test_not_modified_since(self, client, schedule):
+        for url in urls(schedule.parish):
+            last_modified = client.get(url)["Last-Modified"]
+
+            response = client.get(url, headers={"If-Modified-Since": last_modified})
+
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, url
+
+    def test_modified_since(self, client, schedule):
+        for url in urls(schedule.parish):
+            response = client.get(url, headers={"If-Modified-Since": http_date(0)})
+
+            assert response.status_code == HTTPStatus.OK, url
+
+    def test_changes_with_the_schedules(self, client, schedule):
+        before = etags(client, schedule.parish)
+
+        schedule.start_time = time(10)
+        schedule.save()
+
+        assert all(
+            old != new for old, new in zip(before, etags(client, schedule.parish))
+        )
+
+    def test_changes_when_a_schedule_is_deleted(self, client, schedule):
+        other = baker.make(Schedule, parish=schedule.parish)
+        before = etags(client, schedule.parish)
+
+        other.delete()
+
+        assert all(
+            old != new for old, new in zip(before, etags(client, schedule.parish))
+        )
+
+    @pytest.mark.parametrize("model", ("contact", "location", "source"))
+    def test_city_and_parish_change_with_related_rows(self, client, model):
+        schedule = baker.make(
+            Schedule, location=baker.make(Location), _fill_optional=["source"]
+        )
+        baker.make(Contact, parish=schedule.parish)
+        related = {
+            "contact": schedule.parish.contact,
+            "location": schedule.location,
+            "source": schedule.source,
+        }[model]
+        before = etags(client, schedule.parish)[2:]
+
+        related.save()
+
+        assert all(
+            old != new for old, new in zip(before, etags(client, schedule.parish)[2:])
+        )
+
+    def test_parish_changes_with_nearby_parishes(self, client, schedule):
+        before = etags(client, schedule.parish)[-1]
+
+        baker.make(NearbyParish, parish=schedule.parish, nearby=baker.make(Parish))
+
+        assert etags(client, schedule.parish)[-1] != before
+
+    def test_index_ignores_cities_without_schedules(self, client, schedule):
+        before = etags(client, schedule.parish)[0]
+
+        baker.make(City)
+
+        assert etags(client, schedule.parish)[0] == before
+
+    def test_not_validated_while_depending_on_the_clock(self, client, schedule):
+        url = resolve_url(
+            "by_city",
+            state=schedule.parish.city.state.slug,
+            city=schedule.parish.city.slug,
+        )
+
+        response = client.get(url, headers={"If-None-Match": "*"})
+
+        assert response.status_code == HTTPStatus.FOUND
+        assert "ETag" not in response
+
+    def test_changes_with_the_templates(self, client, schedule, mocker):
+        before = etags(client, schedule.parish)
+
+        mocker.patch("missas.core.conditional.template_version", return_value="new")
+
+        assert all(
+            old != new for old, new in zip(before, etags(client, schedule.parish))
+        )
+
+
+@pytest.mark.django_db
+def test_cached_pages_are_not_modified(client, schedule, django_assert_num_queries):
+    for url in urls(schedule.parish):
+        etag = client.get(url)["ETag"]
+
+        with django_assert_num_queries(0):
+            response = client.get(url, headers={"If-None-Match": etag})
+
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, url
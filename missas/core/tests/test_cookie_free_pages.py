@@ -0,0 +1,49 @@
+import pytest
+from django.shortcuts import resolve_url
+from model_bakery import baker
+
+from missas.core.models import Schedule
+
+
+@pytest.fixture
+def schedule(db):
+    return baker.make(Schedule)
+
+
+def urls(schedule):
+    parish = schedule.parish
+    city = parish.city
+    state = city.state
+    return [
+        resolve_url("index"),
+        resolve_url("cities_by_state", state=state.slug),
+        resolve_url("by_city", state=state.slug, city=city.slug)
+        + "?tipo=missas&dia=domingo&horario=0",
+        resolve_url("by_city_cards", state=state.slug, city=city.slug)
+        + "?tipo=missas&dia=domingo&horario=0",
+        resolve_url(
+            "parish_detail", state=state.slug, city=city.slug, parish=parish.slug
+        ),
+    ]
+
+
+def test_no_cookies(client, schedule):
+    for url in urls(schedule):
+        response = client.get(url)
+
+        assert response.cookies == {}, url
+        assert "Set-Cookie" not in response.headers, url
+        assert "Cookie" not in response.headers.get("Vary", ""), url
+
+
+def test_single_cache_entry_for_every_visitor(client, schedule):
+    for url in urls(schedule):
+        first = client.get(url)
+        client.cookies["csrftoken"] = "another-visitor"
+        client.cookies["sessionid"] = "another-session"
+
+        second = client.get(url)
+
+        assert second.content == first.content, url
+        assert "Age" in second.headers, url
+        client.cookies.clear()
@@ -0,0 +1,90 @@
+import random
+
+import pytest
+from model_bakery import baker
+
+from missas.core.distances import LocationSnapshot, location_snapshot
+from missas.core.geo import haversine
+
+NATAL = (-5.7945, -35.2110)
+
+
+@pytest.fixture
+def points():
+    rng = random.Random(0)  # noqa: S311
+    return [
+        (i, rng.uniform(-33.7, 5.3), rng.uniform(-74.0, -34.8)) for i in range(2_000)
+    ]
+
+
+def reference(points, lat, lng):
+    return sorted(
+        (haversine(lat, lng, p_lat, p_lng), pk) for pk, p_lat, p_lng in points
+    )
+
+
+def snapshot_of(points):
+    return LocationSnapshot(*zip(*points))
+
+
+class TestSnapshot:
+    def test_distances_match_reference_haversine(self, points):
+        snapshot = snapshot_of(points)
+
+        distances = list(snapshot.distances(*NATAL))
+
+        assert distances == pytest.approx(
+            [haversine(*NATAL, lat, lng) for _, lat, lng in points], rel=1e-9
+        )
+
+    def test_within_matches_reference(self, points):
+        snapshot = snapshot_of(points)
+        expected = [pair for pair in reference(points, *NATAL) if pair[0] <= 500]
+
+        result = snapshot.within(*NATAL, radius_km=500)
+
+        assert [pk for _, pk in result] == [pk for _, pk in expected]
+        assert [d for d, _ in result] == pytest.approx([d for d, _ in expected])
+
+    def test_nearest_matches_reference(self, points):
+        snapshot = snapshot_of(points)
+        expected = reference(points, *NATAL)[:10]
+
+        result = snapshot.nearest(*NATAL, k=10)
+
+        assert [pk for _, pk in result] == [pk for _, pk in expected]
+
+    def test_nearest_with_radius(self, points):
+        snapshot = snapshot_of(points)
+        expected = [pair for pair in reference(points, *NATAL) if pair[0] <= 300]
+
+        result = snapshot.nearest(*NATAL, k=1_000, radius_km=300)
+
+        assert [pk for _, pk in result] == [pk for _, pk in expected]
+
+    def test_nearest_k_larger_than_size(self):
+        snapshot = snapshot_of([(1, *NATAL)])
+
+        assert snapshot.nearest(*NATAL, k=5) == [(0.0, 1)]
+        assert snapshot.nearest(*NATAL, k=0) == []
+
+    def test_empty(self):
+        snapshot = LocationSnapshot([], [], [])
+
+        assert len(snapshot) == 0
+        assert snapshot.within(*NATAL, 10) == []
+        assert snapshot.nearest(*NATAL, 10) == []
+
+
+@pytest.mark.django_db
+def test_location_snapshot_rebuilds_when_locations_change():
+    location = baker.make("core.Location", latitude=NATAL[0], longitude=NATAL[1])
+    snapshot = location_snapshot.get()
+
+    assert location_snapshot.get() is snapshot
+    assert [pk for _, pk in snapshot.within(*NATAL, 1)] == [location.pk]
+
+    location.delete()
+
+    assert location_snapshot.get() is not snapshot
+    assert location_snapshot.get().within(*NATAL, 1) == []
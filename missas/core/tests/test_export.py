@@ -0,0 +1,129 @@
+import json
+from datetime import time
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from model_bakery import baker
+
+from missas.core.export import export_version, geojson_chunks
+from missas.core.models import Schedule
+
+
+def export():
+    return json.loads("".join(geojson_chunks()))
+
+
+@pytest.mark.django_db
+def test_empty():
+    assert export() == {"type": "FeatureCollection", "features": []}
+
+
+@pytest.mark.django_db
+def test_features():
+    location = baker.make(
+        "core.Location",
+        name="Catedral",
+        address="Av. Deodoro",
+        latitude=Decimal("-5.7945"),
+        longitude=Decimal("-35.2110"),
+    )
+    schedule = baker.make(
+        "core.Schedule",
+        location=location,
+        day=Schedule.Day.SUNDAY,
+        start_time=time(7),
+        end_time=time(8),
+        type=Schedule.Type.MASS,
+        verified_at=None,
+    )
+    parish = schedule.parish
+
+    assert export()["features"] == [
+        {
+            "type": "Feature",
+            "id": location.pk,
+            "geometry": {"type": "Point", "coordinates": [-35.211, -5.7945]},
+            "properties": {
+                "name": "Catedral",
+                "address": "Av. Deodoro",
+                "parishes": [
+                    {
+                        "name": parish.name,
+                        "city": parish.city.name,
+                        "state": parish.city.state.short_name,
+                        "url": f"/{parish.city.state.slug}/{parish.city.slug}/{parish.slug}/",
+                    }
+                ],
+                "schedules": [
+                    {
+                        "parish": parish.name,
+                        "type": "mass",
+                        "day": "Domingo",
+                        "start_time": "07:00",
+                        "end_time": "08:00",
+                        "verified": False,
+                    }
+                ],
+            },
+        }
+    ]
+
+
+@pytest.mark.django_db
+def test_schedules_are_matched_to_their_locations():
+    first, without_schedules, last = baker.make(
+        "core.Location",
+        latitude=Decimal("-5.79"),
+        longitude=Decimal("-35.21"),
+        _quantity=3,
+    )
+    baker.make("core.Schedule", location=first, day=Schedule.Day.MONDAY)
+    baker.make("core.Schedule", location=last, _quantity=2)
+    baker.make("core.Schedule", location=None)
+
+    features = {f["id"]: f["properties"]["schedules"] for f in export()["features"]}
+
+    assert {pk: len(schedules) for pk, schedules in features.items()} == {
+        first.pk: 1,
+        without_schedules.pk: 0,
+        last.pk: 2,
+    }
+
+
+@pytest.mark.django_db
+def test_export_version_changes():
+    location = baker.make(
+        "core.Location", latitude=Decimal("-5.79"), longitude=Decimal("-35.21")
+    )
+    version = export_version()
+    assert export_version() == version
+
+    location.name = "Outro nome"
+    location.save()
+    assert export_version() != version
+
+    version = export_version()
+    location.delete()
+    assert export_version() != version
+
+
+@pytest.mark.django_db
+def test_command_stdout():
+    baker.make("core.Location", latitude=Decimal("-5.79"), longitude=Decimal("-35.21"))
+    stdout = StringIO()
+
+    call_command("export_geojson", stdout=stdout)
+
+    assert len(json.loads(stdout.getvalue())["features"]) == 1
+
+
+@pytest.mark.django_db
+def test_command_output_file(tmp_path):
+    baker.make("core.Location", latitude=Decimal("-5.79"), longitude=Decimal("-35.21"))
+    output = tmp_path / "locais.geojson"
+
+    call_command("export_geojson", output=str(output), stdout=StringIO())
+
+    assert len(json.loads(output.read_text())["features"]) == 1
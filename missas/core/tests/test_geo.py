@@ -0,0 +1,79 @@
+import pytest
+
+from missas.core.geo import GridIndex, bounding_box, haversine
+
+NATAL = (-5.7945, -35.2110)
+PARNAMIRIM = (-5.9156, -35.2628)
+SAO_PAULO = (-23.5505, -46.6333)
+
+
+def test_haversine():
+    assert haversine(*NATAL, *NATAL) == 0
+    assert haversine(*NATAL, *PARNAMIRIM) == pytest.approx(14.6, abs=0.1)
+    assert haversine(*NATAL, *SAO_PAULO) == pytest.approx(2_343, rel=0.01)
+
+
+def test_bounding_box_contains_radius():
+    min_lat, min_lng, max_lat, max_lng = bounding_box(*NATAL, 10)
+
+    assert haversine(*NATAL, min_lat, NATAL[1]) == pytest.approx(10)
+    assert haversine(*NATAL, NATAL[0], min_lng) == pytest.approx(10, rel=0.01)
+    assert min_lat < NATAL[0] < max_lat
+    assert min_lng < NATAL[1] < max_lng
+
+
+class TestGridIndex:
+    def test_nearby_orders_by_distance(self):
+        index = GridIndex(
+            [("sp", *SAO_PAULO), ("parnamirim", *PARNAMIRIM), ("natal", *NATAL)]
+        )
+
+        result = index.nearby(-5.80, -35.21, radius_km=50)
+
+        assert [key for _, key in result] == ["natal", "parnamirim"]
+        assert result[0][0] < result[1][0]
+
+    def test_nearby_respects_radius(self):
+        index = GridIndex([("natal", *NATAL), ("parnamirim", *PARNAMIRIM)])
+
+        assert [key for _, key in index.nearby(*NATAL, radius_km=5)] == ["natal"]
+
+    def test_nearby_limit(self):
+        index = GridIndex([("natal", *NATAL), ("parnamirim", *PARNAMIRIM)])
+
+        assert len(index.nearby(*NATAL, radius_km=50, limit=1)) == 1
+
+    def test_matches_linear_scan_across_cells(self):
+        points = [
+            (i, NATAL[0] + (i % 20) * 0.013, NATAL[1] + (i // 20) * 0.017)
+            for i in range(400)
+        ]
+        index = GridIndex(points, cell_size=0.05)
+
+        expected = sorted(
+            (haversine(*NATAL, lat, lng), key)
+            for key, lat, lng in points
+            if haversine(*NATAL, lat, lng) <= 20
+        )
+
+        assert index.nearby(*NATAL, radius_km=20) == expected
+
+
+class TestGridIndexNearest:
+    def test_nearest(self):
+        index = GridIndex([("natal", *NATAL), ("sp", *SAO_PAULO)])
+
+        distance, key = index.nearest(-5.9, -35.2, max_radius_km=100)
+
+        assert key == "natal"
+        assert distance == pytest.approx(11.8, abs=0.1)
+
+    def test_expands_until_found(self):
+        index = GridIndex([("sp", *SAO_PAULO), ("natal", *NATAL)])
+
+        assert index.nearest(-20, -45, max_radius_km=5_000)[1] == "sp"
+
+    def test_none_beyond_max_radius(self):
+        index = GridIndex([("sp", *SAO_PAULO)])
+
+        assert index.nearest(*NATAL, max_radius_km=100) is None
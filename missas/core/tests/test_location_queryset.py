@@ -0,0 +1,99 @@
+from decimal import Decimal
+
+import pytest
+from model_bakery import baker
+
+from missas.core.geo import encode_geohash
+from missas.core.models import Location
+
+NATAL = (Decimal("-5.79450000"), Decimal("-35.21100000"))
+PARNAMIRIM = (Decimal("-5.91560000"), Decimal("-35.26280000"))
+SAO_PAULO = (Decimal("-23.55050000"), Decimal("-46.63330000"))
+
+
+@pytest.mark.django_db
+class TestIndexedCoordinates:
+    def test_set_on_create(self):
+        location = baker.make(Location, latitude=NATAL[0], longitude=NATAL[1])
+
+        location.refresh_from_db()
+        assert location.latitude_e6 == -5_794_500
+        assert location.longitude_e6 == -35_211_000
+        assert location.geohash == encode_geohash(*NATAL)
+
+    def test_updated_with_update_fields(self):
+        location = baker.make(Location, latitude=NATAL[0], longitude=NATAL[1])
+
+        location.latitude, location.longitude = SAO_PAULO
+        location.save(update_fields=["latitude", "longitude"])
+
+        location.refresh_from_db()
+        assert location.latitude_e6 == -23_550_500
+        assert location.longitude_e6 == -46_633_300
+        assert location.geohash == encode_geohash(*SAO_PAULO)
+
+
+def test_encode_geohash():
+    assert encode_geohash(57.64911, 10.40744, precision=11) == "u4pruydqqvj"
+    assert encode_geohash(*NATAL).startswith("7nyz")
+
+
+@pytest.mark.django_db
+class TestWithinBbox:
+    def test_filters_by_bounding_box(self):
+        natal = baker.make(Location, latitude=NATAL[0], longitude=NATAL[1])
+        baker.make(Location, latitude=SAO_PAULO[0], longitude=SAO_PAULO[1])
+
+        result = Location.objects.within_bbox(-6, -36, -5, -35)
+
+        assert list(result) == [natal]
+
+    def test_bounds_are_inclusive(self):
+        natal = baker.make(Location, latitude=NATAL[0], longitude=NATAL[1])
+
+        result = Location.objects.within_bbox(*NATAL, *NATAL)
+
+        assert list(result) == [natal]
+
+    def test_uses_index(self):
+        plan = Location.objects.within_bbox(-6, -36, -5, -35).explain()
+
+        assert "USING INDEX" in plan
+
+
+@pytest.mark.django_db
+def test_in_geohash():
+    natal = baker.make(Location, latitude=NATAL[0], longitude=NATAL[1])
+    baker.make(Location, latitude=SAO_PAULO[0], longitude=SAO_PAULO[1])
+
+    assert list(Location.objects.in_geohash(natal.geohash[:3])) == [natal]
+
+
+@pytest.mark.django_db
+class TestNear:
+    def test_orders_by_distance_and_sets_it(self):
+        parnamirim = baker.make(
+            Location, latitude=PARNAMIRIM[0], longitude=PARNAMIRIM[1]
+        )
+        natal = baker.make(Location, latitude=NATAL[0], longitude=NATAL[1])
+        baker.make(Location, latitude=SAO_PAULO[0], longitude=SAO_PAULO[1])
+
+        result = Location.objects.near(-5.80, -35.21, radius_km=50)
+
+        assert result == [natal, parnamirim]
+        assert result[0].distance == pytest.approx(0.6, abs=0.1)
+        assert result[1].distance == pytest.approx(14.1, abs=0.1)
+
+    def test_excludes_bounding_box_corners(self):
+        # Inside the bounding box of a 15 km radius but ~17 km away
+        baker.make(Location, latitude=Decimal("-5.69"), longitude=Decimal("-35.10"))
+
+        assert Location.objects.near(*map(float, NATAL), radius_km=15) == []
+
+    def test_chains_with_other_filters(self):
+        natal = baker.make(Location, latitude=NATAL[0], longitude=NATAL[1])
+        baker.make(Location, latitude=NATAL[0], longitude=NATAL[1])
+
+        result = Location.objects.filter(pk=natal.pk).near(*map(float, NATAL), 1)
+
+        assert result == [natal]
@@ -0,0 +1,157 @@
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from model_bakery import baker
+
+from missas.core.models import NearbyParish
+from missas.core.nearby_parishes import (
+    NEARBY_PARISHES_K,
+    compute_nearby_parishes,
+    parish_coordinates,
+    refresh_nearby_parishes,
+)
+
+
+def make_parish_at(lat, lng):
+    parish = baker.make("core.Parish")
+    location = baker.make(
+        "core.Location", latitude=Decimal(str(lat)), longitude=Decimal(str(lng))
+    )
+    baker.make("core.Schedule", parish=parish, location=location)
+    return parish
+
+
+def nearby_of(parish):
+    return list(
+        NearbyParish.objects.filter(parish=parish)
+        .order_by("rank")
+        .values_list("nearby", flat=True)
+    )
+
+
+@pytest.mark.django_db
+class TestParishCoordinates:
+    def test_centroid_of_locations(self):
+        parish = make_parish_at(-5.0, -35.0)
+        other_location = baker.make(
+            "core.Location", latitude=Decimal("-5.2"), longitude=Decimal("-35.4")
+        )
+        baker.make("core.Schedule", parish=parish, location=other_location)
+        baker.make("core.Schedule", parish=parish, location=other_location)
+
+        assert parish_coordinates() == {parish.pk: pytest.approx((-5.1, -35.2))}
+
+    def test_ignores_parishes_without_location(self):
+        baker.make("core.Schedule", location=None)
+
+        assert parish_coordinates() == {}
+
+
+@pytest.mark.django_db
+class TestComputeNearbyParishes:
+    def test_orders_by_distance(self):
+        parish = make_parish_at(-5.80, -35.21)
+        far = make_parish_at(-5.90, -35.21)
+        near = make_parish_at(-5.81, -35.21)
+        make_parish_at(-23.55, -46.63)
+
+        compute_nearby_parishes()
+
+        assert nearby_of(parish) == [near.pk, far.pk]
+        row = NearbyParish.objects.get(parish=parish, rank=0)
+        assert row.distance == pytest.approx(1.11, abs=0.01)
+
+    def test_limits_to_k(self):
+        parish = make_parish_at(-5.80, -35.21)
+        for i in range(NEARBY_PARISHES_K + 2):
+            make_parish_at(-5.80 - (i + 1) * 0.01, -35.21)
+
+        compute_nearby_parishes()
+
+        assert len(nearby_of(parish)) == NEARBY_PARISHES_K
+
+    def test_command(self):
+        parish = make_parish_at(-5.80, -35.21)
+        near = make_parish_at(-5.81, -35.21)
+
+        call_command("compute_nearby_parishes")
+
+        assert nearby_of(parish) == [near.pk]
+        assert nearby_of(near) == [parish.pk]
+
+
+@pytest.mark.django_db
+class TestRefreshNearbyParishes:
+    def test_updates_only_parishes_in_range(self):
+        parish = make_parish_at(-5.80, -35.21)
+        neighbour = make_parish_at(-5.81, -35.21)
+        sao_paulo = make_parish_at(-23.55, -46.63)
+        sao_paulo_neighbour = make_parish_at(-23.56, -46.63)
+        compute_nearby_parishes()
+        sao_paulo_rows = list(NearbyParish.objects.filter(parish=sao_paulo))
+
+        moved = make_parish_at(-5.805, -35.21)
+        refresh_nearby_parishes([moved.pk])
+
+        assert nearby_of(parish) == [moved.pk, neighbour.pk]
+        assert nearby_of(moved) == [parish.pk, neighbour.pk]
+        assert list(NearbyParish.objects.filter(parish=sao_paulo)) == sao_paulo_rows
+        assert nearby_of(sao_paulo) == [sao_paulo_neighbour.pk]
+
+    def test_removes_parish_from_old_neighbours(self):
+        parish = make_parish_at(-5.80, -35.21)
+        neighbour = make_parish_at(-5.81, -35.21)
+        compute_nearby_parishes()
+
+        location = neighbour.schedules.get().location
+        location.latitude = Decimal("-23.55")
+        location.longitude = Decimal("-46.63")
+        location.save()
+        refresh_nearby_parishes([neighbour.pk])
+
+        assert nearby_of(parish) == []
+        assert nearby_of(neighbour) == []
+
+
+@pytest.mark.django_db(transaction=True)
+class TestHooks:
+    def test_schedule_created(self):
+        parish = make_parish_at(-5.80, -35.21)
+        neighbour = make_parish_at(-5.81, -35.21)
+
+        assert nearby_of(parish) == [neighbour.pk]
+
+    def test_location_moved(self):
+        parish = make_parish_at(-5.80, -35.21)
+        neighbour = make_parish_at(-5.81, -35.21)
+
+        location = neighbour.schedules.get().location
+        location.latitude = Decimal("-23.55")
+        location.save()
+
+        assert nearby_of(parish) == []
+
+    def test_location_deleted(self):
+        parish = make_parish_at(-5.80, -35.21)
+        neighbour = make_parish_at(-5.81, -35.21)
+
+        neighbour.schedules.get().location.delete()
+
+        assert nearby_of(parish) == []
+
+    def test_parish_deleted(self):
+        parish = make_parish_at(-5.80, -35.21)
+        neighbour = make_parish_at(-5.81, -35.21)
+
+        neighbour.delete()
+
+        assert nearby_of(parish) == []
+
+    def test_schedule_without_location_is_ignored(self, django_assert_num_queries):
+        parish = baker.make("core.Parish")
+
+        # The insert, the lookup of the parish's cache tags, the home page
+        # counters and the schedule counts of the parish and city
+        with django_assert_num_queries(6):
+            baker.make("core.Schedule", parish=parish, location=None)
@@ -0,0 +1,175 @@
+from datetime import time
+
+import pytest
+from django.shortcuts import resolve_url
+from model_bakery import baker
+
+from missas.core.models import City, Location, Parish, Schedule, State
+
+pytestmark = pytest.mark.django_db
+
+# Multi-index ORs return rows by index, not in the order asked for
+WINDOW_SORT = ('"core_schedule"."start_minute_of_week"', "USE TEMP B-TREE FOR ORDER BY")
+
+
+@pytest.fixture
+def dataset():
+    """A few of each, enough for every join and filter of the pages to apply."""
+    states = baker.make(State, _quantity=2)
+    cities = [
+        baker.make(City, state=state, slug=f"cidade-{state.pk}-{i}")
+        for state in states
+        for i in range(3)
+    ]
+    parishes = [
+        baker.make(Parish, city=city, slug=f"paroquia-{city.pk}-{i}")
+        for city in cities[:4]
+        for i in range(2)
+    ]
+    locations = baker.make(Location, _quantity=3)
+    for i, parish in enumerate(parishes):
+        baker.make("core.Contact", parish=parish)
+        for day in (Schedule.Day.SATURDAY, Schedule.Day.SUNDAY):
+            for hour in (7, 19):
+                baker.make(
+                    Schedule,
+                    parish=parish,
+                    day=day,
+                    start_time=time(hour),
+                    location=locations[i % len(locations)],
+                )
+    return parishes[0]
+
+
+def test_index(client, dataset, query_plans):
+    allowed = [
+        # The validators count whole tables, only when the page isn't cached. The
+        # cities go through the partial index of the ones with schedules
+        *(
+            ("UNION ALL", f"SCAN {table}")
+            for table in ("core_location", "core_parish", "core_schedule")
+        ),
+        # The cities of all states at once, the IN over them loses the order
+        ('"core_city"."state_id" IN (', "USE TEMP B-TREE FOR ORDER BY"),
+    ]
+    with query_plans(allowed) as plans:
+        client.get(resolve_url("index"))
+
+    assert plans.captured_queries
+    assert plans.problems == []
+
+
+def test_cities_by_state(client, dataset, query_plans):
+    with query_plans() as plans:
+        client.get(resolve_url("cities_by_state", state=dataset.city.state.slug))
+
+    assert plans.captured_queries
+    assert plans.problems == []
+
+
+@pytest.mark.parametrize("view", ["by_city", "by_city_cards"])
+def test_by_city(client, dataset, query_plans, view):
+    city = dataset.city
+
+    with query_plans(allowed=[WINDOW_SORT]) as plans:
+        client.get(
+            resolve_url(view, state=city.state.slug, city=city.slug),
+            data={"tipo": "missas", "dia": "domingo", "horario": "8"},
+        )
+
+    assert plans.captured_queries
+    assert plans.problems == []
+
+
+def test_parish_detail(client, dataset, query_plans):
+    city = dataset.city
+
+    # The (parish, day, start_time) index orders all but the tiebreakers
+    allowed = [
+        (
+            'FROM "core_schedule" WHERE "core_schedule"."parish_id" =',
+            "USE TEMP B-TREE FOR RIGHT PART OF ORDER BY",
+        )
+    ]
+    with query_plans(allowed) as plans:
+        client.get(
+            resolve_url(
+                "parish_detail",
+                state=city.state.slug,
+                city=city.slug,
+                parish=dataset.slug,
+            )
+        )
+
+    assert plans.captured_queries
+    assert plans.problems == []
+
+
+def test_nearby(client, dataset, query_plans):
+    location = Location.objects.first()
+    (index,) = Location._meta.indexes
+    allowed = [
+        # Loads the coordinates of every location once per worker
+        (
+            'SELECT "core_location"."id" AS "id"',
+            f"SCAN core_location USING COVERING INDEX {index.name}",
+        ),
+        # One row per location and parish out of their schedules
+        (
+            'SELECT DISTINCT "core_schedule"."location_id"',
+            "USE TEMP B-TREE FOR DISTINCT",
+        ),
+    ]
+
+    with query_plans(allowed) as plans:
+        client.get(
+            resolve_url("nearby"),
+            data={"lat": location.latitude, "lng": location.longitude, "raio": 5000},
+        )
+
+    assert plans.captured_queries
+    assert plans.problems == []
+
+
+def test_map_clusters(client, dataset, query_plans):
+    location = Location.objects.first()
+    bbox = (
+        location.longitude - 1,
+        location.latitude - 1,
+        location.longitude + 1,
+        location.latitude + 1,
+    )
+
+    with query_plans() as plans:
+        client.get(
+            resolve_url("map_clusters"),
+            data={"zoom": 10, "bbox": ",".join(map(str, bbox))},
+        )
+
+    assert plans.captured_queries
+    assert plans.problems == []
+
+
+def test_filter_with_schedule(dataset, query_plans):
+    with query_plans() as plans:
+        list(City.objects.filter_with_schedule())
+
+    assert plans.captured_queries
+    assert plans.problems == []
+
+
+def test_reports_full_scans(dataset, query_plans):
+    with query_plans() as plans:
+        list(Schedule.objects.filter(observation="Missa campal"))
+
+    assert [line for _, line in plans.problems] == ["SCAN core_schedule"]
+
+
+def test_allowances_apply_to_their_statements(dataset, query_plans):
+    with query_plans([('"observation" =', "SCAN core_schedule")]) as plans:
+        list(Schedule.objects.filter(observation="Missa campal"))
+        list(Schedule.objects.filter(location_name="Matriz"))
+
+    ((sql, line),) = plans.problems
+    assert '"location_name" =' in sql
+    assert line == "SCAN core_schedule"
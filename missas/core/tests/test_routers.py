@@ -0,0 +1,125 @@
+import threading
+import time
+
+import pytest
+from django.db import OperationalError, connections, router, transaction
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.shortcuts import resolve_url
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+
+from missas.core.models import ContactRequest, Parish, Schedule
+from missas.core.routers import READER_ALIAS, public_reads
+
+
+def test_public_reads_use_the_reader():
+    with public_reads():
+        assert Parish.objects.all().db == READER_ALIAS
+
+
+def test_other_reads_use_the_writer():
+    assert Parish.objects.all().db == "default"
+
+
+def test_writes_use_the_writer():
+    with public_reads():
+        assert router.db_for_write(Parish) == "default"
+
+
+@pytest.mark.django_db
+def test_reads_in_a_transaction_use_the_writer():
+    with public_reads(), transaction.atomic():
+        assert Parish.objects.all().db == "default"
+
+
+@pytest.mark.django_db(transaction=True, databases=["default", READER_ALIAS])
+def test_public_views_read_from_the_reader(client):
+    schedule = baker.make(Schedule)
+    city = schedule.parish.city
+
+    with (
+        CaptureQueriesContext(connections["default"]) as writer,
+        CaptureQueriesContext(connections[READER_ALIAS]) as reader,
+    ):
+        response = client.get(
+            resolve_url("by_city", state=city.state.slug, city=city.slug),
+            data={"dia": "domingo", "horario": "0"},
+        )
+
+    assert response.status_code == 200
+    assert reader.captured_queries
+    assert not writer.captured_queries
+
+
+@pytest.mark.django_db(transaction=True, databases=["default", READER_ALIAS])
+def test_create_contact_writes_through_the_writer(client):
+    client.post(resolve_url("create_contact"), {"ddd": "84", "number": "999999999"})
+
+    assert ContactRequest.objects.filter(whatsapp="+5584999999999").exists()
+
+
+class TestConcurrency:
+    """With a file database, as in production, instead of the tests' in-memory one."""
+
+    @pytest.fixture
+    def database(self, tmp_path, django_db_blocker):
+        path = tmp_path / "db.sqlite3"
+        with django_db_blocker.unblock():
+            writer = self.wrapper("default", NAME=str(path))
+            with writer.cursor() as cursor:
+                cursor.execute("CREATE TABLE parish (name TEXT)")
+                cursor.execute("INSERT INTO parish VALUES ('Santa Rita')")
+            writer.close()
+            yield path
+
+    def wrapper(self, alias, **settings):
+        return DatabaseWrapper({**connections[alias].settings_dict, **settings}, alias)
+
+    def reader(self, path):
+        return self.wrapper(READER_ALIAS, NAME=f"file:{path}?mode=ro")
+
+    def test_reads_continue_during_a_long_write_transaction(self, database):
+        writing, done = threading.Event(), threading.Event()
+
+        def write():
+            writer = self.wrapper("default", NAME=str(database))
+            with writer.cursor() as cursor:
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.execute("INSERT INTO parish VALUES ('São José')")
+                writing.set()
+                done.wait(timeout=10)
+                cursor.execute("COMMIT")
+            writer.close()
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        reader = self.reader(database)
+        try:
+            assert writing.wait(timeout=5)
+            for _ in range(5):
+                start = time.perf_counter()
+                with reader.cursor() as cursor:
+                    cursor.execute("SELECT COUNT(*) FROM parish")
+                    (count,) = cursor.fetchone()
+                # Far from the busy_timeout it would wait for the lock
+                assert time.perf_counter() - start < 0.5
+                assert count == 1
+        finally:
+            done.set()
+            thread.join()
+
+        with reader.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM parish")
+            assert cursor.fetchone() == (2,)
+            # In a rollback journal the commit would have to wait for readers
+            cursor.execute("PRAGMA journal_mode")
+            assert cursor.fetchone() == ("wal",)
+        reader.close()
+
+    def test_reader_cant_write(self, database):
+        reader = self.reader(database)
+
+        with pytest.raises(OperationalError, match="readonly"):
+            with reader.cursor() as cursor:
+                cursor.execute("INSERT INTO parish VALUES ('São José')")
+        reader.close()
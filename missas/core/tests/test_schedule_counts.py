@@ -0,0 +1,130 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import transaction
+from model_bakery import baker
+
+from missas.core.models import City, Parish, Schedule
+
+
+def counts(*objects):
+    result = []
+    for obj in objects:
+        obj.refresh_from_db()
+        result.append((obj.schedule_count, obj.has_schedules))
+    return result
+
+
+@pytest.mark.django_db
+class TestMaintained:
+    def test_create(self):
+        parish = baker.make(Parish)
+        baker.make(Schedule, parish=parish, _quantity=2)
+        baker.make(Schedule, parish__city=parish.city)
+
+        assert counts(parish, parish.city) == [(2, True), (3, True)]
+
+    def test_without_schedules(self):
+        parish = baker.make(Parish)
+
+        assert counts(parish, parish.city) == [(0, False), (0, False)]
+
+    def test_delete(self):
+        schedule = baker.make(Schedule)
+        parish = schedule.parish
+
+        schedule.delete()
+
+        assert counts(parish, parish.city) == [(0, False), (0, False)]
+
+    def test_move_schedule(self):
+        schedule = baker.make(Schedule)
+        old = schedule.parish
+        new = baker.make(Parish)
+
+        schedule.parish = new
+        schedule.save()
+
+        assert counts(old, old.city, new, new.city) == [
+            (0, False),
+            (0, False),
+            (1, True),
+            (1, True),
+        ]
+
+    def test_move_parish(self):
+        parish = baker.make(Parish)
+        baker.make(Schedule, parish=parish, _quantity=2)
+        baker.make(Schedule, parish__city=parish.city)
+        old_city = parish.city
+        new_city = baker.make(City)
+
+        parish = Parish.objects.get(pk=parish.pk)
+        parish.city = new_city
+        parish.save()
+
+        assert counts(old_city, new_city) == [(1, True), (2, True)]
+
+    def test_saving_a_stale_copy_keeps_the_count(self):
+        parish = baker.make(Parish)
+        city = City.objects.get(pk=parish.city_id)
+        baker.make(Schedule, parish=parish)
+
+        parish.name = "Paróquia"
+        parish.save()
+        city.name = "Cidade"
+        city.save()
+
+        assert counts(parish, city) == [(1, True), (1, True)]
+        assert parish.name == "Paróquia"
+        assert city.name == "Cidade"
+
+    def test_delete_cascading_from_the_parish(self):
+        parish = baker.make(Parish)
+        baker.make(Schedule, parish=parish, _quantity=2)
+        other = baker.make(Schedule, parish__city=parish.city)
+
+        parish.delete()
+
+        assert counts(other.parish.city) == [(1, True)]
+
+    def test_rolled_back_with_the_change(self):
+        parish = baker.make(Parish)
+
+        with pytest.raises(ValueError), transaction.atomic():
+            baker.make(Schedule, parish=parish)
+            raise ValueError
+
+        assert counts(parish, parish.city) == [(0, False), (0, False)]
+
+
+@pytest.mark.django_db
+def test_repair():
+    parish = baker.make(Parish)
+    baker.make(Schedule, parish=parish, _quantity=2)
+    empty = baker.make(Parish)
+    Parish.objects.filter(pk=parish.pk).update(schedule_count=0)
+    City.objects.filter(pk=empty.city_id).update(schedule_count=5)
+    stdout = StringIO()
+
+    call_command("repair_schedule_counts", stdout=stdout)
+
+    assert counts(parish, parish.city, empty, empty.city) == [
+        (2, True),
+        (2, True),
+        (0, False),
+        (0, False),
+    ]
+    assert "✓ Schedule counts repaired for 2 rows" in stdout.getvalue()
+
+
+@pytest.mark.django_db
+def test_filter_with_schedule_reads_the_column():
+    baker.make(Schedule)
+    baker.make(City)
+
+    queryset = City.objects.filter_with_schedule()
+
+    assert "JOIN" not in str(queryset.query)
+    assert queryset.count() == 1
@@ -1,9 +1,10 @@
-from datetime import date
+from datetime import date, time
 
 import pytest
 from model_bakery import baker
 
 from missas.core.models import Schedule
+from missas.core.week import MINUTES_PER_DAY, minute_of_week
 
 
 @pytest.mark.django_db
@@ -59,3 +60,107 @@ class TestFilterVerified:
         assert verified_confession not in result
         assert unverified_mass not in result
         assert result.count() == 1
+
+
+def _make(day, start, end=None, **kwargs):
+    return baker.make(
+        "core.Schedule", day=day, start_time=start, end_time=end, **kwargs
+    )
+
+
+@pytest.mark.django_db
+class TestInWindow:
+    def test_starting_in_the_window(self):
+        inside = _make(Schedule.Day.MONDAY, time(10))
+        _make(Schedule.Day.MONDAY, time(8))
+        _make(Schedule.Day.MONDAY, time(12))
+        _make(Schedule.Day.TUESDAY, time(10))
+
+        result = Schedule.objects.in_window(
+            minute_of_week(Schedule.Day.MONDAY, time(9)), 120
+        )
+
+        assert list(result) == [inside]
+
+    def test_end_of_the_window_is_exclusive(self):
+        _make(Schedule.Day.MONDAY, time(11))
+
+        result = Schedule.objects.in_window(
+            minute_of_week(Schedule.Day.MONDAY, time(9)), 120
+        )
+
+        assert not result.exists()
+
+    def test_ongoing_at_the_start(self):
+        ongoing = _make(Schedule.Day.MONDAY, time(8), time(9, 30))
+        _make(Schedule.Day.MONDAY, time(7), time(8, 30))
+
+        result = Schedule.objects.in_window(
+            minute_of_week(Schedule.Day.MONDAY, time(9)), 60
+        )
+
+        assert list(result) == [ongoing]
+
+    def test_ending_exactly_at_the_start_is_ongoing(self):
+        ongoing = _make(Schedule.Day.MONDAY, time(8), time(9))
+
+        result = Schedule.objects.in_window(
+            minute_of_week(Schedule.Day.MONDAY, time(9)), 60
+        )
+
+        assert list(result) == [ongoing]
+
+    def test_across_midnight(self):
+        tonight = _make(Schedule.Day.MONDAY, time(23))
+        tomorrow_morning = _make(Schedule.Day.TUESDAY, time(6))
+        _make(Schedule.Day.TUESDAY, time(9))
+
+        result = Schedule.objects.in_window(
+            minute_of_week(Schedule.Day.MONDAY, time(22)), 10 * 60
+        )
+
+        assert set(result) == {tonight, tomorrow_morning}
+
+    def test_saturday_into_sunday(self):
+        saturday = _make(Schedule.Day.SATURDAY, time(23))
+        sunday = _make(Schedule.Day.SUNDAY, time(7))
+        _make(Schedule.Day.SUNDAY, time(9))
+        _make(Schedule.Day.SATURDAY, time(20))
+
+        result = Schedule.objects.in_window(
+            minute_of_week(Schedule.Day.SATURDAY, time(22)), 10 * 60
+        )
+
+        assert set(result) == {saturday, sunday}
+
+    def test_ongoing_from_saturday_night(self):
+        ongoing = _make(Schedule.Day.SATURDAY, time(23), time(1))
+        _make(Schedule.Day.SATURDAY, time(22), time(23, 30))
+
+        result = Schedule.objects.in_window(
+            minute_of_week(Schedule.Day.SUNDAY, time(0, 30)), 60
+        )
+
+        assert list(result) == [ongoing]
+
+    def test_whole_day(self):
+        schedules = [_make(day, time(12)) for day in Schedule.Day]
+
+        result = Schedule.objects.in_window(
+            minute_of_week(Schedule.Day.WEDNESDAY, time(0)), MINUTES_PER_DAY
+        )
+
+        assert list(result) == [schedules[Schedule.Day.WEDNESDAY]]
+
+    def test_plan_is_range_scans_on_the_index(self):
+        index = Schedule._meta.indexes[0].name
+        parish = baker.make("core.Parish")
+
+        plan = (
+            Schedule.objects.filter(parish=parish, type=Schedule.Type.MASS)
+            .in_window(minute_of_week(Schedule.Day.SATURDAY, time(22)), 10 * 60)
+            .explain()
+        )
+
+        assert index in plan
+        assert "SCAN core_schedule" not in plan
@@ -0,0 +1,156 @@
+from datetime import datetime, time, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from model_bakery import baker
+
+from missas.core.models import Schedule
+from missas.core.search import minutes_of_week_window, next_schedules
+
+NATAL = (-5.7945, -35.2110)
+# 2024-01-02 is a Tuesday
+TUESDAY_NOON = datetime(2024, 1, 2, 12, 0)
+
+
+def make_location(lat=NATAL[0], lng=NATAL[1]):
+    return baker.make(
+        "core.Location", latitude=Decimal(str(lat)), longitude=Decimal(str(lng))
+    )
+
+
+def make_schedule(location, day, start_time, **kwargs):
+    return baker.make(
+        "core.Schedule",
+        location=location,
+        day=day,
+        start_time=start_time,
+        type=kwargs.pop("type", Schedule.Type.MASS),
+        **kwargs,
+    )
+
+
+def test_minutes_of_week_window():
+    assert minutes_of_week_window(100, 60) == [(100, 160)]
+    assert minutes_of_week_window(10_000, 200) == [(10_000, 10_080), (0, 120)]
+
+
+@pytest.mark.django_db
+class TestMinutesOfWeek:
+    def test_start_and_end(self):
+        schedule = make_schedule(
+            make_location(),
+            Schedule.Day.MONDAY,
+            time(9, 30),
+            end_time=time(11),
+        )
+
+        assert schedule.start_minute_of_week == 1440 + 9 * 60 + 30
+        assert schedule.end_minute_of_week == 1440 + 11 * 60
+
+    def test_without_end_time(self):
+        schedule = make_schedule(make_location(), Schedule.Day.SUNDAY, time(7))
+
+        assert schedule.start_minute_of_week == schedule.end_minute_of_week == 420
+
+    def test_end_after_midnight(self):
+        schedule = make_schedule(
+            make_location(), Schedule.Day.SATURDAY, time(23), end_time=time(1)
+        )
+
+        assert schedule.end_minute_of_week == 7 * 1440 + 60
+
+    def test_updated_with_update_fields(self):
+        schedule = make_schedule(make_location(), Schedule.Day.SUNDAY, time(7))
+
+        schedule.day = Schedule.Day.MONDAY
+        schedule.save(update_fields=["day"])
+
+        schedule.refresh_from_db()
+        assert schedule.start_minute_of_week == 1440 + 420
+
+
+@pytest.mark.django_db
+class TestNextSchedules:
+    def test_orders_by_start_and_distance(self):
+        here = make_location()
+        far = make_location(NATAL[0] - 0.05, NATAL[1])  # ~5.5 km
+        later_here = make_schedule(here, Schedule.Day.TUESDAY, time(13, 30))
+        sooner_far = make_schedule(far, Schedule.Day.TUESDAY, time(13))
+        soonest_here = make_schedule(here, Schedule.Day.TUESDAY, time(12, 30))
+
+        result = next_schedules(*NATAL, at=TUESDAY_NOON)
+
+        # 13:00 is 60 min away plus ~17 min of travel, so 13:30 here wins
+        assert [o.schedule for o in result] == [soonest_here, sooner_far, later_here]
+        assert result[0].starts_at == datetime(2024, 1, 2, 12, 30)
+        assert result[0].minutes_until == 30
+        assert result[1].distance_km == pytest.approx(5.56, abs=0.01)
+
+    def test_excludes_unreachable(self):
+        far = make_location(NATAL[0] - 0.05, NATAL[1])
+        make_schedule(far, Schedule.Day.TUESDAY, time(12, 10))
+
+        assert next_schedules(*NATAL, at=TUESDAY_NOON) == []
+
+    def test_wraps_midnight(self):
+        location = make_location()
+        schedule = make_schedule(location, Schedule.Day.WEDNESDAY, time(0, 30))
+
+        result = next_schedules(*NATAL, at=datetime(2024, 1, 2, 23, 30))
+
+        assert [o.schedule for o in result] == [schedule]
+        assert result[0].starts_at == datetime(2024, 1, 3, 0, 30)
+
+    def test_wraps_week(self):
+        location = make_location()
+        sunday = make_schedule(location, Schedule.Day.SUNDAY, time(7))
+        make_schedule(location, Schedule.Day.SATURDAY, time(19))
+
+        # 2024-01-06 is a Saturday
+        result = next_schedules(*NATAL, at=datetime(2024, 1, 6, 22))
+
+        assert [o.schedule for o in result] == [sunday]
+        assert result[0].starts_at == datetime(2024, 1, 7, 7)
+        assert result[0].minutes_until == 9 * 60
+
+    def test_horizon(self):
+        location = make_location()
+        make_schedule(location, Schedule.Day.THURSDAY, time(7))
+
+        assert next_schedules(*NATAL, at=TUESDAY_NOON) == []
+        assert len(next_schedules(*NATAL, at=TUESDAY_NOON, horizon_minutes=10_080))
+
+    def test_filters_type_and_radius(self):
+        make_schedule(
+            make_location(), Schedule.Day.TUESDAY, time(13), type="confession"
+        )
+        make_schedule(make_location(-23.55, -46.63), Schedule.Day.TUESDAY, time(13))
+
+        assert next_schedules(*NATAL, at=TUESDAY_NOON) == []
+
+    def test_limit(self):
+        location = make_location()
+        for hour in range(13, 18):
+            make_schedule(location, Schedule.Day.TUESDAY, time(hour))
+
+        assert len(next_schedules(*NATAL, at=TUESDAY_NOON, limit=3)) == 3
+
+    def test_aware_datetime(self):
+        schedule = make_schedule(make_location(), Schedule.Day.TUESDAY, time(12, 30))
+
+        at = datetime(2024, 1, 2, 15, tzinfo=timezone.utc)
+        result = next_schedules(*NATAL, at=at)
+
+        assert [o.schedule for o in result] == [schedule]
+
+    def test_number_of_queries(self, django_assert_num_queries):
+        for i in range(5):
+            location = make_location(NATAL[0] + i * 0.01, NATAL[1])
+            make_schedule(location, Schedule.Day.TUESDAY, time(14 + i))
+
+        with django_assert_num_queries(2):
+            result = next_schedules(*NATAL, at=TUESDAY_NOON)
+            [o.schedule.parish.city.state.name for o in result]
+
+        assert len(result) == 5
+        assert result[-1].starts_at - result[0].starts_at == timedelta(hours=4)
@@ -0,0 +1,40 @@
+import pytest
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+
+from missas.core.sqlite import configure_connection, pragmas
+
+
+@pytest.fixture
+def new_connection():
+    new_connection = connections.create_connection(DEFAULT_DB_ALIAS)
+    yield new_connection
+    new_connection.close()
+
+
+@pytest.mark.django_db
+def test_new_connections_get_the_pragmas(new_connection, settings):
+    values = pragmas(new_connection)
+
+    assert values["synchronous"] == 1  # NORMAL
+    assert values["temp_store"] == 2  # MEMORY
+    assert values["busy_timeout"] == settings.SQLITE_PRAGMAS["busy_timeout"]
+    assert values["cache_size"] == settings.SQLITE_PRAGMAS["cache_size"]
+
+
+@pytest.mark.django_db
+def test_pragmas_come_from_settings(new_connection, settings):
+    settings.SQLITE_PRAGMAS = {**settings.SQLITE_PRAGMAS, "cache_size": -1000}
+
+    assert pragmas(new_connection)["cache_size"] == -1000
+
+
+def test_ignores_other_databases(mocker):
+    other = mocker.Mock(vendor="postgresql")
+
+    configure_connection(sender=None, connection=other)
+
+    other.connection.execute.assert_not_called()
+
+
+def test_transactions_take_the_write_lock_upfront():
+    assert connection.settings_dict["OPTIONS"]["transaction_mode"] == "IMMEDIATE"
@@ -0,0 +1,132 @@
+import threading
+from datetime import datetime, time, timedelta
+from http import HTTPStatus
+from time import sleep
+
+import pytest
+from django.core.cache import cache
+from django.shortcuts import resolve_url
+from django.test import Client, RequestFactory
+from django.utils import translation
+from django.utils.cache import get_cache_key
+from freezegun import freeze_time
+from model_bakery import baker
+
+from missas.core.cache_tags import city_tag, invalidate_tags
+from missas.core.middleware import rebuild_lease_key
+from missas.core.models import Schedule
+from missas.core.views import render_cards
+
+
+@pytest.fixture
+def schedule(db):
+    return baker.make(Schedule, day=Schedule.Day.SUNDAY, start_time=time(9))
+
+
+def city_url(schedule):
+    city = schedule.parish.city
+    url = resolve_url("by_city", state=city.state.slug, city=city.slug)
+    return f"{url}?tipo=missas&dia=domingo&horario=0"
+
+
+def take_lease(url):
+    """Act as another worker rebuilding the page."""
+    request = RequestFactory().get(url)
+    assert cache.add(rebuild_lease_key(get_cache_key(request, cache=cache)), True)
+
+
+@pytest.fixture
+def renders(mocker):
+    return mocker.patch("missas.core.views.render_cards", side_effect=render_cards)
+
+
+def test_serves_the_stale_page_while_another_request_rebuilds_it(
+    client, schedule, renders
+):
+    url = city_url(schedule)
+    client.get(url)
+    invalidate_tags([city_tag(schedule.parish.city_id)])
+    take_lease(url)
+
+    response = client.get(url)
+
+    assert response.status_code == HTTPStatus.OK
+    assert "09:00" in response.content.decode()
+    assert renders.call_count == 1
+    # Stale, so nothing downstream should keep it
+    assert "max-age=0" in response["Cache-Control"]
+
+
+def test_the_first_request_to_find_it_stale_rebuilds_it(client, schedule, renders):
+    url = city_url(schedule)
+    client.get(url)
+
+    for _ in range(2):
+        invalidate_tags([city_tag(schedule.parish.city_id)])
+        response = client.get(url)
+
+    assert renders.call_count == 3
+    assert response["Cache-Control"] == ("max-age=86400, stale-while-revalidate=86400")
+
+
+def test_expired_pages_are_served_stale(client, schedule, renders):
+    url = city_url(schedule)
+    with freeze_time("2025-01-01 12:00:00") as frozen:
+        client.get(url)
+        frozen.tick(timedelta(days=1, seconds=1))
+        take_lease(url)
+
+        stale = client.get(url)
+        cache.clear()
+        rebuilt = client.get(url)
+
+    assert stale.status_code == rebuilt.status_code == HTTPStatus.OK
+    assert renders.call_count == 2
+
+
+def test_stale_pages_expire(client, schedule, renders):
+    url = city_url(schedule)
+    with freeze_time(datetime(2025, 1, 1, 12)) as frozen:
+        client.get(url)
+        frozen.tick(timedelta(days=2, seconds=1))
+        take_lease(url)
+
+        client.get(url)
+
+    assert renders.call_count == 2
+
+
+@pytest.mark.django_db(transaction=True, databases=["default", "reader"])
+def test_a_burst_rebuilds_the_page_once(mocker):
+    schedule = baker.make(Schedule, day=Schedule.Day.SUNDAY, start_time=time(9))
+    url = city_url(schedule)
+    # Other tests may have activated a language in this thread, unlike in the
+    # new ones, and it's part of the cache key
+    translation.deactivate()
+    Client().get(url)
+    invalidate_tags([city_tag(schedule.parish.city_id)])
+
+    def slow_render_cards(schedules):
+        # Long enough for the whole burst to arrive during the rebuild
+        sleep(0.5)
+        return render_cards(schedules)
+
+    renders = mocker.patch(
+        "missas.core.views.render_cards", side_effect=slow_render_cards
+    )
+    barrier = threading.Barrier(8)
+    responses = []
+
+    def request():
+        barrier.wait()
+        responses.append(Client().get(url))
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert renders.call_count == 1
+    assert [response.status_code for response in responses] == [HTTPStatus.OK] * 8
+    assert all("09:00" in response.content.decode() for response in responses)
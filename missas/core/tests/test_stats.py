@@ -0,0 +1,185 @@
+from datetime import date
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import transaction
+from model_bakery import baker
+
+from missas.core import stats
+from missas.core.models import City, Location, Parish, Schedule, Stats
+from missas.core.stats import get_stats, reconcile_stats
+
+FIELDS = (
+    "cities_with_parishes",
+    "parishes",
+    "locations",
+    "schedules",
+    "verified_schedules",
+)
+
+
+def counters():
+    stats = get_stats()
+    return {field: getattr(stats, field) for field in FIELDS}
+
+
+def recomputed():
+    stats = reconcile_stats()
+    return {field: getattr(stats, field) for field in FIELDS}
+
+
+# The cities are recounted once the changes commit
+@pytest.mark.django_db(transaction=True)
+class TestMaintained:
+    @pytest.fixture(autouse=True)
+    def stats_row(self):
+        # Flushed by the previous transactional test, with the migration's row
+        reconcile_stats()
+
+    def test_create(self):
+        parish = baker.make(Parish)
+        baker.make(Schedule, parish=parish, verified_at=date(2025, 1, 1))
+        baker.make(Schedule, parish=parish, location=baker.make(Location))
+
+        assert counters() == {
+            "cities_with_parishes": 1,
+            "parishes": 1,
+            "locations": 1,
+            "schedules": 2,
+            "verified_schedules": 1,
+        }
+
+    def test_verify_and_unverify(self):
+        schedule = baker.make(Schedule)
+
+        schedule.verified_at = date(2025, 1, 1)
+        schedule.save()
+        assert counters()["verified_schedules"] == 1
+
+        schedule.verified_at = date(2025, 2, 1)
+        schedule.save()
+        assert counters()["verified_schedules"] == 1
+
+        schedule.verified_at = None
+        schedule.save()
+        assert counters()["verified_schedules"] == 0
+
+    def test_move_schedule_to_another_city(self):
+        schedule = baker.make(Schedule)
+        baker.make(Schedule, parish=schedule.parish)
+
+        schedule.parish = baker.make(Parish)
+        schedule.save()
+        assert counters()["cities_with_parishes"] == 2
+
+        Schedule.objects.exclude(pk=schedule.pk).delete()
+        assert counters()["cities_with_parishes"] == 1
+
+    def test_move_parish_to_another_city(self):
+        schedule = baker.make(Schedule)
+        city = schedule.parish.city
+        baker.make(Schedule, parish__city=city)
+
+        schedule.parish.city = baker.make(City)
+        schedule.parish.save()
+
+        assert counters()["cities_with_parishes"] == 2
+
+    def test_delete_cascading_from_the_city(self):
+        schedule = baker.make(
+            Schedule, verified_at=date(2025, 1, 1), location=baker.make(Location)
+        )
+        baker.make(Schedule, parish=schedule.parish)
+        baker.make(Schedule)
+
+        schedule.parish.city.delete()
+
+        assert counters() == recomputed()
+        assert counters()["schedules"] == 1
+
+    def test_delete_location(self):
+        location = baker.make(Location)
+        baker.make(Schedule, location=location)
+
+        location.delete()
+
+        assert counters() == recomputed()
+        assert counters()["locations"] == 0
+
+    def test_cities_recounted_once_per_transaction(self, mocker):
+        parish = baker.make(Parish)
+        baker.make(Schedule, parish=parish, _quantity=3)
+        recount_cities = mocker.spy(stats, "recount_cities")
+
+        parish.city.delete()
+
+        recount_cities.assert_called_once()
+        assert counters() == recomputed()
+
+    def test_rolled_back_with_the_change(self):
+        with pytest.raises(ValueError), transaction.atomic():
+            baker.make(Schedule, verified_at=date(2025, 1, 1))
+            raise ValueError
+
+        assert counters() == recomputed()
+        assert counters()["schedules"] == 0
+
+    def test_cities_recounted_after_a_rolled_back_recount(self):
+        parish = baker.make(Parish)
+        with pytest.raises(ValueError), transaction.atomic():
+            baker.make(Schedule, parish=parish)
+            raise ValueError
+
+        baker.make(Schedule, parish=parish)
+
+        assert counters() == recomputed()
+        assert counters()["cities_with_parishes"] == 1
+
+    def test_loaddata_needs_reconciling(self, tmp_path):
+        # Fixtures are loaded without the signals counting their rows
+        schedule = baker.make(Schedule)
+        fixture = tmp_path / "fixture.json"
+        call_command(
+            "dumpdata",
+            "core.State",
+            "core.City",
+            "core.Parish",
+            "core.Schedule",
+            output=str(fixture),
+        )
+        Schedule.objects.all().delete()
+        Parish.objects.all().delete()
+        reconcile_stats()
+
+        call_command("loaddata", str(fixture), verbosity=0)
+
+        assert counters()["schedules"] == 0
+        stdout = StringIO()
+        call_command("reconcile_counters", stdout=stdout)
+        assert counters()["schedules"] == 1
+        assert counters()["parishes"] == 1
+        assert Schedule.objects.get().pk == schedule.pk
+        assert "✓ Counters reconciled: 1 cities, 1 parishes" in stdout.getvalue()
+
+
+@pytest.mark.django_db
+def test_created_when_missing():
+    baker.make(Schedule)
+    Stats.objects.all().delete()
+
+    assert counters() == {
+        "cities_with_parishes": 1,
+        "parishes": 1,
+        "locations": 0,
+        "schedules": 1,
+        "verified_schedules": 0,
+    }
+
+
+@pytest.mark.django_db
+def test_single_query(django_assert_num_queries):
+    get_stats()
+
+    with django_assert_num_queries(1):
+        get_stats()
@@ -2,21 +2,35 @@ from datetime import date, time
 from http import HTTPStatus
 
 import pytest
+from django.db import connection
 from django.shortcuts import resolve_url
 from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
 from freezegun import freeze_time
 from model_bakery import baker
 from pytest_django.asserts import (
     assertContains,
     assertInHTML,
     assertNotContains,
-    assertQuerySetEqual,
+    assertRedirects,
     assertTemplateUsed,
 )
 
+from missas.core.cards import card_rows, render_cards
 from missas.core.models import City, Schedule, Source, State
 
 
+def cards_of(*schedules):
+    """The cards of `schedules`, in that order, to compare with a page's."""
+    rows = {
+        row.pk: row
+        for row in card_rows(
+            Schedule.objects.filter(pk__in=[schedule.pk for schedule in schedules])
+        )
+    }
+    return render_cards([rows[schedule.pk] for schedule in schedules])
+
+
 @pytest.mark.django_db
 def test_404_if_state_doesnt_exist(client):
     response = client.get(resolve_url("by_city", state="unknown", city="natal"))
@@ -36,7 +50,9 @@ def test_404_if_city_doesnt_exist(client):
 def test_view_by_city(client):
     city = baker.make(City)
 
-    response = client.get(resolve_url("by_city", state=city.state.slug, city=city.slug))
+    response = client.get(
+        resolve_url("by_city", state=city.state.slug, city=city.slug), follow=True
+    )
 
     assert response.status_code == HTTPStatus.OK
 
@@ -45,30 +61,61 @@ def test_view_by_city(client):
 def test_cache(client):
     city = baker.make(City)
 
-    response = client.get(resolve_url("by_city", state=city.state.slug, city=city.slug))
+    response = client.get(
+        resolve_url("by_city", state=city.state.slug, city=city.slug), follow=True
+    )
 
-    assert response.headers["Cache-Control"] == "max-age=86400"
+    assert response.headers["Cache-Control"] == (
+        "max-age=86400, stale-while-revalidate=86400"
+    )
 
 
 @pytest.mark.parametrize(
-    ("hx_request", "hx_boosted", "expected_template"),
-    (
-        (True, True, "parishes_by_city.html"),
-        (True, False, "cards.html"),
-        (False, True, "parishes_by_city.html"),
-        (False, False, "parishes_by_city.html"),
-    ),
+    ("hx_request", "hx_boosted"),
+    (("true", "true"), ("false", "false")),
 )
 @pytest.mark.django_db
-def test_template(client, hx_request, hx_boosted, expected_template):
+def test_template(client, hx_request, hx_boosted):
     city = baker.make(City)
 
     response = client.get(
         resolve_url("by_city", state=city.state.slug, city=city.slug),
         headers={"HX-Request": hx_request, "HX-Boosted": hx_boosted},
+        follow=True,
+    )
+
+    assertTemplateUsed(response, "parishes_by_city.html")
+
+
+@pytest.mark.django_db
+def test_htmx_request_redirects_to_cards(client):
+    city = baker.make(City)
+
+    response = client.get(
+        resolve_url("by_city", state=city.state.slug, city=city.slug),
+        data={"tipo": "missas", "dia": "domingo", "horario": "10"},
+        headers={"HX-Request": "true"},
+    )
+
+    assertRedirects(
+        response,
+        resolve_url("by_city_cards", state=city.state.slug, city=city.slug)
+        + "?tipo=missas&dia=domingo&horario=10",
+    )
+
+
+@pytest.mark.django_db
+def test_form_targets_cards(client):
+    city = baker.make(City)
+
+    response = client.get(
+        resolve_url("by_city", state=city.state.slug, city=city.slug), follow=True
     )
 
-    assertTemplateUsed(response, expected_template)
+    assertContains(
+        response,
+        f'hx-get="{resolve_url("by_city_cards", state=city.state.slug, city=city.slug)}"',
+    )
 
 
 @pytest.mark.django_db
@@ -146,13 +193,7 @@ def test_order_by_day_and_time(client: Client):
         data={"dia": "domingo", "horario": "0"},
     )
 
-    assertQuerySetEqual(
-        response.context["schedules"],
-        [
-            sunday_morning,
-            sunday_afternoon,
-        ],
-    )
+    assert response.context["cards"] == cards_of(sunday_morning, sunday_afternoon)
 
 
 @pytest.mark.django_db
@@ -176,13 +217,7 @@ def test_filter_by_day_and_order_by_time(client: Client):
         data={"dia": "sabado", "horario": "0"},
     )
 
-    assertQuerySetEqual(
-        response.context["schedules"],
-        [
-            saturday_morning,
-            saturday_afternoon,
-        ],
-    )
+    assert response.context["cards"] == cards_of(saturday_morning, saturday_afternoon)
 
 
 @pytest.mark.django_db
@@ -190,7 +225,7 @@ def test_no_schedules(client: Client):
     city = baker.make(City)
 
     response = client.get(
-        resolve_url("by_city", state=city.state.slug, city=city.slug),
+        resolve_url("by_city", state=city.state.slug, city=city.slug), follow=True
     )
 
     assertContains(response, "Nenhum horário cadastrado.")
@@ -211,10 +246,7 @@ def test_filter_by_time(client: Client):
         data={"dia": "domingo", "horario": "12"},
     )
 
-    assertQuerySetEqual(
-        response.context["schedules"],
-        [sunday_afternoon],
-    )
+    assert response.context["cards"] == cards_of(sunday_afternoon)
 
 
 @pytest.mark.django_db
@@ -234,10 +266,7 @@ def test_filter_by_type_default_mass(client):
         resolve_url("by_city", state=city.state.slug, city=city.slug),
         data={"dia": "domingo", "horario": "0"},
     )
-    assertQuerySetEqual(
-        response.context["schedules"],
-        [mass],
-    )
+    assert response.context["cards"] == cards_of(mass)
     assertInHTML(
         '<input class="btn-check" id="missas" name="tipo" type="radio" value="missas" checked>',
         response.content.decode(),
@@ -266,10 +295,7 @@ def test_filter_by_type(client):
         '<input class="btn-check" id="confissoes" name="tipo" type="radio" value="confissoes" checked>',
         response.content.decode(),
     )
-    assertQuerySetEqual(
-        response.context["schedules"],
-        [confession],
-    )
+    assert response.context["cards"] == cards_of(confession)
 
 
 @pytest.mark.django_db
@@ -310,7 +336,51 @@ def test_filter_by_end_time_if_exists(client: Client):
         data={"tipo": "confissoes", "dia": "domingo", "horario": "10"},
     )
 
-    assertQuerySetEqual(response.context["schedules"], [confession])
+    assert response.context["cards"] == cards_of(confession)
+
+
+@pytest.mark.django_db
+def test_show_schedule_still_going_on_from_the_night_before(client: Client):
+    city = baker.make(City)
+    vigil = baker.make(
+        Schedule,
+        type=Schedule.Type.CONFESSION,
+        start_time=time(23),
+        end_time=time(1),
+        parish__city=city,
+        day=Schedule.Day.SATURDAY,
+    )
+
+    response = client.get(
+        resolve_url("by_city", state=city.state.slug, city=city.slug),
+        data={"tipo": "confissoes", "dia": "domingo", "horario": "0"},
+    )
+
+    assert response.context["cards"] == cards_of(vigil)
+
+
+@pytest.mark.django_db
+def test_schedules_query_uses_window_index(client: Client):
+    city = baker.make(City)
+    baker.make(Schedule, parish__city=city, day=Schedule.Day.SATURDAY)
+
+    with CaptureQueriesContext(connection) as queries:
+        client.get(
+            resolve_url("by_city", state=city.state.slug, city=city.slug),
+            data={"dia": "sabado", "horario": "22"},
+        )
+    (sql,) = [
+        query["sql"]
+        for query in queries.captured_queries
+        if 'FROM "core_schedule"' in query["sql"]
+        and "start_minute_of_week" in query["sql"]
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        plan = "\n".join(row[-1] for row in cursor.fetchall())
+
+    assert Schedule._meta.indexes[0].name in plan
+    assert "SCAN core_schedule" not in plan
 
 
 @pytest.mark.django_db
@@ -352,6 +422,7 @@ def test_checked_day(client, weekday):
     response = client.get(
         resolve_url("by_city", state=city.state.slug, city=city.slug),
         data={"dia": weekday},
+        follow=True,
     )
 
     assertInHTML(
@@ -424,7 +495,9 @@ def test_breadcrumb_to_state(client):
     schedule = baker.make(Schedule)
 
     city = schedule.parish.city
-    response = client.get(resolve_url("by_city", state=city.state.slug, city=city.slug))
+    response = client.get(
+        resolve_url("by_city", state=city.state.slug, city=city.slug), follow=True
+    )
 
     html = response.content.decode()
     assert f'<a href="/{city.state.slug}">{city.state.name}</a>' in html
@@ -435,10 +508,11 @@ def test_number_of_queries(client, django_assert_max_num_queries):
     city = baker.make(City)
     baker.make(Schedule, parish__city=city, _quantity=100)
 
-    with django_assert_max_num_queries(15):
-        # 5 are from the endpoint and 10 are from the caching
+    # The cache lives in its own file, so it adds no database queries
+    with django_assert_max_num_queries(5):
         response = client.get(
-            resolve_url("by_city", state=city.state.slug, city=city.slug)
+            resolve_url("by_city", state=city.state.slug, city=city.slug),
+            data={"dia": "domingo", "horario": "0"},
         )
 
     assert response.status_code == HTTPStatus.OK
@@ -459,7 +533,8 @@ def test_number_of_queries_without_cache(
 
     with django_assert_max_num_queries(5):
         response = client.get(
-            resolve_url("by_city", state=city.state.slug, city=city.slug)
+            resolve_url("by_city", state=city.state.slug, city=city.slug),
+            data={"dia": "domingo", "horario": "0"},
         )
 
     assert response.status_code == HTTPStatus.OK
@@ -469,7 +544,9 @@ def test_number_of_queries_without_cache(
 def test_title(client):
     city = baker.make(City)
 
-    response = client.get(resolve_url("by_city", state=city.state.slug, city=city.slug))
+    response = client.get(
+        resolve_url("by_city", state=city.state.slug, city=city.slug), follow=True
+    )
 
     assertInHTML(
         f"<title>Horários de missas e confissões em {city.name}/{city.state.short_name.upper()}</title>",
@@ -520,109 +597,125 @@ def test_order_by_day_time_verified_and_parish_name(client: Client):
         data={"dia": "domingo", "horario": "0"},
     )
 
-    assertQuerySetEqual(
-        response.context["schedules"],
-        [
-            sunday_9am_verified_jan15,
-            sunday_9am_verified_jan10,
-            sunday_9am_unverified,
-            sunday_10am,
-        ],
+    assert response.context["cards"] == cards_of(
+        sunday_9am_verified_jan15,
+        sunday_9am_verified_jan10,
+        sunday_9am_unverified,
+        sunday_10am,
     )
 
 
 @freeze_time("2024-03-15 14:30:00")  # Friday, 11:30 in Brazil (UTC-3)
 @pytest.mark.django_db
-def test_hx_replace_url_when_no_params(client):
+def test_redirect_when_no_params(client):
     city = baker.make(City)
 
     response = client.get(resolve_url("by_city", state=city.state.slug, city=city.slug))
 
-    expected_url = f"/{city.state.slug}/{city.slug}/?tipo=missas&dia=sexta&horario=11"
-    assert response.headers.get("HX-Replace-Url") == expected_url
+    assertRedirects(
+        response,
+        f"/{city.state.slug}/{city.slug}/?tipo=missas&dia=sexta&horario=11",
+        fetch_redirect_response=False,
+    )
 
 
 @freeze_time("2024-03-17 18:00:00")  # Sunday, 15:00 in Brazil (UTC-3)
 @pytest.mark.django_db
-def test_hx_replace_url_when_only_tipo(client):
+def test_redirect_when_only_tipo(client):
     city = baker.make(City)
 
     response = client.get(
         resolve_url("by_city", state=city.state.slug, city=city.slug),
-        data={"tipo": "missas"},
+        data={"tipo": "confissoes"},
     )
 
-    expected_url = f"/{city.state.slug}/{city.slug}/?tipo=missas&dia=domingo&horario=15"
-    assert response.headers.get("HX-Replace-Url") == expected_url
+    assertRedirects(
+        response,
+        f"/{city.state.slug}/{city.slug}/?tipo=confissoes&dia=domingo&horario=15",
+        fetch_redirect_response=False,
+    )
 
 
+@freeze_time("2024-03-15 14:30:00")  # Friday, 11:30 in Brazil (UTC-3)
 @pytest.mark.django_db
-def test_no_hx_replace_url_when_all_params(client):
+def test_redirect_when_tipo_and_dia_but_no_horario(client):
     city = baker.make(City)
 
     response = client.get(
         resolve_url("by_city", state=city.state.slug, city=city.slug),
-        data={"tipo": "missas", "dia": "domingo", "horario": "10"},
+        data={"tipo": "missas", "dia": "sexta", "verificado": "1"},
     )
 
-    assert "HX-Replace-Url" not in response.headers
+    assertRedirects(
+        response,
+        f"/{city.state.slug}/{city.slug}/?tipo=missas&dia=sexta&horario=11&verificado=1",
+        fetch_redirect_response=False,
+    )
 
 
-@freeze_time("2024-03-15 14:30:00")  # Friday, 11:30 in Brazil (UTC-3)
 @pytest.mark.django_db
-def test_hx_replace_url_when_tipo_and_dia_but_no_horario(client):
+def test_no_redirect_when_dia_and_horario(client):
     city = baker.make(City)
 
     response = client.get(
         resolve_url("by_city", state=city.state.slug, city=city.slug),
-        data={"tipo": "missas", "dia": "sexta"},
+        data={"dia": "domingo", "horario": "10"},
     )
 
-    expected_url = f"/{city.state.slug}/{city.slug}/?tipo=missas&dia=sexta&horario=11"
-    assert response.headers.get("HX-Replace-Url") == expected_url
+    assert response.status_code == HTTPStatus.OK
+    assert response.context["type"] == Schedule.Type.MASS
 
 
-@freeze_time("2024-03-17 18:00:00")  # Sunday, 15:00 in Brazil
+@pytest.mark.parametrize(
+    ("now", "max_age"),
+    (
+        ("2024-03-15 14:00:00", 3600),
+        ("2024-03-15 14:30:00", 1800),
+        ("2024-03-15 14:59:59", 1),
+    ),
+)
 @pytest.mark.django_db
-def test_filters_applied_with_defaults(client):
+def test_redirect_expires_at_the_next_hour(client, now, max_age):
     city = baker.make(City)
-    sunday_16h = baker.make(
-        Schedule, parish__city=city, day=Schedule.Day.SUNDAY, start_time=time(16, 0)
-    )
-    baker.make(
-        Schedule, parish__city=city, day=Schedule.Day.SUNDAY, start_time=time(10, 0)
-    )
 
-    response = client.get(resolve_url("by_city", state=city.state.slug, city=city.slug))
+    with freeze_time(now):
+        response = client.get(
+            resolve_url("by_city", state=city.state.slug, city=city.slug)
+        )
 
-    assertQuerySetEqual(response.context["schedules"], [sunday_16h])
+    assert response.headers["Cache-Control"] == f"max-age={max_age}"
 
 
-@freeze_time("2024-03-18 02:30:00")  # Monday 02:30 UTC = Sunday 23:30 Brazil
 @pytest.mark.django_db
-def test_brazilian_timezone_hour(client):
+def test_redirect_across_the_hour_boundary(client):
     city = baker.make(City)
+    url = resolve_url("by_city", state=city.state.slug, city=city.slug)
 
-    response = client.get(resolve_url("by_city", state=city.state.slug, city=city.slug))
+    with freeze_time("2024-03-15 14:59:59"):  # Friday, 11:59:59 in Brazil
+        before = client.get(url)
+    with freeze_time("2024-03-15 15:00:00"):  # Friday, 12:00 in Brazil
+        after = client.get(url)
 
-    assert "dia=domingo" in response.headers.get("HX-Replace-Url", "")
-    assert "horario=23" in response.headers.get("HX-Replace-Url", "")
+    assert before.url.endswith("dia=sexta&horario=11")
+    assert after.url.endswith("dia=sexta&horario=12")
 
 
-@freeze_time("2024-03-15 14:30:00")  # Friday, 11:30 in Brazil (UTC-3)
 @pytest.mark.django_db
-def test_replace_url_script_rendered_when_params_missing(client):
+def test_redirect_across_midnight(client):
     city = baker.make(City)
+    url = resolve_url("by_city", state=city.state.slug, city=city.slug)
 
-    response = client.get(resolve_url("by_city", state=city.state.slug, city=city.slug))
+    with freeze_time("2024-03-16 02:59:59"):  # Friday, 23:59:59 in Brazil
+        before = client.get(url)
+    with freeze_time("2024-03-16 03:00:00"):  # Saturday, 00:00 in Brazil
+        after = client.get(url)
 
-    expected_url = f"/{city.state.slug}/{city.slug}/?tipo=missas&dia=sexta&horario=11"
-    assert response.context["replace_url"] == expected_url
-    assertContains(response, f"history.replaceState(null, '', '{expected_url}')")
+    assert before.url.endswith("dia=sexta&horario=23")
+    assert after.url.endswith("dia=sabado&horario=0")
 
 
 @pytest.mark.django_db
-def test_replace_url_script_not_rendered_when_all_params(client):
+def test_parameterized_page_is_cached_all_day(client):
     city = baker.make(City)
 
     response = client.get(
@@ -630,5 +723,35 @@ def test_replace_url_script_not_rendered_when_all_params(client):
         data={"tipo": "missas", "dia": "domingo", "horario": "10"},
     )
 
-    assert response.context.get("replace_url") is None
-    assertNotContains(response, "history.replaceState")
+    assert response.headers["Cache-Control"] == (
+        "max-age=86400, stale-while-revalidate=86400"
+    )
+
+
+@freeze_time("2024-03-17 18:00:00")  # Sunday, 15:00 in Brazil
+@pytest.mark.django_db
+def test_filters_applied_with_defaults(client):
+    city = baker.make(City)
+    sunday_16h = baker.make(
+        Schedule, parish__city=city, day=Schedule.Day.SUNDAY, start_time=time(16, 0)
+    )
+    baker.make(
+        Schedule, parish__city=city, day=Schedule.Day.SUNDAY, start_time=time(10, 0)
+    )
+
+    response = client.get(
+        resolve_url("by_city", state=city.state.slug, city=city.slug), follow=True
+    )
+
+    assert response.context["cards"] == cards_of(sunday_16h)
+
+
+@freeze_time("2024-03-18 02:30:00")  # Monday 02:30 UTC = Sunday 23:30 Brazil
+@pytest.mark.django_db
+def test_brazilian_timezone_hour(client):
+    city = baker.make(City)
+
+    response = client.get(resolve_url("by_city", state=city.state.slug, city=city.slug))
+
+    assert "dia=domingo" in response.url
+    assert "horario=23" in response.url
@@ -0,0 +1,126 @@
+from datetime import time
+from http import HTTPStatus
+
+import pytest
+from django.shortcuts import resolve_url
+from freezegun import freeze_time
+from model_bakery import baker
+from pytest_django.asserts import (
+    assertContains,
+    assertNotContains,
+    assertTemplateNotUsed,
+    assertTemplateUsed,
+)
+
+from missas.core.models import City, Schedule
+
+
+def cards_url(city):
+    return resolve_url("by_city_cards", state=city.state.slug, city=city.slug)
+
+
+@pytest.mark.django_db
+def test_404_if_city_doesnt_exist(client):
+    city = baker.make(City)
+
+    response = client.get(
+        resolve_url("by_city_cards", state=city.state.slug, city="unknown")
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_renders_only_the_cards(client):
+    city = baker.make(City)
+
+    response = client.get(cards_url(city), headers={"HX-Request": "true"})
+
+    assertTemplateUsed(response, "cards.html")
+    assertTemplateNotUsed(response, "parishes_by_city.html")
+
+
+@pytest.mark.django_db
+def test_same_fragment_without_htmx(client):
+    city = baker.make(City)
+
+    response = client.get(cards_url(city))
+
+    assertTemplateUsed(response, "cards.html")
+    assertTemplateNotUsed(response, "base.html")
+
+
+@pytest.mark.django_db
+def test_filters(client):
+    city = baker.make(City)
+    baker.make(
+        Schedule,
+        parish__city=city,
+        parish__name="Domingo de manhã",
+        day=Schedule.Day.SUNDAY,
+        start_time=time(10),
+    )
+    baker.make(
+        Schedule,
+        parish__city=city,
+        parish__name="Segunda de manhã",
+        day=Schedule.Day.MONDAY,
+        start_time=time(10),
+    )
+
+    response = client.get(
+        cards_url(city), {"tipo": "missas", "dia": "domingo", "horario": "8"}
+    )
+
+    assertContains(response, "Domingo de manhã")
+    assertNotContains(response, "Segunda de manhã")
+
+
+@pytest.mark.django_db
+def test_push_url_is_the_full_page(client):
+    city = baker.make(City)
+
+    response = client.get(
+        cards_url(city),
+        {"tipo": "confissoes", "dia": "sabado", "horario": "18", "verificado": "1"},
+    )
+
+    assert response["HX-Push-Url"] == (
+        f"/{city.state.slug}/{city.slug}/"
+        "?tipo=confissoes&dia=sabado&horario=18&verificado=1"
+    )
+
+
+@freeze_time("2024-03-15 14:30:00")  # Friday, 11:30 in Brazil (UTC-3)
+@pytest.mark.django_db
+def test_push_url_with_defaults(client):
+    city = baker.make(City)
+
+    response = client.get(cards_url(city), {"org.htmx.cache-buster": "cards"})
+
+    assert response["HX-Push-Url"] == (
+        f"/{city.state.slug}/{city.slug}/?tipo=missas&dia=sexta&horario=11"
+    )
+
+
+@pytest.mark.django_db
+def test_cache(client):
+    city = baker.make(City)
+
+    response = client.get(cards_url(city), {"dia": "domingo", "horario": "10"})
+
+    assert response.headers["Cache-Control"] == (
+        "max-age=86400, stale-while-revalidate=86400"
+    )
+
+
+@freeze_time("2024-03-15 14:45:00")
+@pytest.mark.django_db
+def test_cache_until_the_next_hour_with_defaults(client):
+    city = baker.make(City)
+
+    response = client.get(cards_url(city))
+
+    assert response.headers["Cache-Control"] == (
+        "max-age=900, stale-while-revalidate=900"
+    )
@@ -35,7 +35,9 @@ def test_cache(client):
 
     response = client.get(resolve_url("cities_by_state", state=state.slug))
 
-    assert response.headers["Cache-Control"] == "max-age=86400"
+    assert response.headers["Cache-Control"] == (
+        "max-age=86400, stale-while-revalidate=86400"
+    )
 
 
 @pytest.mark.django_db
@@ -38,17 +38,17 @@ def test_statistics_with_no_data(client):
     response = client.get(resolve_url("index"))
 
     stats = response.context["stats"]
-    assert stats["cities_with_parishes"] == 0
-    assert stats["parishes"] == 0
-    assert stats["locations"] == 0
-    assert stats["schedules"] == 0
-    assert stats["verified_schedules"] == 0
+    assert stats.cities_with_parishes == 0
+    assert stats.parishes == 0
+    assert stats.locations == 0
+    assert stats.schedules == 0
+    assert stats.verified_schedules == 0
 
     assertContains(response, ">0</h4>", count=5)
 
 
 @pytest.mark.django_db
-def test_statistics_with_data(client):
+def test_statistics_with_data(client, django_capture_on_commit_callbacks):
     # Create test data
     state1 = baker.make(State, name="Rio Grande do Norte", slug="rn")
     state2 = baker.make(State, name="São Paulo", slug="sp")
@@ -71,53 +71,54 @@ def test_statistics_with_data(client):
 
     source = baker.make(Source)
 
-    # Create schedules (some verified, some not)
-    baker.make(
-        Schedule,
-        parish=parish1,
-        type=Schedule.Type.MASS,
-        verified_at=date.today(),
-        source=source,
-        location=location1,
-    )
-    baker.make(
-        Schedule,
-        parish=parish1,
-        type=Schedule.Type.CONFESSION,
-        verified_at=None,
-        source=source,
-    )
-    baker.make(
-        Schedule,
-        parish=parish2,
-        type=Schedule.Type.MASS,
-        verified_at=date.today(),
-        source=source,
-        location=location2,
-    )
-    baker.make(
-        Schedule,
-        parish=parish3,
-        type=Schedule.Type.MASS,
-        verified_at=None,
-        source=source,
-    )
-    baker.make(
-        Schedule,
-        parish=parish3,
-        type=Schedule.Type.CONFESSION,
-        verified_at=date.today(),
-        source=source,
-    )
+    # Create schedules (some verified, some not), cities are counted on commit
+    with django_capture_on_commit_callbacks(execute=True):
+        baker.make(
+            Schedule,
+            parish=parish1,
+            type=Schedule.Type.MASS,
+            verified_at=date.today(),
+            source=source,
+            location=location1,
+        )
+        baker.make(
+            Schedule,
+            parish=parish1,
+            type=Schedule.Type.CONFESSION,
+            verified_at=None,
+            source=source,
+        )
+        baker.make(
+            Schedule,
+            parish=parish2,
+            type=Schedule.Type.MASS,
+            verified_at=date.today(),
+            source=source,
+            location=location2,
+        )
+        baker.make(
+            Schedule,
+            parish=parish3,
+            type=Schedule.Type.MASS,
+            verified_at=None,
+            source=source,
+        )
+        baker.make(
+            Schedule,
+            parish=parish3,
+            type=Schedule.Type.CONFESSION,
+            verified_at=date.today(),
+            source=source,
+        )
 
     response = client.get(resolve_url("index"))
 
     stats = response.context["stats"]
-    assert stats["cities_with_parishes"] == 3  # city4 has no parishes with schedules
-    assert stats["parishes"] == 3
-    assert stats["locations"] == 2
-    assert stats["schedules"] == 5
-    assert stats["verified_schedules"] == 3
+    assert stats.cities_with_parishes == 3  # city4 has no parishes with schedules
+    assert stats.parishes == 3
+    assert stats.locations == 2
+    assert stats.schedules == 5
+    assert stats.verified_schedules == 3
 
     assertContains(
         response, "3</h4>"
@@ -194,7 +195,8 @@ def test_query_count_optimization(client, django_assert_num_queries):
     baker.make(Schedule, parish=parish1)
     baker.make(Schedule, parish=parish2)
 
-    with django_assert_num_queries(num=8):
+    # The stats are a single row, plus the query computing the ETag
+    with django_assert_num_queries(num=4):
         response = client.get(resolve_url("index"))
 
     assert response.status_code == HTTPStatus.OK
@@ -0,0 +1,44 @@
+import json
+from decimal import Decimal
+from http import HTTPStatus
+
+import pytest
+from django.shortcuts import resolve_url
+from model_bakery import baker
+
+
+@pytest.fixture
+def location(db):
+    return baker.make(
+        "core.Location", latitude=Decimal("-5.79"), longitude=Decimal("-35.21")
+    )
+
+
+def test_streams_geojson(client, location):
+    response = client.get(resolve_url("locations_geojson"))
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.streaming
+    assert response["Content-Type"] == "application/geo+json; charset=utf-8"
+    content = json.loads(b"".join(response.streaming_content))
+    assert [f["id"] for f in content["features"]] == [location.pk]
+
+
+def test_not_modified(client, location, django_assert_max_num_queries):
+    etag = client.get(resolve_url("locations_geojson"))["ETag"]
+
+    # The cache middleware lookup plus one aggregate per exported model
+    with django_assert_max_num_queries(4):
+        response = client.get(resolve_url("locations_geojson"), HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_modified(client, location):
+    etag = client.get(resolve_url("locations_geojson"))["ETag"]
+    location.name = "Outro nome"
+    location.save()
+
+    response = client.get(resolve_url("locations_geojson"), HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == HTTPStatus.OK
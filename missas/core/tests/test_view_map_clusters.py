@@ -0,0 +1,48 @@
+from decimal import Decimal
+from http import HTTPStatus
+
+import pytest
+from django.shortcuts import resolve_url
+from model_bakery import baker
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "params",
+    (
+        {},
+        {"bbox": "-36,-6,-35,-5"},
+        {"zoom": "8"},
+        {"bbox": "-36,-6,-35", "zoom": "8"},
+        {"bbox": "-35,-6,-36,-5", "zoom": "8"},
+        {"bbox": "-180,-85,180,85", "zoom": "18"},
+    ),
+)
+def test_bad_request(client, params):
+    response = client.get(resolve_url("map_clusters"), params)
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_clusters(client):
+    baker.make(
+        "core.Location", latitude=Decimal("-5.7945"), longitude=Decimal("-35.2110")
+    )
+
+    response = client.get(
+        resolve_url("map_clusters"), {"bbox": "-36,-6,-35,-5", "zoom": "8"}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()["zoom"] == 8
+    assert [c["count"] for c in response.json()["clusters"]] == [1]
+
+
+@pytest.mark.django_db
+def test_zoom_is_clamped(client):
+    response = client.get(
+        resolve_url("map_clusters"), {"bbox": "-35.22,-5.80,-35.21,-5.79", "zoom": "30"}
+    )
+
+    assert response.json()["zoom"] == 18
@@ -0,0 +1,102 @@
+from decimal import Decimal
+from http import HTTPStatus
+
+import pytest
+from django.shortcuts import resolve_url
+from model_bakery import baker
+
+from missas.core.geo import MAX_RADIUS_KM
+
+NATAL = (Decimal("-5.79450000"), Decimal("-35.21100000"))
+PARNAMIRIM = (Decimal("-5.91560000"), Decimal("-35.26280000"))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "params",
+    (
+        {},
+        {"lat": "-5.79"},
+        {"lat": "abc", "lng": "-35.21"},
+        {"lat": "-95", "lng": "-35.21"},
+        {"lat": "-5.79", "lng": "-35.21", "raio": "0"},
+        {"lat": "-5.79", "lng": "-35.21", "raio": "nan"},
+        {"lat": "-5.79", "lng": "-35.21", "raio": "inf"},
+    ),
+)
+def test_bad_request(client, params):
+    response = client.get(resolve_url("nearby"), params)
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_returns_parishes_ordered_by_distance(client):
+    near = baker.make("core.Location", latitude=NATAL[0], longitude=NATAL[1])
+    far = baker.make("core.Location", latitude=PARNAMIRIM[0], longitude=PARNAMIRIM[1])
+    parish_near = baker.make("core.Parish")
+    parish_far = baker.make("core.Parish")
+    baker.make("core.Schedule", parish=parish_far, location=far)
+    baker.make("core.Schedule", parish=parish_near, location=near)
+
+    response = client.get(
+        resolve_url("nearby"), {"lat": "-5.80", "lng": "-35.21", "raio": "30"}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    parishes = response.json()["parishes"]
+    assert [p["name"] for p in parishes] == [parish_near.name, parish_far.name]
+    assert parishes[0]["distance_km"] < parishes[1]["distance_km"]
+    assert parishes[0]["url"] == resolve_url(
+        "parish_detail",
+        state=parish_near.city.state.slug,
+        city=parish_near.city.slug,
+        parish=parish_near.slug,
+    )
+    assert parishes[0]["location"]["address"] == near.address
+
+
+@pytest.mark.django_db
+def test_parish_uses_its_nearest_location(client):
+    near = baker.make("core.Location", latitude=NATAL[0], longitude=NATAL[1])
+    far = baker.make("core.Location", latitude=PARNAMIRIM[0], longitude=PARNAMIRIM[1])
+    parish = baker.make("core.Parish")
+    baker.make("core.Schedule", parish=parish, location=far)
+    baker.make("core.Schedule", parish=parish, location=near)
+
+    response = client.get(
+        resolve_url("nearby"), {"lat": NATAL[0], "lng": NATAL[1], "raio": "30"}
+    )
+
+    parishes = response.json()["parishes"]
+    assert len(parishes) == 1
+    assert parishes[0]["distance_km"] == 0
+    assert parishes[0]["location"]["address"] == near.address
+
+
+@pytest.mark.django_db
+def test_excludes_parishes_outside_radius(client):
+    far = baker.make("core.Location", latitude=PARNAMIRIM[0], longitude=PARNAMIRIM[1])
+    baker.make("core.Schedule", location=far)
+
+    response = client.get(
+        resolve_url("nearby"), {"lat": NATAL[0], "lng": NATAL[1], "raio": "5"}
+    )
+
+    assert response.json()["parishes"] == []
+
+
+@pytest.mark.django_db
+def test_radius_is_capped(client):
+    response = client.get(
+        resolve_url("nearby"), {"lat": NATAL[0], "lng": NATAL[1], "raio": "5000"}
+    )
+
+    assert response.json()["radius_km"] == MAX_RADIUS_KM
+
+
+@pytest.mark.django_db
+def test_not_cached(client):
+    response = client.get(resolve_url("nearby"), {"lat": NATAL[0], "lng": NATAL[1]})
+
+    assert "max-age=0" in response.headers["Cache-Control"]
@@ -0,0 +1,46 @@
+from decimal import Decimal
+from http import HTTPStatus
+
+import pytest
+from django.shortcuts import resolve_url
+from model_bakery import baker
+from pytest_django.asserts import assertRedirects
+
+from missas.core.city_centroids import compute_city_centroids
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "params",
+    ({}, {"lat": "-5.79"}, {"lat": "x", "lng": "-35"}, {"lat": "91", "lng": "0"}),
+)
+def test_bad_request(client, params):
+    response = client.get(resolve_url("nearest_city"), params)
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_redirects_to_nearest_city(client):
+    location = baker.make(
+        "core.Location", latitude=Decimal("-5.79"), longitude=Decimal("-35.21")
+    )
+    schedule = baker.make("core.Schedule", location=location)
+    city = schedule.parish.city
+    compute_city_centroids()
+
+    response = client.get(resolve_url("nearest_city"), {"lat": "-5.8", "lng": "-35.2"})
+
+    assertRedirects(
+        response,
+        resolve_url("by_city", state=city.state.slug, city=city.slug),
+        fetch_redirect_response=False,
+    )
+    assert "max-age=0" in response.headers["Cache-Control"]
+
+
+@pytest.mark.django_db
+def test_redirects_to_index_without_nearby_city(client):
+    response = client.get(resolve_url("nearest_city"), {"lat": "-5.8", "lng": "-35.2"})
+
+    assertRedirects(response, resolve_url("index"), fetch_redirect_response=False)
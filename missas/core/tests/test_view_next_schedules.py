@@ -0,0 +1,101 @@
+from datetime import time
+from decimal import Decimal
+from http import HTTPStatus
+
+import pytest
+from django.shortcuts import resolve_url
+from freezegun import freeze_time
+from model_bakery import baker
+
+from missas.core.models import Schedule
+
+NATAL = (Decimal("-5.79450000"), Decimal("-35.21100000"))
+
+
+def make_schedule(start_time, latitude=NATAL[0], **kwargs):
+    location = baker.make(
+        "core.Location", latitude=latitude, longitude=NATAL[1], name="Matriz"
+    )
+    return baker.make(
+        Schedule,
+        location=location,
+        day=Schedule.Day.TUESDAY,
+        start_time=start_time,
+        **kwargs,
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "params",
+    (
+        {},
+        {"lat": "-5.79"},
+        {"lat": "-95", "lng": "-35.21"},
+        {"lat": "-5.79", "lng": "-35.21", "raio": "0"},
+        {"lat": "-5.79", "lng": "-35.21", "raio": "nan"},
+    ),
+)
+def test_bad_request(client, params):
+    response = client.get(resolve_url("next_schedules"), params)
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@freeze_time("2024-01-02 15:00:00")  # Tuesday, 12:00 in Brazil (UTC-3)
+@pytest.mark.django_db
+def test_returns_next_reachable_schedules(client):
+    later = make_schedule(time(13, 30), type=Schedule.Type.MASS)
+    sooner = make_schedule(time(12, 30), type=Schedule.Type.MASS)
+    make_schedule(time(11), type=Schedule.Type.MASS)  # Already started
+    make_schedule(time(12, 30), type=Schedule.Type.CONFESSION)
+
+    response = client.get(
+        resolve_url("next_schedules"), {"lat": NATAL[0], "lng": NATAL[1]}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert "no-cache" in response["Cache-Control"]
+    schedules = response.json()["schedules"]
+    assert [s["starts_at"] for s in schedules] == [
+        "2024-01-02T12:30",
+        "2024-01-02T13:30",
+    ]
+    parish = sooner.parish
+    assert schedules[0] == {
+        "parish": parish.name,
+        "city": parish.city.name,
+        "state": parish.city.state.short_name,
+        "url": resolve_url(
+            "parish_detail",
+            state=parish.city.state.slug,
+            city=parish.city.slug,
+            parish=parish.slug,
+        ),
+        "starts_at": "2024-01-02T12:30",
+        "minutes_until": 30,
+        "distance_km": 0.0,
+        "location": {
+            "name": sooner.location_name or "Matriz",
+            "address": sooner.location.address,
+        },
+        "observation": sooner.observation,
+    }
+    assert schedules[1]["parish"] == later.parish.name
+
+
+@freeze_time("2024-01-02 15:00:00")
+@pytest.mark.django_db
+def test_filters_type_and_radius(client):
+    confession = make_schedule(time(13), type=Schedule.Type.CONFESSION)
+    # ~11 km away, outside the default radius
+    make_schedule(time(14), latitude=NATAL[0] - Decimal("0.1"), type="confession")
+
+    response = client.get(
+        resolve_url("next_schedules"),
+        {"lat": NATAL[0], "lng": NATAL[1], "tipo": "confissoes"},
+    )
+
+    assert [s["parish"] for s in response.json()["schedules"]] == [
+        confession.parish.name
+    ]
@@ -3,9 +3,9 @@ from http import HTTPStatus
 import pytest
 from django.shortcuts import resolve_url
 from model_bakery import baker
-from pytest_django.asserts import assertContains, assertTemplateUsed
+from pytest_django.asserts import assertContains, assertNotContains, assertTemplateUsed
 
-from missas.core.models import City, Parish, Schedule, Source, State
+from missas.core.models import City, NearbyParish, Parish, Schedule, Source, State
 
 
 @pytest.mark.django_db
@@ -187,7 +187,9 @@ def test_number_of_queries(client, django_assert_max_num_queries):
     parish = baker.make(Parish)
     baker.make(Schedule, parish=parish, _quantity=100)
 
-    with django_assert_max_num_queries(15):
+    # The cache lives in its own file, so it adds no database queries, only
+    # the ETag does
+    with django_assert_max_num_queries(4):
         response = client.get(
             resolve_url(
                 "parish_detail",
@@ -213,7 +215,7 @@ def test_number_of_queries_without_cache(
     parish = baker.make(Parish)
     baker.make(Schedule, parish=parish, _quantity=100)
 
-    with django_assert_max_num_queries(3):
+    with django_assert_max_num_queries(4):
         response = client.get(
             resolve_url(
                 "parish_detail",
@@ -224,3 +226,49 @@ def test_number_of_queries_without_cache(
         )
 
     assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+def test_nearby_parishes(client):
+    parish = baker.make(Parish)
+    near = baker.make(Parish, name="Paróquia Vizinha")
+    far = baker.make(Parish, name="Paróquia Distante")
+    baker.make(NearbyParish, parish=parish, nearby=far, distance=3.14, rank=1)
+    baker.make(NearbyParish, parish=parish, nearby=near, distance=1.2, rank=0)
+
+    response = client.get(
+        resolve_url(
+            "parish_detail",
+            state=parish.city.state.slug,
+            city=parish.city.slug,
+            parish=parish.slug,
+        )
+    )
+
+    assertContains(response, "Paróquias próximas")
+    assert list(response.context["nearby_parishes"]) == list(
+        parish.nearby_parishes.order_by("rank")
+    )
+    content = response.content.decode()
+    assert content.index("Paróquia Vizinha") < content.index("Paróquia Distante")
+    assertContains(
+        response,
+        f'href="/{near.city.state.slug}/{near.city.slug}/{near.slug}/"',
+    )
+    assertContains(response, "(1,2 km)")
+
+
+@pytest.mark.django_db
+def test_without_nearby_parishes(client):
+    parish = baker.make(Parish)
+
+    response = client.get(
+        resolve_url(
+            "parish_detail",
+            state=parish.city.state.slug,
+            city=parish.city.slug,
+            parish=parish.slug,
+        )
+    )
+
+    assertNotContains(response, "Paróquias próximas")
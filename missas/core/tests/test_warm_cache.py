@@ -0,0 +1,106 @@
+from datetime import time
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.shortcuts import resolve_url
+from django.utils import translation
+from freezegun import freeze_time
+from model_bakery import baker
+
+from missas.core.models import Schedule
+
+# 11h of a Sunday in Brazil
+NOW = "2025-01-05 14:00:00"
+
+# The pages are rendered by other threads, which only see committed rows
+pytestmark = pytest.mark.django_db(transaction=True, databases=["default", "reader"])
+
+
+@pytest.fixture(autouse=True)
+def frozen_time(settings):
+    settings.ALLOWED_HOSTS = ["missas.com.br"]
+    with freeze_time(NOW):
+        yield
+
+
+@pytest.fixture
+def schedule():
+    return baker.make(
+        Schedule, day=Schedule.Day.SUNDAY, start_time=time(18), type=Schedule.Type.MASS
+    )
+
+
+def warm(**options):
+    stdout = StringIO()
+    call_command("warm_cache", workers=2, stdout=stdout, **options)
+    return stdout.getvalue()
+
+
+def city_url(city, hour):
+    url = resolve_url("by_city", state=city.state.slug, city=city.slug)
+    return f"{url}?tipo=missas&dia=domingo&horario={hour}"
+
+
+def test_warms_every_page(schedule):
+    parish = schedule.parish
+    city = parish.city
+
+    output = warm()
+
+    for path in (
+        "/",
+        resolve_url("cities_by_state", state=city.state.slug),
+        city_url(city, 11),
+        city_url(city, 12),
+        city_url(city, 11).replace("missas", "confissoes"),
+        resolve_url(
+            "parish_detail",
+            state=city.state.slug,
+            city=city.slug,
+            parish=parish.slug,
+        ),
+    ):
+        assert f"ms {path}\n" in output
+    assert "✓ 7 pages warmed, 0 already fresh, 0 failed" in output
+
+
+def test_visitors_get_the_warmed_pages(schedule, client, django_assert_num_queries):
+    warm(host="missas.com.br")
+    # call_command activated the language in this thread, unlike the server's
+    translation.deactivate()
+
+    with django_assert_num_queries(0):
+        response = client.get(
+            city_url(schedule.parish.city, 11), HTTP_HOST="missas.com.br"
+        )
+
+    assert response.status_code == 200
+    assert "18:00" in response.content.decode()
+
+
+def test_skips_fresh_pages(schedule):
+    warm()
+
+    assert "✓ 0 pages warmed, 7 already fresh, 0 failed" in warm()
+
+
+def test_warms_again_the_pages_of_a_changed_parish(schedule):
+    other = baker.make(Schedule, day=Schedule.Day.SUNDAY, start_time=time(18))
+    warm()
+
+    schedule.start_time = time(19)
+    schedule.save()
+    output = warm()
+
+    assert f"ms {city_url(schedule.parish.city, 11)}\n" in output
+    assert f"ms {city_url(other.parish.city, 11)}\n" not in output
+
+
+def test_reports_failures(schedule, mocker):
+    mocker.patch("missas.core.views.render_cards", side_effect=ValueError)
+
+    output = warm(hours=1)
+
+    assert "500 " in output
+    assert "2 failed" in output
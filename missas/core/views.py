@@ -1,22 +1,71 @@
-from datetime import datetime, time, timedelta
+import math
+from datetime import datetime, time
+from functools import reduce
+from operator import or_
 
 from django.db import models
-from django.db.models import Q
-from django.http import HttpResponse, HttpResponseNotAllowed
-from django.shortcuts import get_object_or_404, redirect, render
+from django.http import (
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseNotAllowed,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.shortcuts import get_object_or_404, redirect, render, resolve_url
+from django.utils.cache import patch_cache_control
+from django.views.decorators.cache import never_cache
 from django.views.decorators.csrf import csrf_exempt
-
-from missas.core.models import City, ContactRequest, Location, Parish, Schedule, State
-
-
+from django.views.decorators.http import condition
+
+from missas.core.cache_tags import (
+    INDEX_TAG,
+    city_tag,
+    parish_tag,
+    state_tag,
+    tag_request,
+)
+from missas.core.cards import card_rows, render_cards
+from missas.core.city_centroids import nearest_city as find_nearest_city
+from missas.core.clusters import MAX_ZOOM, TooManyTiles, get_clusters
+from missas.core.conditional import conditional_page
+from missas.core.distances import location_snapshot
+from missas.core.export import export_version, geojson_chunks
+from missas.core.geo import DEFAULT_RADIUS_KM, MAX_RADIUS_KM
+from missas.core.managers import window_filter
+from missas.core.models import (
+    City,
+    Contact,
+    ContactRequest,
+    Location,
+    NearbyParish,
+    Parish,
+    Schedule,
+    State,
+)
+from missas.core.routers import reads_from_reader
+from missas.core.search import next_schedules as find_next_schedules
+from missas.core.stats import get_stats
+from missas.core.week import MINUTES_PER_DAY, brazil_now, minute_of_week
+
+
+@reads_from_reader
+@conditional_page(
+    lambda request: (
+        Schedule.objects.all(),
+        Parish.objects.all(),
+        Location.objects.all(),
+        # Only the listed ones, through the partial index instead of whole tables
+        City.objects.filter(has_schedules=True),
+        State.objects.filter(
+            models.Exists(
+                City.objects.filter(state=models.OuterRef("pk"), has_schedules=True)
+            )
+        ),
+    )
+)
 def index(request):
-    stats = {
-        "cities_with_parishes": City.objects.filter_with_schedule().count(),
-        "parishes": Parish.objects.count(),
-        "locations": Location.objects.count(),
-        "schedules": Schedule.objects.count(),
-        "verified_schedules": Schedule.objects.filter_verified().count(),
-    }
+    tag_request(request, INDEX_TAG)
+    stats = get_stats()
 
     states_with_cities = (
         State.objects.prefetch_related(
@@ -26,8 +75,11 @@ def index(request):
                 to_attr="cities_with_parishes",
             )
         )
-        .filter(cities__parishes__schedules__isnull=False)
-        .distinct()
+        .filter(
+            models.Exists(
+                City.objects.filter(state=models.OuterRef("pk"), has_schedules=True)
+            )
+        )
         .order_by("name")
     )
 
@@ -41,8 +93,17 @@ def index(request):
     )
 
 
+@reads_from_reader
+@conditional_page(
+    lambda request, state: (
+        State.objects.filter(slug=state),
+        City.objects.filter(state__slug=state),
+        Schedule.objects.filter(parish__city__state__slug=state),
+    )
+)
 def cities_by_state(request, state):
     state = get_object_or_404(State, slug=state)
+    tag_request(request, state_tag(state.pk))
     cities = (
         state.cities.annotate_has_schedules().order_by("-has_schedules", "name").all()
     )
@@ -51,22 +112,19 @@ def cities_by_state(request, state):
     )
 
 
-# @vary_on_headers("HX-Request")  # TODO: Cloudflare ignores Vary header
-def by_city(request, state, city):
-    city = get_object_or_404(City, slug=city, state__slug=state)
+# Values of the `dia` parameter, indexed by weekday()
+DAY_NAMES = ("segunda", "terca", "quarta", "quinta", "sexta", "sabado", "domingo")
+TYPE_NAMES = {"missas": Schedule.Type.MASS, "confissoes": Schedule.Type.CONFESSION}
+
 
-    # Brazilian timezone (UTC-3) defaults
-    now = datetime.utcnow() - timedelta(hours=3)
-    weekday_names = (
-        "segunda",
-        "terca",
-        "quarta",
-        "quinta",
-        "sexta",
-        "sabado",
-        "domingo",
-    )
-    default_day = weekday_names[now.weekday()]
+def _filter_schedules(request, city):
+    """Return the context, schedules and canonical querystring of a city's filters.
+
+    A missing day or hour defaults to the current one in Brazil; `from_clock`
+    tells whether any did, i.e. the result depends on when it was requested.
+    """
+    now = brazil_now()
+    default_day = DAY_NAMES[now.weekday()]
     default_hour = now.hour
 
     day_name = request.GET.get("dia")
@@ -74,19 +132,17 @@ def by_city(request, state, city):
     type_name = request.GET.get("tipo")
     verified_only = request.GET.get("verificado") == "1"
 
-    # Check if we need to set defaults and update URL
-    should_update_url = False
+    from_clock = False
     if not type_name:
         type_name = "missas"
-        should_update_url = True
     if not day_name:
         day_name = default_day
-        should_update_url = True
+        from_clock = True
     if hour is None:
         hour = str(default_hour)
-        should_update_url = True
+        from_clock = True
 
-    hour_for_url = hour
+    querystring = f"tipo={type_name}&dia={day_name}&horario={hour}"
 
     day = {
         "domingo": Schedule.Day.SUNDAY,
@@ -97,59 +153,150 @@ def by_city(request, state, city):
         "sexta": Schedule.Day.FRIDAY,
         "sabado": Schedule.Day.SATURDAY,
     }.get(day_name)
-    type = {
-        "missas": Schedule.Type.MASS,
-        "confissoes": Schedule.Type.CONFESSION,
-    }.get(type_name, Schedule.Type.MASS)
+    type = TYPE_NAMES.get(type_name, Schedule.Type.MASS)
     schedules = Schedule.objects.filter(parish__city=city, type=type)
 
-    if day is not None:
-        schedules = schedules.filter(day=day)
-
+    # From the hour to the end of the day, plus what's still going on then
     if hour is not None:
         hour = time(int(hour))
-        qs = Q(start_time__gte=hour) | Q(end_time__gte=hour)
-        schedules = schedules.filter(qs)
+    start = hour or time(0)
+    duration = MINUTES_PER_DAY - minute_of_week(0, start)
+    if day is not None:
+        schedules = schedules.in_window(minute_of_week(day, start), duration)
+    else:
+        schedules = schedules.filter(
+            reduce(
+                or_,
+                (
+                    window_filter(minute_of_week(d, start), duration)
+                    for d in Schedule.Day
+                ),
+            )
+        )
 
     if verified_only:
         schedules = schedules.filter(verified_at__isnull=False)
+        querystring += "&verificado=1"
 
+    # Cards are rendered from card_rows, not instances of the whole models
     schedules = schedules.order_by("day", "start_time", "-verified_at", "id")
-    schedules = schedules.select_related(
-        "parish", "parish__city", "parish__city__state", "source", "location"
-    ).prefetch_related("parish__contact")
-    template = (
-        "cards.html"
-        if request.htmx and not request.htmx.boosted
-        else "parishes_by_city.html"
-    )
-
-    new_url = None
-    if should_update_url:
-        new_url = (
-            f"{request.path}?tipo={type_name}&dia={day_name}&horario={hour_for_url}"
-        )
 
-    response = render(
-        request,
-        template,
-        {
-            "schedules": schedules,
-            "day": day,
-            "city": city,
-            "hour": hour.hour if hour else 0,
-            "type": type,
-            "Schedule": Schedule,
-            "replace_url": new_url,
-        },
+    context = {
+        "day": day,
+        "city": city,
+        "hour": hour.hour if hour else 0,
+        "type": type,
+        "Schedule": Schedule,
+    }
+    return context, schedules, querystring, from_clock
+
+
+def _city_sources(request, state, city):
+    # A missing filter defaults to the clock, so the page may change any hour
+    if not request.GET.get("dia") or request.GET.get("horario") is None:
+        return None
+
+    schedules = Schedule.objects.filter(
+        parish__city__slug=city, parish__city__state__slug=state
+    )
+    return (
+        City.objects.filter(slug=city, state__slug=state),
+        State.objects.filter(slug=state),
+        Parish.objects.filter(city__slug=city, city__state__slug=state),
+        Contact.objects.filter(
+            parish__city__slug=city, parish__city__state__slug=state
+        ),
+        schedules,
+        (schedules, "location__updated_at"),
+        (schedules, "source__updated_at"),
     )
 
-    if new_url:
-        response["HX-Replace-Url"] = new_url
 
+def _by_city_sources(request, state, city):
+    # HTMX requests get redirected to the cards, which have validators of their own
+    if request.htmx and not request.htmx.boosted:
+        return None
+    return _city_sources(request, state, city)
+
+
+def _seconds_until_next_hour():
+    now = datetime.utcnow()
+    return 3600 - now.minute * 60 - now.second
+
+
+@reads_from_reader
+@conditional_page(_by_city_sources)
+def by_city(request, state, city):
+    city = get_object_or_404(City, slug=city, state__slug=state)
+
+    # Pages cached before the cards got their own URL still point HTMX here
+    if request.htmx and not request.htmx.boosted:
+        query = request.GET.urlencode()
+        url = resolve_url("by_city_cards", state=state, city=city.slug)
+        return redirect(f"{url}?{query}" if query else url)
+
+    context, schedules, querystring, from_clock = _filter_schedules(request, city)
+    if from_clock:
+        # The defaults are only right until the hour changes, while the
+        # parameterized page is the same all day and can be cached for long
+        response = redirect(f"{request.path}?{querystring}")
+        patch_cache_control(response, max_age=_seconds_until_next_hour())
+        return response
+
+    tag_request(request, city_tag(city.pk))
+    context["cards"] = render_cards(card_rows(schedules))
+    return render(request, "parishes_by_city.html", context)
+
+
+@reads_from_reader
+@conditional_page(_city_sources)
+def by_city_cards(request, state, city):
+    """Schedule cards of a city, requested by the filters form of by_city.
+
+    A URL of its own so the CDN, which ignores Vary, never mixes the fragment
+    and the full page.
+    """
+    city = get_object_or_404(City, slug=city, state__slug=state)
+    tag_request(request, city_tag(city.pk))
+    context, schedules, querystring, from_clock = _filter_schedules(request, city)
+    context["cards"] = render_cards(card_rows(schedules))
+
+    response = render(request, "cards.html", context)
+    if from_clock:
+        patch_cache_control(response, max_age=_seconds_until_next_hour())
+    # The address bar shows the full page, not this fragment
+    response["HX-Push-Url"] = (
+        f"{resolve_url('by_city', state=state, city=city.slug)}?{querystring}"
+    )
     return response
 
 
+def _parish_sources(request, state, city, parish):
+    lookup = {
+        "parish__slug": parish,
+        "parish__city__slug": city,
+        "parish__city__state__slug": state,
+    }
+    parishes = Parish.objects.filter(
+        slug=parish, city__slug=city, city__state__slug=state
+    )
+    schedules = Schedule.objects.filter(**lookup)
+    nearby_parishes = NearbyParish.objects.filter(**lookup)
+    return (
+        parishes,
+        (parishes, "city__updated_at"),
+        (parishes, "city__state__updated_at"),
+        Contact.objects.filter(**lookup),
+        schedules,
+        (schedules, "location__updated_at"),
+        (schedules, "source__updated_at"),
+        (nearby_parishes, "nearby__updated_at"),
+        (nearby_parishes, "nearby__city__updated_at"),
+    )
+
+
+@reads_from_reader
+@conditional_page(_parish_sources)
 def parish_detail(request, state, city, parish):
     parish = get_object_or_404(
         Parish.objects.select_related("contact", "city", "city__state"),
@@ -157,11 +304,15 @@ def parish_detail(request, state, city, parish):
         city__slug=city,
         city__state__slug=state,
     )
+    tag_request(request, parish_tag(parish.pk))
     schedules = (
         Schedule.objects.filter(parish=parish)
         .order_by("type", "day", "start_time")
         .prefetch_related("source")
     )
+    nearby_parishes = parish.nearby_parishes.select_related(
+        "nearby", "nearby__city", "nearby__city__state"
+    ).order_by("rank")
 
     return render(
         request,
@@ -169,11 +320,171 @@ def parish_detail(request, state, city, parish):
         {
             "parish": parish,
             "schedules": schedules,
+            "nearby_parishes": nearby_parishes,
             "Schedule": Schedule,
         },
     )
 
 
+def _get_coordinates(request):
+    lat = float(request.GET["lat"])
+    lng = float(request.GET["lng"])
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError("Coordinates out of range")
+    return lat, lng
+
+
+def _get_radius(request):
+    radius = float(request.GET.get("raio", DEFAULT_RADIUS_KM))
+    # NaN passes every comparison and would search the whole world
+    if not math.isfinite(radius) or radius <= 0:
+        raise ValueError("Radius must be a positive number")
+    return min(radius, MAX_RADIUS_KM)
+
+
+def _parish_url(state, city, parish):
+    return f"/{state}/{city}/{parish}/"
+
+
+# Every coordinate is a different URL, so caching would only evict useful pages
+@never_cache
+def nearby(request):
+    try:
+        lat, lng = _get_coordinates(request)
+        radius = _get_radius(request)
+    except (KeyError, ValueError):
+        return HttpResponseBadRequest("Parâmetros inválidos: informe lat, lng e raio.")
+
+    distances = {
+        location_id: distance
+        for distance, location_id in location_snapshot.get().within(lat, lng, radius)
+    }
+
+    rows = (
+        Schedule.objects.filter(location_id__in=distances)
+        .values(
+            "location_id",
+            "location__name",
+            "location__address",
+            "parish_id",
+            "parish__name",
+            "parish__slug",
+            "parish__city__name",
+            "parish__city__slug",
+            "parish__city__state__short_name",
+            "parish__city__state__slug",
+        )
+        .distinct()
+    )
+
+    parishes = {}
+    for row in rows:
+        distance = distances[row["location_id"]]
+        parish = parishes.get(row["parish_id"])
+        if parish and parish["distance_km"] <= distance:
+            continue
+        parishes[row["parish_id"]] = {
+            "name": row["parish__name"],
+            "city": row["parish__city__name"],
+            "state": row["parish__city__state__short_name"],
+            "url": _parish_url(
+                row["parish__city__state__slug"],
+                row["parish__city__slug"],
+                row["parish__slug"],
+            ),
+            "distance_km": round(distance, 3),
+            "location": {
+                "name": row["location__name"],
+                "address": row["location__address"],
+            },
+        }
+
+    return JsonResponse(
+        {
+            "radius_km": radius,
+            "parishes": sorted(parishes.values(), key=lambda p: p["distance_km"]),
+        }
+    )
+
+
+@never_cache
+def nearest_city(request):
+    try:
+        lat, lng = _get_coordinates(request)
+    except (KeyError, ValueError):
+        return HttpResponseBadRequest("Parâmetros inválidos: informe lat e lng.")
+
+    city = find_nearest_city(lat, lng)
+    if city is None:
+        return redirect("index")
+    return redirect("by_city", state=city.state.slug, city=city.slug)
+
+
+# Depends on the clock as well as on the coordinates
+@never_cache
+def next_schedules(request):
+    try:
+        lat, lng = _get_coordinates(request)
+        radius = _get_radius(request)
+    except (KeyError, ValueError):
+        return HttpResponseBadRequest("Parâmetros inválidos: informe lat, lng e raio.")
+    type = TYPE_NAMES.get(request.GET.get("tipo"), Schedule.Type.MASS)
+
+    occurrences = find_next_schedules(lat, lng, radius_km=radius, type=type)
+
+    schedules = []
+    for occurrence in occurrences:
+        schedule = occurrence.schedule
+        parish, city = schedule.parish, schedule.parish.city
+        schedules.append(
+            {
+                "parish": parish.name,
+                "city": city.name,
+                "state": city.state.short_name,
+                "url": _parish_url(city.state.slug, city.slug, parish.slug),
+                "starts_at": occurrence.starts_at.isoformat(timespec="minutes"),
+                "minutes_until": occurrence.minutes_until,
+                "distance_km": round(occurrence.distance_km, 3),
+                "location": {
+                    "name": schedule.location_name or schedule.location.name,
+                    "address": schedule.location.address,
+                },
+                "observation": schedule.observation,
+            }
+        )
+
+    return JsonResponse({"radius_km": radius, "schedules": schedules})
+
+
+@never_cache
+def map_clusters(request):
+    try:
+        min_lng, min_lat, max_lng, max_lat = map(float, request.GET["bbox"].split(","))
+        zoom = min(max(int(request.GET["zoom"]), 0), MAX_ZOOM)
+    except (KeyError, ValueError):
+        return HttpResponseBadRequest(
+            "Parâmetros inválidos: informe bbox=oeste,sul,leste,norte e zoom."
+        )
+    if min_lat > max_lat or min_lng > max_lng:
+        return HttpResponseBadRequest("bbox inválido.")
+
+    try:
+        clusters = get_clusters(min_lat, min_lng, max_lat, max_lng, zoom)
+    except TooManyTiles:
+        return HttpResponseBadRequest("Área muito grande para o zoom informado.")
+
+    return JsonResponse({"zoom": zoom, "clusters": clusters})
+
+
+@condition(etag_func=lambda request: export_version())
+def locations_geojson(request):
+    response = StreamingHttpResponse(
+        geojson_chunks(), content_type="application/geo+json; charset=utf-8"
+    )
+    response["Content-Disposition"] = 'inline; filename="locais.geojson"'
+    return response
+
+
 @csrf_exempt
 def create_contact(request):
     # TODO: tests
@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta, timezone
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+# Brazilian timezone (UTC-3), naive like the schedules' times
+BRAZIL_UTC_OFFSET = timedelta(hours=-3)
+
+
+def brazil_now():
+    return datetime.utcnow() + BRAZIL_UTC_OFFSET
+
+
+def to_brazil(moment):
+    """The naive Brazilian time of an aware datetime."""
+    return moment.astimezone(timezone.utc).replace(tzinfo=None) + BRAZIL_UTC_OFFSET
+
+
+def minute_of_week(day, time):
+    return day * MINUTES_PER_DAY + time.hour * 60 + time.minute
+
+
+def minutes_of_week_window(start, duration):
+    """Split [start, start + duration) into ranges that don't wrap the week."""
+    start %= MINUTES_PER_WEEK
+    end = start + duration
+    if end <= MINUTES_PER_WEEK:
+        return [(start, end)]
+    return [(start, MINUTES_PER_WEEK), (0, end - MINUTES_PER_WEEK)]
@@ -50,9 +50,11 @@ MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
-    "django.middleware.cache.UpdateCacheMiddleware",
+    # Outside the cache so that cached pages are also answered with 304s
+    "django.middleware.http.ConditionalGetMiddleware",
+    "missas.core.middleware.UpdateCacheMiddleware",
     "django.middleware.common.CommonMiddleware",
-    "django.middleware.cache.FetchFromCacheMiddleware",
+    "missas.core.middleware.FetchFromCacheMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
@@ -85,6 +87,38 @@ WSGI_APPLICATION = "missas.wsgi.application"
 DATABASES = {
     "default": config("DATABASE_URL", cast=dburl),
 }
+# Keep each worker's connection across requests instead of reopening it
+DATABASES["default"]["CONN_MAX_AGE"] = config("CONN_MAX_AGE", default=600, cast=int)
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+if DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3":
+    # Deferred transactions that read before writing fail at once with
+    # "database is locked" if another worker wrote meanwhile. IMMEDIATE ones
+    # take the write lock upfront, waiting up to busy_timeout for it
+    DATABASES["default"].setdefault("OPTIONS", {})["transaction_mode"] = "IMMEDIATE"
+    # The same file opened read-only, for the reads of the public views. See
+    # missas.core.routers
+    DATABASES["reader"] = {
+        **DATABASES["default"],
+        "NAME": f"file:{DATABASES['default']['NAME']}?mode=ro",
+        "OPTIONS": {},
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["missas.core.routers.PublicReadsRouter"]
+# Set on every SQLite connection by missas.core.sqlite. Compare alternatives
+# with `manage.py benchmark_sqlite`
+SQLITE_PRAGMAS = {
+    # Readers don't block the writer nor the other way around
+    "journal_mode": "WAL",
+    # Durable enough with WAL, fsyncs at checkpoints instead of every commit
+    "synchronous": "NORMAL",
+    # Milliseconds to wait for the write lock before "database is locked"
+    "busy_timeout": config("SQLITE_BUSY_TIMEOUT", default=5000, cast=int),
+    # Negative is in KiB: 32MB of page cache per connection
+    "cache_size": config("SQLITE_CACHE_SIZE", default=-32_000, cast=int),
+    # Reads served from the OS page cache without copying
+    "mmap_size": config("SQLITE_MMAP_SIZE", default=256 * 1024 * 1024, cast=int),
+    "temp_store": "MEMORY",
+}
 
 
 # Password validation
@@ -137,11 +171,23 @@ STORAGES = {
 # Cache
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
-        "LOCATION": "django_cache",
+        "BACKEND": "missas.core.cache_backends.SQLiteCache",
+        "LOCATION": config("CACHE_LOCATION", default=str(BASE_DIR / "cache.sqlite3")),
+        "OPTIONS": {
+            "MAX_SIZE": config("CACHE_MAX_SIZE", default=128 * 1024 * 1024, cast=int),
+        },
     }
 }
 CACHE_MIDDLEWARE_SECONDS = 60 * 60 * 24
+# How long past its timeout a page may still be served while it's rebuilt
+CACHE_MIDDLEWARE_STALE_SECONDS = 60 * 60 * 24
+
+# CDN purge by cache tag, e.g. Cloudflare's
+# https://api.cloudflare.com/client/v4/zones/<zone id>/purge_cache
+CDN_PURGE_URL = config("CDN_PURGE_URL", default="")
+CDN_PURGE_TOKEN = config("CDN_PURGE_TOKEN", default="")
+# Seconds to wait for more tags before purging, so bursts make few calls
+CDN_PURGE_DELAY = config("CDN_PURGE_DELAY", default=2, cast=float)
 
 # Google Maps
 GOOGLE_MAPS_API_KEY = config("GOOGLE_MAPS_API_KEY", default="")
@@ -7,6 +7,16 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path("", views.index, name="index"),
     path("contatos/", views.create_contact, name="create_contact"),
+    path("perto/", views.nearby, name="nearby"),
+    path("proximos-horarios/", views.next_schedules, name="next_schedules"),
+    path("cidade-mais-proxima/", views.nearest_city, name="nearest_city"),
+    path("mapa/clusters/", views.map_clusters, name="map_clusters"),
+    path("dados/locais.geojson", views.locations_geojson, name="locations_geojson"),
+    path(
+        "<slug:state>/<slug:city>/horarios/",
+        views.by_city_cards,
+        name="by_city_cards",
+    ),
     path(
         "<slug:state>/<slug:city>/<slug:parish>/",
         views.parish_detail,